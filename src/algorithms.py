@@ -1,187 +1,362 @@
+import math
 from collections import deque
 
-from graph import Graph
+from base_graph import BaseGraph
+from search_state import SearchState
+from arc_node import NO_NODE
 from exceptions import NoDirectedPathError
+from search_stats import SearchStats
+from search_filter import SearchFilter
+from frontier import AUTO_QUEUE
+
+def dijkstra_fwd(
+    graph:BaseGraph,
+    src:int,
+    dest:int,
+    queue:str=AUTO_QUEUE,
+    state:SearchState=None,
+    stats:SearchStats=None,
+    search_filter:SearchFilter=None) -> deque:
+    """
+    Forward Dijkstra algorithm's implementation.
+
+    The "queue" parameter selects how the temporary node with the minimum
+    distance label is found (see frontier.FRONTIERS):
+        - 'heap': binary heap with lazy deletion, O(E log E);
+        - 'set': scan of the whole set of temporary nodes, O(V^2);
+        - 'dial': Dial's circular array of buckets, one per label, for
+          integer arc costs up to C only, O(E + V C);
+        - 'radix': radix heap, for integer arc costs only, O(E + V log C);
+        - 'auto' (the default): one of the above, picked according to the
+          graph's arc costs (see BaseGraph.select_queue()).
+
+    The search's labels and sets of nodes are kept in "state", or in the
+    graph's own SearchState if it's None; pass a distinct SearchState to
+    each concurrent query on the same graph.
+
+    If "stats" is specified, the search's counters, events and phase times
+    are reported to it (see search_stats.py).
+
+    If "search_filter" is specified, the path avoids its blocked nodes and
+    arcs and costs at most its maximum distance, and the search makes at
+    most its maximum number of nodes permanent (see search_filter.py).
+    """
+    if stats is not None:
+        stats.start_phase('init')
+
+    try:
+        state = graph.init_state(src, dest, queue, state)
+
+        if search_filter is not None:
+            graph = search_filter.apply(graph, state, src, dest)
+
+        if stats is not None:
+            graph = stats.observe(graph, state)
+
+        while state.temp_fwd:
+            # Get the temporary node with the minimum distance from src
+            i = state.make_node_perm_fwd()
+
+            if i == dest:
+                # We found the optimal path from the source to the destination node
+                break
+
+            i_dist_s = state.dist_s[i]
+
+            for _, j, cost in graph.out_arcs(i):
+                if state.dist_s[j] > i_dist_s + cost:
+                    # Distance update
+                    state.dist_s[j] = i_dist_s + cost
+                    state.pred[j] = i
+
+                    # Add the head j to the set of temporary nodes.
+                    # NOTE: if it's already there, its key is updated instead;
+                    # it can't possibly be in the set of permanent nodes since
+                    # we just found a path from the source node "src" which is
+                    # shorter than the previous one.
+                    state.temp_fwd.push(j, state.dist_s[j])
+    finally:
+        # Also when the query raises, so that its time is not charged to
+        # the phase running until the next one
+        if stats is not None:
+            stats.start_phase(None)
+
+    if search_filter is not None:
+        search_filter.check_dist(src, dest, state.dist_s[dest])
 
-def dijkstra_fwd(graph:Graph, src:int, dest:int) -> deque:
-    """Forward Dijkstra algorithm's implementation."""
-    graph.init_state(src, dest)
-
-    while graph.temp_fwd:
-        # Get the temporary node with the minimum distance from src
-        i = min(
-            graph.temp_fwd,
-            key = lambda nodeID: graph.nodes[nodeID].dist_s
-        )
-
-        graph.make_node_perm_fwd(i)
-
-        if i == dest:
-            # We found the optimal path from the source to the destination node
-            break
-
-        i_dist_s = graph.nodes[i].dist_s
-
-        for arc in graph.nodes[i].out_arcs:
-            j = arc.head
-            if graph.nodes[j].dist_s > i_dist_s + arc.cost:
-                # Distance update
-                graph.nodes[j].dist_s = i_dist_s + arc.cost
-                graph.nodes[j].pred = i
-
-                # Add the head j to the set of temporary nodes.
-                # NOTE: it doesn't matter if it's already there
-                # (nothing happens), and it can't possibly be in the set
-                # of permanent nodes since we just found a path from the
-                # source node "src" which is shorter than the previous one.
-                graph.temp_fwd.add(j)
-        
     # If the destination node doesn't have a predecessor,
     # there is no directed path from src to dest
-    if graph.nodes[dest].pred is None:
+    if state.pred[dest] == NO_NODE:
         raise NoDirectedPathError(src, dest)
     
     # Return the path from the source to the destination,
     # by tracing back the destination node's predecessors.
     src_dest_path = deque([dest])
-    curr_node = graph.nodes[dest]
+    curr_node = dest
 
-    while (curr_pred := curr_node.pred) is not None:
-        src_dest_path.appendleft(curr_pred)
-        curr_node = graph.nodes[curr_pred]
+    while (curr_node := state.pred[curr_node]) != NO_NODE:
+        src_dest_path.appendleft(curr_node)
 
     return src_dest_path
 
 
-def dijkstra_rev(graph:Graph, src:int, dest:int) -> deque:
-    """Reverse Dijkstra algorithm's implementation."""
-    graph.init_state(src, dest)
+def astar(
+    graph:BaseGraph,
+    src:int,
+    dest:int,
+    heuristic,
+    queue:str=AUTO_QUEUE,
+    state:SearchState=None,
+    stats:SearchStats=None,
+    search_filter:SearchFilter=None) -> deque:
+    """
+    A* algorithm's implementation: the forward Dijkstra algorithm, where the
+    temporary nodes are sorted by their distance from src PLUS an estimate of
+    their distance to dest, so that nodes leading towards dest are made
+    permanent first.
+
+    "heuristic" is a callable taking a node and the destination node and
+    returning the estimate (see heuristics.py); it must be consistent, that is
+    never overestimate an arc's cost as the difference between the estimates
+    of its tail and its head, otherwise the returned path might not be optimal.
+
+    See dijkstra_fwd() for the "queue", "state", "stats" and "search_filter"
+    parameters: 'auto' always picks the binary heap, and 'dial' is replaced
+    by 'radix', since the keys may grow by more than the maximum arc cost at
+    once; with 'radix', the estimates are rounded down to integers, which
+    keeps them consistent for integer arc costs.
+    """
+    if stats is not None:
+        stats.start_phase('init')
+
+    try:
+        if queue == AUTO_QUEUE:
+            queue = 'heap'
+        elif queue == 'dial':
+            queue = 'radix'
+
+        if queue == 'radix':
+            exact_heuristic = heuristic
+            heuristic = lambda node, dest: math.floor(exact_heuristic(node, dest))
+
+        state = graph.init_state(src, dest, queue, state)
+
+        if search_filter is not None:
+            graph = search_filter.apply(graph, state, src, dest)
+
+        if stats is not None:
+            graph = stats.observe(graph, state)
+
+        while state.temp_fwd:
+            # Get the temporary node with the minimum distance from src
+            # plus estimated distance to dest
+            i = state.make_node_perm_fwd()
+
+            if i == dest:
+                # We found the optimal path from the source to the destination node
+                break
+
+            i_dist_s = state.dist_s[i]
+
+            for _, j, cost in graph.out_arcs(i):
+                if state.dist_s[j] > i_dist_s + cost:
+                    # Distance update
+                    state.dist_s[j] = i_dist_s + cost
+                    state.pred[j] = i
+
+                    # Add the head j to the set of temporary nodes (see
+                    # dijkstra_fwd()); since the heuristic is consistent,
+                    # j can't be in the set of permanent nodes.
+                    state.temp_fwd.push(j, state.dist_s[j] + heuristic(j, dest))
+    finally:
+        if stats is not None:
+            stats.start_phase(None)
+
+    if search_filter is not None:
+        search_filter.check_dist(src, dest, state.dist_s[dest])
 
-    while graph.temp_rev:
-        # Get the temporary node with the minimum distance from dest
-        j = min(
-            graph.temp_rev,
-            key = lambda nodeID: graph.nodes[nodeID].dist_t
-        )
+    # If the destination node doesn't have a predecessor,
+    # there is no directed path from src to dest
+    if state.pred[dest] == NO_NODE:
+        raise NoDirectedPathError(src, dest)
+    
+    # Return the path from the source to the destination,
+    # by tracing back the destination node's predecessors.
+    src_dest_path = deque([dest])
+    curr_node = dest
 
-        graph.make_node_perm_rev(j)
+    while (curr_node := state.pred[curr_node]) != NO_NODE:
+        src_dest_path.appendleft(curr_node)
 
-        if j == src:
-            # We found the optimal path from the source to the destination node
-            break
+    return src_dest_path
 
-        j_dist_t = graph.nodes[j].dist_t
 
-        for arc in graph.nodes[j].in_arcs:
-            i = arc.tail
-            if graph.nodes[i].dist_t > j_dist_t + arc.cost:
-                # Distance update
-                graph.nodes[i].dist_t = j_dist_t + arc.cost
-                graph.nodes[i].succ = j
+def dijkstra_rev(
+    graph:BaseGraph,
+    src:int,
+    dest:int,
+    queue:str=AUTO_QUEUE,
+    state:SearchState=None,
+    stats:SearchStats=None,
+    search_filter:SearchFilter=None) -> deque:
+    """
+    Reverse Dijkstra algorithm's implementation.
+
+    See dijkstra_fwd() for the "queue", "state", "stats" and "search_filter"
+    parameters.
+    """
+    if stats is not None:
+        stats.start_phase('init')
+
+    try:
+        state = graph.init_state(src, dest, queue, state)
+
+        if search_filter is not None:
+            graph = search_filter.apply(graph, state, src, dest)
+
+        if stats is not None:
+            graph = stats.observe(graph, state)
+
+        while state.temp_rev:
+            # Get the temporary node with the minimum distance from dest
+            j = state.make_node_perm_rev()
+
+            if j == src:
+                # We found the optimal path from the source to the destination node
+                break
+
+            j_dist_t = state.dist_t[j]
+
+            for i, _, cost in graph.in_arcs(j):
+                if state.dist_t[i] > j_dist_t + cost:
+                    # Distance update
+                    state.dist_t[i] = j_dist_t + cost
+                    state.succ[i] = j
+
+                    # Add the tail i to the set of temporary nodes.
+                    # NOTE: if it's already there, its key is updated instead;
+                    # it can't possibly be in the set of permanent nodes since
+                    # we just found a path from the destination node "dest"
+                    # which is shorter than the previous one.
+                    state.temp_rev.push(i, state.dist_t[i])
+    finally:
+        if stats is not None:
+            stats.start_phase(None)
+
+    if search_filter is not None:
+        search_filter.check_dist(src, dest, state.dist_t[src])
 
-                # Add the tail i to the set of temporary nodes.
-                # NOTE: it doesn't matter if it's already there
-                # (nothing happens), and it can't possibly be in the set
-                # of permanent nodes since we just found a path from the
-                # destination node "dest" which is shorter than the previous one.
-                graph.temp_rev.add(i)
-        
     # If the source node doesn't have a successor,
     # there is no directed path from src to dest
-    if graph.nodes[src].succ is None:
+    if state.succ[src] == NO_NODE:
         raise NoDirectedPathError(src, dest)
     
     # Return the path from the source to the destination,
     # by tracing forward the source node's successors.
     src_dest_path = deque([src])
-    curr_node = graph.nodes[src]
+    curr_node = src
 
-    while (curr_succ := curr_node.succ) is not None:
-        src_dest_path.append(curr_succ)
-        curr_node = graph.nodes[curr_succ]
+    while (curr_node := state.succ[curr_node]) != NO_NODE:
+        src_dest_path.append(curr_node)
 
     return src_dest_path
 
 
-def dijkstra_bidir(graph:Graph, src:int, dest:int) -> deque:
-    """Bidirectional Dijkstra algorithm's implementation."""
-    graph.init_state(src, dest)
-    meeting_node = None
-
-    while graph.temp_fwd and graph.temp_rev:
-        ###################################################
-        ############ FORWARD Dijkstra's step ##############
-        ###################################################
-
-        # Get the temporary node with the minimum distance from src
-        i = min(
-            graph.temp_fwd,
-            key = lambda nodeID: graph.nodes[nodeID].dist_s
-        )
+def dijkstra_bidir(
+    graph:BaseGraph,
+    src:int,
+    dest:int,
+    queue:str=AUTO_QUEUE,
+    state:SearchState=None,
+    stats:SearchStats=None,
+    search_filter:SearchFilter=None) -> deque:
+    """
+    Bidirectional Dijkstra algorithm's implementation.
+
+    See dijkstra_fwd() for the "queue", "state", "stats" and "search_filter"
+    parameters.
+    """
+    if stats is not None:
+        stats.start_phase('init')
+
+    try:
+        state = graph.init_state(src, dest, queue, state)
+
+        if search_filter is not None:
+            graph = search_filter.apply(graph, state, src, dest)
+
+        if stats is not None:
+            graph = stats.observe(graph, state)
+        meeting_node = None
+
+        while state.temp_fwd and state.temp_rev:
+            ###################################################
+            ############ FORWARD Dijkstra's step ##############
+            ###################################################
+
+            # Get the temporary node with the minimum distance from src
+            i = state.make_node_perm_fwd()
+
+            # If i has been marked as permanent by the reverse Dikjstra's step
+            # as well, we found the optimal path from src to dest
+            if i in state.perm_rev:
+                meeting_node = i
+                break
+
+            i_dist_s = state.dist_s[i]
+
+            for _, j, cost in graph.out_arcs(i):
+                if state.dist_s[j] > i_dist_s + cost:
+                    # Distance update
+                    state.dist_s[j] = i_dist_s + cost
+                    state.pred[j] = i
+
+                    # Add the head j to the set of temporary nodes.
+                    # NOTE: if it's already there, its key is updated instead;
+                    # it can't possibly be in the set of permanent nodes since
+                    # we just found a path from the source node "src" which is
+                    # shorter than the previous one.
+                    state.temp_fwd.push(j, state.dist_s[j])
+
+            ###################################################
+            ############ REVERSE Dijkstra's step ##############
+            ###################################################
+
+            # Get the temporary node with the minimum distance from dest
+            j = state.make_node_perm_rev()
+
+            # If j has been marked as permanent by the forward Dikjstra's step
+            # as well, we found the optimal path from src to dest
+            if j in state.perm_fwd:
+                meeting_node = j
+                break
+
+            j_dist_t = state.dist_t[j]
+
+            for i, _, cost in graph.in_arcs(j):
+                if state.dist_t[i] > j_dist_t + cost:
+                    # Distance update
+                    state.dist_t[i] = j_dist_t + cost
+                    state.succ[i] = j
+
+                    # Add the tail i to the set of temporary nodes.
+                    # NOTE: if it's already there, its key is updated instead;
+                    # it can't possibly be in the set of permanent nodes since
+                    # we just found a path from the destination node "dest"
+                    # which is shorter than the previous one.
+                    state.temp_rev.push(i, state.dist_t[i])
+    finally:
+        if stats is not None:
+            stats.start_phase(None)
 
-        graph.make_node_perm_fwd(i)
-
-        # If i has been marked as permanent by the reverse Dikjstra's step
-        # as well, we found the optimal path from src to dest
-        if i in graph.perm_rev:
-            meeting_node = i
-            break
-
-        i_dist_s = graph.nodes[i].dist_s
-
-        for arc in graph.nodes[i].out_arcs:
-            j = arc.head
-            if graph.nodes[j].dist_s > i_dist_s + arc.cost:
-                # Distance update
-                graph.nodes[j].dist_s = i_dist_s + arc.cost
-                graph.nodes[j].pred = i
-
-                # Add the head j to the set of temporary nodes.
-                # NOTE: it doesn't matter if it's already there
-                # (nothing happens), and it can't possibly be in the set
-                # of permanent nodes since we just found a path from the
-                # source node "src" which is shorter than the previous one.
-                graph.temp_fwd.add(j)
-
-        ###################################################
-        ############ REVERSE Dijkstra's step ##############
-        ###################################################
-
-        # Get the temporary node with the minimum distance from dest
-        j = min(
-            graph.temp_rev,
-            key = lambda nodeID: graph.nodes[nodeID].dist_t
-        )
-
-        graph.make_node_perm_rev(j)
-
-        # If j has been marked as permanent by the forward Dikjstra's step
-        # as well, we found the optimal path from src to dest
-        if j in graph.perm_fwd:
-            meeting_node = j
-            break
-
-        j_dist_t = graph.nodes[j].dist_t
-
-        for arc in graph.nodes[j].in_arcs:
-            i = arc.tail
-            if graph.nodes[i].dist_t > j_dist_t + arc.cost:
-                # Distance update
-                graph.nodes[i].dist_t = j_dist_t + arc.cost
-                graph.nodes[i].succ = j
-
-                # Add the tail i to the set of temporary nodes.
-                # NOTE: it doesn't matter if it's already there
-                # (nothing happens), and it can't possibly be in the set
-                # of permanent nodes since we just found a path from the
-                # destination node "dest" which is shorter than the previous one.
-                graph.temp_rev.add(i)
-        
     # If we didn't find a meeting node between the forward and reverse
     # Dijkstra's steps, there is no directed path from src to dest
     if meeting_node is None:
         raise NoDirectedPathError(src, dest)
-    
+
+    if search_filter is not None:
+        search_filter.check_dist(src, dest, state.dist_s[meeting_node] + state.dist_t[meeting_node])
+
     # Return the path from the source to the destination,
     # by tracing:
     #   - The meeting node's predecessors, all the way back to the source node;
@@ -189,15 +364,149 @@ def dijkstra_bidir(graph:Graph, src:int, dest:int) -> deque:
     src_dest_path = deque([meeting_node])
 
     # Trace the path from meeting_node to src
-    curr_node = graph.nodes[meeting_node]
-    while (curr_pred := curr_node.pred) is not None:
-        src_dest_path.appendleft(curr_pred)
-        curr_node = graph.nodes[curr_pred]
+    curr_node = meeting_node
+    while (curr_node := state.pred[curr_node]) != NO_NODE:
+        src_dest_path.appendleft(curr_node)
     
     # Trace the path from meeting_node to dest
-    curr_node = graph.nodes[meeting_node]
-    while (curr_succ := curr_node.succ) is not None:
-        src_dest_path.append(curr_succ)
-        curr_node = graph.nodes[curr_succ]
+    curr_node = meeting_node
+    while (curr_node := state.succ[curr_node]) != NO_NODE:
+        src_dest_path.append(curr_node)
+
+    return src_dest_path
+
+# The criteria for choosing the direction of each step of dijkstra_bidir_mu()
+BALANCE_MODES = ('alternate', 'size', 'key')
+
+def dijkstra_bidir_mu(
+    graph:BaseGraph,
+    src:int,
+    dest:int,
+    balance:str='size',
+    queue:str=AUTO_QUEUE,
+    state:SearchState=None,
+    stats:SearchStats=None,
+    search_filter:SearchFilter=None) -> deque:
+    """
+    Bidirectional Dijkstra algorithm's implementation, with the standard
+    stopping criterion: the cost "mu" of the best path found so far through
+    a node labeled by both searches is updated whenever an arc is scanned,
+    and the search stops as soon as the sum of the two minimum temporary
+    distance labels reaches mu, since no shorter path can be found anymore.
+
+    Unlike dijkstra_bidir(), which stops at the first node made permanent by
+    both searches (and returns the path through it), the returned path is
+    always optimal, and the search usually stops earlier.
+
+    "balance" chooses which search performs each step:
+        - 'alternate': one forward and one reverse step in turn;
+        - 'size': the search with fewer temporary nodes, which keeps the
+          two frontiers balanced on graphs where one side grows faster;
+        - 'key': the search with the smaller minimum distance label, which
+          keeps the two search radii balanced.
+
+    See dijkstra_fwd() for the "queue", "state", "stats" and "search_filter"
+    parameters.
+    """
+    if balance not in BALANCE_MODES:
+        raise ValueError(
+            f"Unknown balance mode '{balance}' (expected one of: {', '.join(BALANCE_MODES)})"
+        )
 
-    return src_dest_path
\ No newline at end of file
+    if stats is not None:
+        stats.start_phase('init')
+
+    try:
+        state = graph.init_state(src, dest, queue, state)
+
+        if search_filter is not None:
+            graph = search_filter.apply(graph, state, src, dest)
+
+        if stats is not None:
+            graph = stats.observe(graph, state)
+        temp_fwd = state.temp_fwd
+        temp_rev = state.temp_rev
+
+        mu = float('+inf')
+        meeting_node = None
+        forward_turn = True
+
+        while True:
+            min_key_fwd = temp_fwd.min_key()
+            min_key_rev = temp_rev.min_key()
+
+            # No path through a temporary node can be shorter than mu
+            # (this also holds if either frontier is empty, whose min is +inf)
+            if min_key_fwd + min_key_rev >= mu:
+                break
+
+            if balance == 'size':
+                forward_turn = len(temp_fwd) <= len(temp_rev)
+            elif balance == 'key':
+                forward_turn = min_key_fwd <= min_key_rev
+
+            if forward_turn:
+                ###################################################
+                ############ FORWARD Dijkstra's step ##############
+                ###################################################
+                i = state.make_node_perm_fwd()
+                i_dist_s = state.dist_s[i]
+
+                for _, j, cost in graph.out_arcs(i):
+                    if state.dist_s[j] > i_dist_s + cost:
+                        # Distance update (see dijkstra_fwd())
+                        state.dist_s[j] = i_dist_s + cost
+                        state.pred[j] = i
+                        temp_fwd.push(j, state.dist_s[j])
+
+                        # If j has been labeled by the reverse search as well,
+                        # we found a path from src to dest through it
+                        if state.dist_s[j] + state.dist_t[j] < mu:
+                            mu = state.dist_s[j] + state.dist_t[j]
+                            meeting_node = j
+            else:
+                ###################################################
+                ############ REVERSE Dijkstra's step ##############
+                ###################################################
+                j = state.make_node_perm_rev()
+                j_dist_t = state.dist_t[j]
+
+                for i, _, cost in graph.in_arcs(j):
+                    if state.dist_t[i] > j_dist_t + cost:
+                        # Distance update (see dijkstra_rev())
+                        state.dist_t[i] = j_dist_t + cost
+                        state.succ[i] = j
+                        temp_rev.push(i, state.dist_t[i])
+
+                        # If i has been labeled by the forward search as well,
+                        # we found a path from src to dest through it
+                        if state.dist_s[i] + state.dist_t[i] < mu:
+                            mu = state.dist_s[i] + state.dist_t[i]
+                            meeting_node = i
+
+            if balance == 'alternate':
+                forward_turn = not forward_turn
+    finally:
+        if stats is not None:
+            stats.start_phase(None)
+
+    # If the two searches never met, there is no directed path from src to dest
+    if meeting_node is None:
+        raise NoDirectedPathError(src, dest)
+
+    if search_filter is not None:
+        search_filter.check_dist(src, dest, state.dist_s[meeting_node] + state.dist_t[meeting_node])
+
+    # Return the path from the source to the destination, through the
+    # meeting node (see dijkstra_bidir())
+    src_dest_path = deque([meeting_node])
+
+    curr_node = meeting_node
+    while (curr_node := state.pred[curr_node]) != NO_NODE:
+        src_dest_path.appendleft(curr_node)
+
+    curr_node = meeting_node
+    while (curr_node := state.succ[curr_node]) != NO_NODE:
+        src_dest_path.append(curr_node)
+
+    return src_dest_path
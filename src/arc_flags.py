@@ -0,0 +1,451 @@
+import argparse, io, random, struct, sys
+from array import array
+from collections import deque
+
+from base_graph import BaseGraph
+from frontier import AUTO_QUEUE
+from search_state import SearchState
+from sssp import shortest_path_tree
+from arc_node import NO_NODE
+from exceptions import NoDirectedPathError, InvalidSnapshotError
+
+# Binary format of saved ArcFlags (version 1): a header (magic bytes, format
+# version, byte order marker, number of nodes, number of arcs, number of
+# regions), zero padded to HEADER_SIZE bytes and followed by the arrays
+# listed in SECTIONS, in native byte order.
+
+MAGIC = b'DIJKFLAG'
+VERSION = 1
+BYTE_ORDER_MARK = 0x01020304
+
+HEADER_FORMAT = '=8sIIQQQ'
+HEADER_SIZE = 64
+
+# (name, typecode, number of items: 'nodes', 'offsets' or 'arcs'), in the
+# order they're stored in the file; the flags' typecode depends on the
+# number of regions (see flags_typecode())
+SECTIONS = (
+    ('region', 'q', 'nodes'),
+    ('offsets', 'q', 'offsets'),
+    ('flags', None, 'arcs'),
+)
+
+# The regions' bitmasks are stored in the smallest unsigned integer type
+# holding one bit per region
+MAX_REGIONS = 64
+FLAGS_TYPECODES = ('B', 'H', 'I', 'L', 'Q')
+
+
+def flags_typecode(num_regions:int) -> str:
+    for typecode in FLAGS_TYPECODES:
+        if 8 * array(typecode).itemsize >= num_regions:
+            return typecode
+
+    raise ValueError(f"The number of regions can't exceed {MAX_REGIONS}")
+
+
+def grid_regions(num_side_nodes:int, blocks_per_side:int) -> array:
+    """
+    Partitions the nodes of a (num_side_nodes) * (num_side_nodes) grid graph
+    generated by grid_graph_gen.py into (blocks_per_side) * (blocks_per_side)
+    square blocks of adjacent nodes; returns the region of each node.
+    """
+    if not(1 <= blocks_per_side <= num_side_nodes):
+        raise ValueError("The blocks per side must be inside the range [1, num_side_nodes]")
+
+    # The block row/column of each grid row/column
+    blocks = [i * blocks_per_side // num_side_nodes for i in range(num_side_nodes)]
+
+    return array('q', (
+        block_row * blocks_per_side + block_col
+        for block_row in blocks
+        for block_col in blocks
+    ))
+
+
+def bfs_regions(graph:BaseGraph, num_regions:int, seed:int=None) -> array:
+    """
+    Partitions the nodes of any graph into "num_regions" regions of nearby
+    nodes, by a breadth-first search (ignoring the arcs' direction and cost)
+    from random seed nodes, which assigns each node to the region of the
+    closest seed; the nodes the seeds can't reach are assigned in the same
+    way, from new seeds taken in turn among them.
+
+    Returns the region of each node.
+    """
+    num_nodes = graph.num_nodes
+    if not(1 <= num_regions <= num_nodes):
+        raise ValueError("The number of regions must be inside the range [1, num_nodes]")
+
+    region = array('q', [NO_NODE]) * num_nodes
+    queue = deque()
+
+    def expand():
+        while queue:
+            node = queue.popleft()
+
+            for tail, head, _ in graph.out_arcs(node):
+                if region[head] == NO_NODE:
+                    region[head] = region[node]
+                    queue.append(head)
+
+            for tail, head, _ in graph.in_arcs(node):
+                if region[tail] == NO_NODE:
+                    region[tail] = region[node]
+                    queue.append(tail)
+
+    for index, node in enumerate(random.Random(seed).sample(range(num_nodes), num_regions)):
+        region[node] = index
+        queue.append(node)
+
+    expand()
+
+    next_region = 0
+    for node in range(num_nodes):
+        if region[node] == NO_NODE:
+            region[node] = next_region
+            next_region = (next_region + 1) % num_regions
+
+            queue.append(node)
+            expand()
+
+    return region
+
+
+class ArcFlags:
+    """
+    Arc flags preprocessing of a graph: given a partition of the nodes into
+    regions, each arc gets a bitmask with a bit set for each region it
+    leads to optimally, that is for each region containing the destination
+    of at least one shortest path starting with that arc.
+
+    A forward search towards a node of region r then only needs the arcs
+    whose flag r is set (see dijkstra_arc_flags()), skipping the ones
+    leading elsewhere.
+
+    The flags are computed from a reverse shortest path tree rooted at each
+    boundary node of each region (a node with an arc entering it from another
+    region): the arcs of those trees get the region's flag, along with all
+    the arcs inside the region. Any shortest path to a node of the region is
+    made of a path to the last boundary node it crosses (which the tree
+    replaces by one of the same cost) followed by arcs inside the region,
+    so the flagged arcs always hold a shortest path.
+
+    The bitmasks are stored in a flat array, in the same order as the arcs
+    returned by graph.out_arcs() for each node, starting at offsets[node];
+    they're only valid as long as the graph's arcs don't change (see
+    check_graph()).
+    """
+    __slots__ = (
+        'num_nodes',
+        'num_regions',
+
+        # The version of the graph the flags were computed for (see
+        # BaseGraph.mark_modified()); the flags read from a file are for
+        # the graph as loaded, before any change, hence for version 0
+        'graph_version',
+
+        # The region of each node
+        'region',
+
+        'offsets',
+        'flags',
+    )
+
+
+    @classmethod
+    def build(
+        cls,
+        graph:BaseGraph,
+        region:array,
+        progress=None) -> 'ArcFlags':
+        """
+        Preprocesses the specified graph, with the nodes partitioned into the
+        specified regions (see grid_regions() and bfs_regions()), numbered
+        from 0 up to MAX_REGIONS - 1.
+
+        "progress", if specified, is called with the number of boundary
+        nodes processed so far and their total number, after each one.
+        """
+        num_nodes = graph.num_nodes
+
+        if len(region) != num_nodes:
+            raise ValueError(f"Expected the regions of {num_nodes} nodes, found {len(region)}")
+
+        num_regions = max(region, default=-1) + 1
+        if min(region, default=0) < 0:
+            raise ValueError("The regions must be nonnegative integers")
+
+        offsets = array('q', [0]) * (num_nodes + 1)
+        heads = array('q')
+
+        for node in range(num_nodes):
+            heads.extend(head for _, head, _ in graph.out_arcs(node))
+            offsets[node + 1] = len(heads)
+
+        flags = array(flags_typecode(num_regions), [0]) * len(heads)
+
+        # The arcs inside each region, and the boundary nodes
+        boundary = set()
+        for tail in range(num_nodes):
+            for index in range(offsets[tail], offsets[tail + 1]):
+                head = heads[index]
+
+                if region[head] == region[tail]:
+                    flags[index] |= 1 << region[tail]
+                else:
+                    boundary.add(head)
+
+        for num_processed, boundary_node in enumerate(sorted(boundary), start=1):
+            bit = 1 << region[boundary_node]
+            succ = shortest_path_tree(graph, boundary_node, reverse=True).pred
+
+            for tail, head in enumerate(succ):
+                if head != NO_NODE:
+                    flags[heads.index(head, offsets[tail], offsets[tail + 1])] |= bit
+
+            if progress is not None:
+                progress(num_processed, len(boundary))
+
+        arc_flags = cls.__new__(cls)
+        arc_flags.num_nodes = num_nodes
+        arc_flags.num_regions = num_regions
+        arc_flags.graph_version = graph.version
+        arc_flags.region = array('q', region)
+        arc_flags.offsets = offsets
+        arc_flags.flags = flags
+
+        return arc_flags
+
+
+    @property
+    def num_arcs(self) -> int:
+        return len(self.flags)
+
+
+    def check_graph(self, graph:BaseGraph):
+        """
+        Raises ValueError if the flags weren't computed for the graph's
+        current arcs: its numbers of nodes and arcs must be the same, and
+        it mustn't have changed since.
+        """
+        if (self.num_nodes, self.num_arcs) != (graph.num_nodes, graph.num_arcs):
+            raise ValueError(
+                f"The arc flags are for {self.num_nodes} nodes and {self.num_arcs} "
+                f"arcs, the graph has {graph.num_nodes} nodes and {graph.num_arcs} arcs"
+            )
+
+        if self.graph_version != graph.version:
+            raise ValueError("The graph's arcs have changed since the arc flags were computed")
+
+
+    def out_flags(self, node:int) -> array:
+        """Returns the bitmasks of the arcs leaving the specified node."""
+        return self.flags[self.offsets[node]:self.offsets[node + 1]]
+
+
+    def save(self, file_bin:io.BufferedIOBase):
+        """Writes the preprocessed structure to a binary file."""
+        header = struct.pack(
+            HEADER_FORMAT,
+            MAGIC, VERSION, BYTE_ORDER_MARK,
+            self.num_nodes, self.num_arcs, self.num_regions
+        )
+        file_bin.write(header.ljust(HEADER_SIZE, b'\0'))
+
+        for name, _, _ in SECTIONS:
+            file_bin.write(getattr(self, name))
+
+
+    @classmethod
+    def load(cls, filename:str) -> 'ArcFlags':
+        """Reads a preprocessed structure written by save()."""
+        with open(filename, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE:
+                raise InvalidSnapshotError(filename, "Truncated header")
+
+            magic, version, byte_order_mark, num_nodes, num_arcs, num_regions = struct.unpack_from(
+                HEADER_FORMAT, header
+            )
+
+            if magic != MAGIC:
+                raise InvalidSnapshotError(filename, "Not an arc flags file")
+
+            if version != VERSION:
+                raise InvalidSnapshotError(filename, f"Unsupported format version {version}")
+
+            if byte_order_mark != BYTE_ORDER_MARK:
+                raise InvalidSnapshotError(
+                    filename, f"Byte order differs from this machine's ({sys.byteorder})"
+                )
+
+            if num_regions > MAX_REGIONS:
+                raise InvalidSnapshotError(filename, f"Too many regions ({num_regions})")
+
+            sizes = {
+                'nodes': num_nodes,
+                'offsets': num_nodes + 1,
+                'arcs': num_arcs,
+            }
+
+            arc_flags = cls.__new__(cls)
+            arc_flags.num_nodes = num_nodes
+            arc_flags.num_regions = num_regions
+            arc_flags.graph_version = 0
+
+            for name, typecode, size in SECTIONS:
+                items = array(typecode or flags_typecode(num_regions))
+                try:
+                    items.fromfile(f, sizes[size])
+                except EOFError:
+                    raise InvalidSnapshotError(filename, "Truncated file") from None
+
+                setattr(arc_flags, name, items)
+
+            if f.read(1):
+                raise InvalidSnapshotError(filename, "Unexpected data after the last section")
+
+        return arc_flags
+
+
+def dijkstra_arc_flags(
+    graph:BaseGraph,
+    src:int,
+    dest:int,
+    arc_flags:ArcFlags,
+    queue:str=AUTO_QUEUE,
+    state:SearchState=None) -> deque:
+    """
+    Arc flags query: the forward Dijkstra algorithm, relaxing only the arcs
+    whose flag for the destination node's region is set (see ArcFlags).
+
+    Raises ValueError if the flags weren't computed for the graph's current
+    arcs (see ArcFlags.check_graph()). See algorithms.dijkstra_fwd() for the
+    "queue" and "state" parameters.
+    """
+    arc_flags.check_graph(graph)
+
+    state = graph.init_state(src, dest, queue, state)
+
+    dest_bit = 1 << arc_flags.region[dest]
+    flags = arc_flags.flags
+    offsets = arc_flags.offsets
+
+    while state.temp_fwd:
+        # Get the temporary node with the minimum distance from src
+        i = state.make_node_perm_fwd()
+
+        if i == dest:
+            # We found the optimal path from the source to the destination node
+            break
+
+        i_dist_s = state.dist_s[i]
+
+        for (_, j, cost), arc_flag in zip(graph.out_arcs(i), flags[offsets[i]:offsets[i + 1]]):
+            # Skip the arcs which don't lead optimally to dest's region
+            if arc_flag & dest_bit and state.dist_s[j] > i_dist_s + cost:
+                state.dist_s[j] = i_dist_s + cost
+                state.pred[j] = i
+                state.temp_fwd.push(j, state.dist_s[j])
+
+    # If the destination node doesn't have a predecessor,
+    # there is no directed path from src to dest
+    if state.pred[dest] == NO_NODE:
+        raise NoDirectedPathError(src, dest)
+
+    # Return the path from the source to the destination,
+    # by tracing back the destination node's predecessors.
+    src_dest_path = deque([dest])
+    curr_node = dest
+
+    while (curr_node := state.pred[curr_node]) != NO_NODE:
+        src_dest_path.appendleft(curr_node)
+
+    return src_dest_path
+
+
+def validate_args(argv) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='arc_flags.py',
+        description=(
+            "Computes the arc flags of a graph, usable by dijkstra_cmp.py "
+            "through the --arc-flags option."
+        )
+    )
+    parser.add_argument('input_graph', help="either a .json/.json.gz file or a .snap binary snapshot")
+    parser.add_argument('output_flags', help="the output file, with .flags extension")
+    parser.add_argument(
+        '--regions', type=int, default=16,
+        help=(
+            f"the number of regions found by a breadth-first search from "
+            f"random nodes (default: 16, at most {MAX_REGIONS})"
+        )
+    )
+    parser.add_argument(
+        '--grid-side', type=int, metavar='NUM_SIDE_NODES',
+        help=(
+            "partition a grid graph generated by grid_graph_gen.py, with the "
+            "specified number of side nodes, into square blocks instead"
+        )
+    )
+    parser.add_argument(
+        '--blocks', type=int, default=4,
+        help="the number of blocks per side, with --grid-side (default: 4)"
+    )
+    parser.add_argument('--seed', type=int, help="seed for the random nodes of the breadth-first search")
+
+    args = parser.parse_args(argv[1:])
+
+    if not args.input_graph.endswith( ('.json', '.json.gz', '.snap') ):
+        parser.error("Parameter 'input_graph' must have .json, .json.gz or .snap extension")
+
+    if not args.output_flags.endswith('.flags'):
+        parser.error("Parameter 'output_flags' must have .flags extension")
+
+    if not(1 <= args.regions <= MAX_REGIONS):
+        parser.error(f"Parameter 'regions' must be inside the range [1, {MAX_REGIONS}]")
+
+    if args.grid_side is not None and not(1 <= args.blocks ** 2 <= MAX_REGIONS):
+        parser.error(f"Parameter 'blocks' must be inside the range [1, {MAX_REGIONS ** 0.5:.0f}]")
+
+    return args
+
+
+if __name__ == '__main__':
+    from csr_graph import CSRGraph
+    from graph_loader import open_graph_file
+    from snapshot import open_snapshot
+
+    args = validate_args(sys.argv)
+
+    print("Building the graph...", end=' ', flush=True)
+    if args.input_graph.endswith('.snap'):
+        graph = open_snapshot(args.input_graph)
+    else:
+        with open_graph_file(args.input_graph) as f:
+            graph = CSRGraph(f)
+    print('done')
+
+    try:
+        if args.grid_side is not None:
+            if args.grid_side ** 2 != graph.num_nodes:
+                raise ValueError(f"The graph has {graph.num_nodes} nodes, not {args.grid_side}^2")
+
+            region = grid_regions(args.grid_side, args.blocks)
+        else:
+            region = bfs_regions(graph, args.regions, args.seed)
+    except ValueError as exc:
+        print(exc)
+        quit()
+
+    def print_progress(num_processed:int, num_boundary:int):
+        print(f'\rComputing the flags... {num_processed}/{num_boundary} boundary nodes', end='', flush=True)
+
+    print("Computing the flags...", end=' ', flush=True)
+    arc_flags = ArcFlags.build(graph, region, print_progress)
+    print(' done')
+
+    with open(args.output_flags, 'wb') as f:
+        arc_flags.save(f)
+    print("The arc flags have been saved.")
@@ -0,0 +1,255 @@
+from array import array
+from itertools import islice, repeat
+from operator import add, eq, mul
+
+from search_state import SearchState
+from frontier import AUTO_QUEUE
+from exceptions import InvalidArcError, DuplicateArcError
+from arc_node import Arc
+
+# The maximum arc cost for which AUTO_QUEUE picks Dial's buckets, whose
+# extractions scan up to max_cost + 1 buckets each (see frontier.py)
+DIAL_MAX_COST = 256
+
+class BaseGraph:
+    """
+    Base class for the graph representations (see graph.py and csr_graph.py).
+
+    It defines the adjacency interface that the algorithms in algorithms.py
+    rely upon; derived classes only have to store the arcs and implement
+    out_arcs()/in_arcs().
+
+    The graph's topology is never modified by the algorithms, which keep
+    their state in a separate SearchState object instead.
+    """
+    __slots__ = (
+        'num_nodes',
+
+        # The SearchState used by the algorithms when none is specified,
+        # allocated on first use
+        'state',
+
+        # Incremented by each change to the graph's arcs, so that the
+        # results computed on a previous version can be recognized as stale
+        # (see query_cache.py)
+        'version',
+
+        # The (version, max_integer_cost()) pair of the last version whose
+        # costs have been scanned, computed on first use
+        'integer_costs',
+    )
+
+
+    def init_nodes(self, num_nodes:int):
+        self.num_nodes = num_nodes
+        self.state = None
+        self.version = 0
+        self.integer_costs = None
+
+
+    def mark_modified(self):
+        """Records a change to the graph's arcs, by incrementing its version."""
+        self.version += 1
+
+
+    def new_state(self) -> SearchState:
+        """Returns a new SearchState for running queries on this graph."""
+        return SearchState(self.num_nodes)
+
+
+    def default_state(self) -> SearchState:
+        """
+        Returns the graph's own SearchState, used by the algorithms when
+        none is specified.
+        """
+        if self.state is None:
+            self.state = self.new_state()
+
+        return self.state
+
+
+    def out_arcs(self, node:int):
+        """
+        Returns an iterable of (tail, head, cost) tuples, representing the
+        arcs leaving the specified node.
+        """
+        raise NotImplementedError
+
+
+    def in_arcs(self, node:int):
+        """
+        Returns an iterable of (tail, head, cost) tuples, representing the
+        arcs entering the specified node.
+        """
+        raise NotImplementedError
+
+
+    def arc_costs(self):
+        """Returns an iterable over the costs of all the arcs."""
+        raise NotImplementedError
+
+
+    def max_integer_cost(self) -> int:
+        """
+        Returns the maximum arc cost if all the costs are integers (0 for a
+        graph without arcs), None otherwise; the costs are only scanned
+        again after a change to the graph.
+        """
+        if self.integer_costs is None or self.integer_costs[0] != self.version:
+            costs = self.arc_costs()
+
+            if all(map(float.is_integer, map(float, costs))):
+                max_cost = int(max(self.arc_costs(), default=0))
+            else:
+                max_cost = None
+
+            self.integer_costs = (self.version, max_cost)
+
+        return self.integer_costs[1]
+
+
+    def select_queue(self, queue:str) -> str:
+        """
+        Returns the frontier implementation to use for the specified
+        "queue" parameter: AUTO_QUEUE picks Dial's buckets if all the arc
+        costs are integers up to DIAL_MAX_COST, and the binary heap otherwise
+        (the radix heap's redistributions, run by the interpreter, are slower
+        than heapq's C code on the graphs of benchmark.py, so it's only used
+        when explicitly requested).
+
+        Raises ValueError if the 'dial' or 'radix' queue is requested
+        for a graph whose costs aren't all integers.
+        """
+        if queue == AUTO_QUEUE:
+            max_cost = self.max_integer_cost()
+            return 'dial' if max_cost is not None and max_cost <= DIAL_MAX_COST else 'heap'
+
+        if queue in ('dial', 'radix') and self.max_integer_cost() is None:
+            raise ValueError(f"The '{queue}' queue requires integer arc costs")
+
+        return queue
+
+
+    def resolve_queue(self, queue:str) -> tuple:
+        """
+        Returns the (queue, max_cost) pair to build the frontiers with (see
+        frontier.make_frontier()): the frontier implementation picked by
+        select_queue(), and the maximum arc cost if it's 'dial' (None
+        otherwise).
+        """
+        queue = self.select_queue(queue)
+        max_cost = self.max_integer_cost() if queue == 'dial' else None
+
+        return (queue, max_cost)
+
+
+    def init_state(
+        self,
+        src:int,
+        dest:int,
+        queue:str='heap',
+        state:SearchState=None) -> SearchState:
+        """
+        Validates the (src, dest) pair and prepares the specified SearchState
+        (or the graph's own one, if None) for an execution of one of the
+        three variants of Dijkstra's algorithm; returns the prepared state.
+
+        See SearchState.init() for the "queue" parameter, which may also be
+        AUTO_QUEUE (see select_queue()).
+        """
+        self._validate_src_dest(src, dest)
+
+        queue, max_cost = self.resolve_queue(queue)
+
+        if state is None:
+            state = self.default_state()
+
+        state.init(src, dest, queue, max_cost)
+
+        return state
+
+
+    def _validate_src_dest(self, src:int, dest:int):
+        num_nodes = self.num_nodes
+
+        if not(0 <= src < num_nodes):
+            raise KeyError(
+                f"The source node {src} is not inside the range [0, {num_nodes-1}]"
+            )
+        if not(0 <= dest < num_nodes):
+            raise KeyError(
+                f"The destination node {dest} is not inside the range [0, {num_nodes-1}]"
+            )
+        if src == dest:
+            raise ValueError("The source/destination values must be different")
+
+
+    def _validate_arcs(self, tails:array, heads:array, costs:array):
+        """
+        Validates all the arcs at once, given as three parallel arrays, with
+        the same checks as _validate_arc() performed on the whole arrays by
+        builtin functions (min/max, and the sorted tail * num_nodes + head
+        keys for the duplicates), without running Python code for each arc.
+
+        If any check fails, the arcs are scanned one at a time to raise the
+        same exception as _validate_arc() for the first offending arc.
+        """
+        num_nodes = self.num_nodes
+        num_arcs = len(tails)
+
+        if num_arcs == 0:
+            return
+
+        if (
+            min(tails) >= 0 and max(tails) < num_nodes
+            and min(heads) >= 0 and max(heads) < num_nodes
+            and min(costs) >= 0
+            and not any(map(eq, tails, heads))
+            and not self._has_duplicate_keys(tails, heads)):
+            return
+
+        # In order to find the first duplicate arc, we'll insert each
+        # (tail, head) pair (without the cost, since two arcs with the same
+        # (tail, head) values but different cost are still duplicates) inside
+        # a list of sets (one set for each node).
+        arc_sets = [set() for _ in range(num_nodes)]
+
+        for arc in map(Arc, tails, heads, costs):
+            self._validate_arc(arc, arc_sets)
+            arc_sets[arc.tail].add( (arc.tail, arc.head) )
+
+
+    def _has_duplicate_keys(self, tails:array, heads:array) -> bool:
+        """
+        Returns True if any two arcs have the same (tail, head) pair, whose
+        tail * num_nodes + head keys are adjacent once sorted; the sorted
+        keys are packed in an array, 8 bytes each, rather than hashed in a
+        set of ints (sorted() only holds them as ints while it runs).
+        """
+        keys = array('q', sorted(map(add, map(mul, tails, repeat(self.num_nodes)), heads)))
+        return any(map(eq, keys, islice(keys, 1, None)))
+
+
+    def _validate_arc(self, arc:Arc, arc_sets:list[set]):
+        self._validate_arc_values(arc)
+
+        arc_without_cost = (arc.tail, arc.head)
+        if arc_without_cost in arc_sets[arc.tail]:
+            raise DuplicateArcError(arc_without_cost)
+
+
+    def _validate_arc_values(self, arc:Arc):
+        """Validates the arc's own values, without checking for duplicates."""
+        num_nodes = self.num_nodes
+
+        if  not(0 <= arc.tail < num_nodes):
+            raise InvalidArcError(arc, f"Tail not in range [0, {num_nodes-1}]")
+
+        if  not(0 <= arc.head < num_nodes):
+            raise InvalidArcError(arc, f"Head not in range [0, {num_nodes-1}]")
+
+        if arc.cost < 0:
+            raise InvalidArcError(arc, "Negative cost")
+
+        if arc.tail == arc.head:
+            raise InvalidArcError(arc, "Loopback arc: tail is equal to head")
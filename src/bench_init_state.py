@@ -0,0 +1,77 @@
+import random, sys
+from time import perf_counter
+
+from csr_graph import CSRGraph
+from algorithms import dijkstra_fwd
+from grid_graph_gen import grid_arcs, arc_arrays
+
+
+def validate_args(argv) -> tuple:
+    usage_msg = (
+        "\nUsage:\n"
+        "python bench_init_state.py <num_side_nodes> <num_queries>\n"
+    )
+    if len(argv) != 3:
+        print(usage_msg)
+        quit()
+
+    try:
+        num_side_nodes = int(argv[1])
+    except ValueError:
+        print("Parameter 'num_side_nodes' must be integer")
+        quit()
+
+    try:
+        num_queries = int(argv[2])
+    except ValueError:
+        print("Parameter 'num_queries' must be integer")
+        quit()
+
+    return (num_side_nodes, num_queries)
+
+
+if __name__ == '__main__':
+    # Measures the per-query overhead of resetting the search state on a
+    # large grid graph, for short queries (between adjacent nodes):
+    #   - "full": reallocating all the labels, as it used to be done;
+    #   - "touched": resetting only the nodes touched by the previous query.
+    num_side_nodes, num_queries = validate_args(sys.argv)
+
+    random.seed(0)
+
+    print("Building the grid graph...", end=' ', flush=True)
+    graph = CSRGraph.from_arcs(
+        num_side_nodes ** 2, *arc_arrays(grid_arcs(num_side_nodes, 20, random.Random(0)))
+    )
+    print(f'done ({graph.num_nodes} nodes, {graph.num_arcs} arcs)\n')
+
+    queries = list()
+    for _ in range(num_queries):
+        src = random.randrange(graph.num_nodes - 1)
+        queries.append( (src, src + 1) )
+
+    full_reset_time = 0
+    touched_reset_time = 0
+    search_time = 0
+
+    state = graph.new_state()
+
+    for src, dest in queries:
+        dijkstra_fwd(graph, src, dest, state=state)
+
+        start = perf_counter()
+        graph.new_state()
+        full_reset_time += perf_counter() - start
+
+        start = perf_counter()
+        state.reset()
+        touched_reset_time += perf_counter() - start
+
+        start = perf_counter()
+        dijkstra_fwd(graph, src, dest, state=state)
+        search_time += perf_counter() - start
+
+    print(f'Queries: {num_queries}')
+    print(f'{"Full reset":<24}{1000 * full_reset_time / num_queries:>12.4f} ms/query')
+    print(f'{"Touched nodes reset":<24}{1000 * touched_reset_time / num_queries:>12.4f} ms/query')
+    print(f'{"Search (incl. reset)":<24}{1000 * search_time / num_queries:>12.4f} ms/query')
@@ -0,0 +1,75 @@
+import random, sys
+from time import perf_counter
+
+from csr_graph import CSRGraph
+from algorithms import dijkstra_bidir
+from parallel_bidir import ParallelBidirSearch
+from grid_graph_gen import grid_arcs, arc_arrays
+from exceptions import NoDirectedPathError
+
+
+def validate_args(argv) -> tuple:
+    usage_msg = (
+        "\nUsage:\n"
+        "python bench_parallel_bidir.py <num_side_nodes> <num_queries>\n"
+    )
+    if len(argv) != 3:
+        print(usage_msg)
+        quit()
+
+    try:
+        num_side_nodes = int(argv[1])
+    except ValueError:
+        print("Parameter 'num_side_nodes' must be integer")
+        quit()
+
+    try:
+        num_queries = int(argv[2])
+    except ValueError:
+        print("Parameter 'num_queries' must be integer")
+        quit()
+
+    return (num_side_nodes, num_queries)
+
+
+def time_queries(path_func, queries:list) -> float:
+    start = perf_counter()
+
+    for src, dest in queries:
+        try:
+            path_func(src, dest)
+        except NoDirectedPathError:
+            pass
+
+    return perf_counter() - start
+
+
+if __name__ == '__main__':
+    # Compares the sequential bidirectional Dijkstra's algorithm with the
+    # parallel one (see parallel_bidir.py), on random queries over a large
+    # grid graph; the parallel search can only be faster with at least two
+    # free CPU cores.
+    num_side_nodes, num_queries = validate_args(sys.argv)
+
+    rng = random.Random(0)
+
+    print("Building the grid graph...", end=' ', flush=True)
+    graph = CSRGraph.from_arcs(
+        num_side_nodes ** 2, *arc_arrays(grid_arcs(num_side_nodes, 20, rng))
+    )
+    print(f'done ({graph.num_nodes} nodes, {graph.num_arcs} arcs)\n')
+
+    queries = [tuple(rng.sample(range(graph.num_nodes), 2)) for _ in range(num_queries)]
+
+    state = graph.new_state()
+    sequential_time = time_queries(
+        lambda src, dest: dijkstra_bidir(graph, src, dest, state=state), queries
+    )
+
+    with ParallelBidirSearch(graph) as search:
+        parallel_time = time_queries(search.path, queries)
+
+    print(f'Queries: {num_queries}')
+    print(f'{"Sequential":<24}{1000 * sequential_time / num_queries:>12.4f} ms/query')
+    print(f'{"Parallel":<24}{1000 * parallel_time / num_queries:>12.4f} ms/query')
+    print(f'{"Speedup":<24}{sequential_time / parallel_time:>12.2f}x')
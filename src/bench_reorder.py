@@ -0,0 +1,111 @@
+import random, sys
+from array import array
+from time import perf_counter
+
+from csr_graph import CSRGraph
+from algorithms import dijkstra_fwd
+from grid_graph_gen import generate_graph, arc_arrays
+from reorder import ORDERINGS, node_order, reorder_graph, RenumberedAlgorithm
+from exceptions import NoDirectedPathError
+
+
+def validate_args(argv) -> tuple:
+    usage_msg = (
+        "\nUsage:\n"
+        "python bench_reorder.py <grid4|geometric> <size> <num_queries>\n"
+    )
+    if len(argv) != 4:
+        print(usage_msg)
+        quit()
+
+    topology = argv[1]
+    if topology not in ('grid4', 'geometric'):
+        print("Parameter 'topology' must be either 'grid4' or 'geometric'")
+        quit()
+
+    try:
+        size = int(argv[2])
+    except ValueError:
+        print("Parameter 'size' must be integer")
+        quit()
+
+    try:
+        num_queries = int(argv[3])
+    except ValueError:
+        print("Parameter 'num_queries' must be integer")
+        quit()
+
+    return (topology, size, num_queries)
+
+
+def build_graph(topology:str, size:int) -> tuple:
+    """
+    Returns the (graph, x, y) tuple of a random graph of the specified
+    topology, whose node IDs are in random order, like the ones of a JSON
+    file unrelated to the graph's layout; the grid nodes' coordinates are
+    their (column, row) pair.
+    """
+    num_nodes, batches, extra_fields = generate_graph(topology, size, 20, seed=0)
+    tails, heads, costs = arc_arrays(batches)
+
+    if topology == 'geometric':
+        # The IDs are already unrelated to the points' positions
+        return (CSRGraph.from_arcs(num_nodes, tails, heads, costs), extra_fields['x'], extra_fields['y'])
+
+    # The grid's IDs follow its rows, hence they're shuffled; seeded apart
+    # from the queries, which would otherwise follow the same random sequence
+    shuffled = list(range(num_nodes))
+    random.Random(1).shuffle(shuffled)
+
+    tails = array('q', map(shuffled.__getitem__, tails))
+    heads = array('q', map(shuffled.__getitem__, heads))
+
+    x = array('d', [0.0]) * num_nodes
+    y = array('d', [0.0]) * num_nodes
+    for node, new_node in enumerate(shuffled):
+        x[new_node] = node % size
+        y[new_node] = node // size
+
+    return (CSRGraph.from_arcs(num_nodes, tails, heads, costs), x, y)
+
+
+def time_queries(path_func, graph, queries:list) -> float:
+    state = graph.new_state()
+    start = perf_counter()
+
+    for src, dest in queries:
+        try:
+            path_func(graph, src, dest, state=state)
+        except NoDirectedPathError:
+            pass
+
+    return perf_counter() - start
+
+
+if __name__ == '__main__':
+    # Measures the forward Dijkstra's query times on a graph with randomly
+    # ordered node IDs, before and after reordering its nodes; the queries
+    # take and return the original IDs in all cases.
+    topology, size, num_queries = validate_args(sys.argv)
+
+    print("Building the graph...", end=' ', flush=True)
+    graph, x, y = build_graph(topology, size)
+    print(f'done ({graph.num_nodes} nodes, {graph.num_arcs} arcs)\n')
+
+    random.seed(0)
+    queries = [tuple(random.sample(range(graph.num_nodes), 2)) for _ in range(num_queries)]
+
+    print(f'Queries: {num_queries}')
+    query_time = time_queries(dijkstra_fwd, graph, queries)
+    print(f'{"original":<24}{1000 * query_time / num_queries:>12.3f} ms/query')
+
+    for ordering in ORDERINGS:
+        start = perf_counter()
+        reordered, node_map = reorder_graph(graph, node_order(graph, ordering, x, y))
+        reorder_time = perf_counter() - start
+
+        query_time = time_queries(RenumberedAlgorithm(dijkstra_fwd, node_map), reordered, queries)
+        print(
+            f'{ordering:<24}{1000 * query_time / num_queries:>12.3f} ms/query'
+            f'   (reordering: {1000 * reorder_time:.0f} ms)'
+        )
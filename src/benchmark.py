@@ -0,0 +1,295 @@
+import argparse, json, platform, random, statistics, sys, tracemalloc
+from time import perf_counter
+
+from csr_graph import CSRGraph
+from frontier import FRONTIERS, AUTO_QUEUE
+from queries import ALGORITHMS
+from grid_graph_gen import generate_graph, arc_arrays, TOPOLOGIES
+from exceptions import NoDirectedPathError
+from search_stats import SearchStats
+
+# Version of the results' JSON format
+FORMAT_VERSION = 1
+
+
+def build_graph(topology:str, size:int, max_cost:int, seed:int) -> CSRGraph:
+    num_nodes, batches, _ = generate_graph(topology, size, max_cost, seed)
+    return CSRGraph.from_arcs(num_nodes, *arc_arrays(batches))
+
+
+def random_queries(graph:CSRGraph, num_queries:int, seed:int) -> list:
+    """Returns a fixed list of random (src, dest) pairs for the given seed."""
+    rng = random.Random(seed)
+    return [tuple(rng.sample(range(graph.num_nodes), 2)) for _ in range(num_queries)]
+
+
+def run_queries(graph:CSRGraph, alg_func, queries:list, queue:str, state) -> float:
+    """Runs the algorithm on all the queries, and returns the elapsed time."""
+    start = perf_counter()
+
+    for src, dest in queries:
+        try:
+            alg_func(graph, src, dest, queue=queue, state=state)
+        except NoDirectedPathError:
+            pass
+
+    return perf_counter() - start
+
+
+def search_effort(graph:CSRGraph, alg_func, queries:list, queue:str, state) -> tuple:
+    """
+    Returns the (settled nodes, relaxed arcs) totals of the algorithm over
+    all the queries, counted by a SearchStats (see search_stats.py); the
+    relaxed arcs are the ones leaving (entering) the nodes made permanent
+    by the forward (reverse) search.
+    """
+    stats = SearchStats()
+
+    for src, dest in queries:
+        try:
+            alg_func(graph, src, dest, queue=queue, state=state, stats=stats)
+        except NoDirectedPathError:
+            pass
+
+    return (stats.total('settled'), stats.total('scanned_arcs'))
+
+
+def peak_memory(graph:CSRGraph, alg_func, queries:list, queue:str, state) -> int:
+    """
+    Returns the highest memory usage (in bytes) allocated by a single query,
+    traced by tracemalloc; this is measured apart from the execution times,
+    since tracing slows everything down.
+    """
+    peak = 0
+    tracemalloc.start()
+
+    for src, dest in queries:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+
+        try:
+            alg_func(graph, src, dest, queue=queue, state=state)
+        except NoDirectedPathError:
+            pass
+
+        _, query_peak = tracemalloc.get_traced_memory()
+        peak = max(peak, query_peak - baseline)
+
+    tracemalloc.stop()
+
+    return peak
+
+
+def benchmark(args) -> dict:
+    """
+    Runs the benchmark described by the command line arguments, and returns
+    its results in the JSON format (see README.md).
+    """
+    results = list()
+
+    for size in args.sizes:
+        print(f"Generating the {args.topology} graph of size {size}...", end=' ', file=sys.stderr, flush=True)
+        graph = build_graph(args.topology, size, args.max_cost, args.seed)
+        queries = random_queries(graph, args.queries, args.seed)
+        state = graph.new_state()
+        print(f'done ({graph.num_nodes} nodes, {graph.num_arcs} arcs)', file=sys.stderr)
+
+        for queue in args.queue:
+            for alg_name, alg_func in ALGORITHMS.items():
+                for _ in range(args.warmup):
+                    run_queries(graph, alg_func, queries, queue, state)
+
+                # Mean time per query of each repetition
+                times = [
+                    run_queries(graph, alg_func, queries, queue, state) / len(queries)
+                    for _ in range(args.repetitions)
+                ]
+
+                settled_nodes, relaxed_arcs = search_effort(graph, alg_func, queries, queue, state)
+
+                results.append({
+                    'topology': args.topology,
+                    'size': size,
+                    'num_nodes': graph.num_nodes,
+                    'num_arcs': graph.num_arcs,
+                    'algorithm': alg_name,
+                    'queue': queue,
+                    'time_mean': statistics.mean(times),
+                    'time_median': statistics.median(times),
+                    'time_stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+                    'time_min': min(times),
+                    'settled_nodes': settled_nodes / len(queries),
+                    'relaxed_arcs': relaxed_arcs / len(queries),
+                    'peak_memory': peak_memory(graph, alg_func, queries, queue, state),
+                })
+
+    return {
+        'format_version': FORMAT_VERSION,
+        'config': {
+            'topology': args.topology,
+            'sizes': args.sizes,
+            'max_cost': args.max_cost,
+            'queries': args.queries,
+            'repetitions': args.repetitions,
+            'warmup': args.warmup,
+            'seed': args.seed,
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'system': platform.system(),
+        },
+        'results': results,
+    }
+
+
+def result_key(result:dict) -> tuple:
+    return (result['topology'], result['size'], result['queue'], result['algorithm'])
+
+
+def compare(results:dict, baseline:dict) -> list:
+    """
+    Returns the (result, baseline result, ratio) tuples of the results which
+    also appear in the baseline, where "ratio" is the ratio between their
+    mean times (above 1 for slowdowns).
+    """
+    baseline_results = {result_key(result): result for result in baseline['results']}
+
+    comparisons = list()
+    for result in results['results']:
+        baseline_result = baseline_results.get(result_key(result))
+        if baseline_result is not None:
+            ratio = result['time_mean'] / baseline_result['time_mean']
+            comparisons.append( (result, baseline_result, ratio) )
+
+    return comparisons
+
+
+def print_results(results:dict, comparisons:list, threshold:float, file=sys.stdout):
+    ratios = {result_key(result): ratio for result, _, ratio in comparisons}
+
+    header = (
+        f"{'Size':>8}{'Queue':>6}  {'Algorithm':<16}{'Mean ms':>10}{'Stdev ms':>10}"
+        f"{'Settled':>10}{'Relaxed':>10}{'Peak KiB':>10}"
+    )
+    if comparisons:
+        header += f"{'vs base':>10}"
+
+    print(header, file=file)
+    print(len(header) * '-', file=file)
+
+    for result in results['results']:
+        row = (
+            f"{result['size']:>8}{result['queue']:>6}  {result['algorithm']:<16}"
+            f"{1000 * result['time_mean']:>10.3f}{1000 * result['time_stdev']:>10.3f}"
+            f"{result['settled_nodes']:>10.1f}{result['relaxed_arcs']:>10.1f}"
+            f"{result['peak_memory'] / 1024:>10.1f}"
+        )
+
+        ratio = ratios.get(result_key(result))
+        if ratio is not None:
+            row += f"{ratio:>9.2f}x"
+            if ratio > 1 + threshold:
+                row += '  REGRESSION'
+
+        print(row, file=file)
+
+
+def validate_args(argv) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='benchmark.py',
+        description=(
+            "Benchmarks the Forward, Reverse and Bidirectional Dijkstra's "
+            "algorithms on generated graphs of increasing size, with a fixed "
+            "seeded set of random queries."
+        )
+    )
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[50, 100, 200],
+        help="the sizes of the generated graphs (see grid_graph_gen.py; default: 50 100 200)"
+    )
+    parser.add_argument(
+        '--topology', choices=TOPOLOGIES, default='grid4',
+        help="the topology of the generated graphs (default: grid4)"
+    )
+    parser.add_argument(
+        '--max-cost', type=int, default=100,
+        help="the maximum arc cost of the generated graphs (default: 100)"
+    )
+    parser.add_argument(
+        '--queries', type=int, default=20,
+        help="the number of random queries on each graph (default: 20)"
+    )
+    parser.add_argument(
+        '--repetitions', type=int, default=5,
+        help="how many times the queries are timed (default: 5)"
+    )
+    parser.add_argument(
+        '--warmup', type=int, default=1,
+        help="how many untimed runs of the queries precede the timed ones (default: 1)"
+    )
+    parser.add_argument(
+        '--seed', type=int, default=0,
+        help="seed for the generated graphs and queries (default: 0)"
+    )
+    parser.add_argument(
+        '--queue', nargs='+', choices=[*FRONTIERS, AUTO_QUEUE], default=[AUTO_QUEUE],
+        help="the queue type(s) to run the algorithms with (default: auto)"
+    )
+    parser.add_argument(
+        '--output', metavar='OUTPUT_JSON',
+        help="save the results to the specified JSON file"
+    )
+    parser.add_argument(
+        '--baseline', metavar='BASELINE_JSON',
+        help="compare the mean times with the results saved by a previous run"
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=0.10,
+        help=(
+            "the relative slowdown over the baseline reported as a regression "
+            "(default: 0.10, that is 10%%)"
+        )
+    )
+
+    args = parser.parse_args(argv[1:])
+
+    if min(args.sizes) < 2:
+        parser.error("Parameter 'sizes' must be at least 2")
+
+    if args.queries <= 0 or args.repetitions <= 0:
+        parser.error("Parameters 'queries' and 'repetitions' must be positive")
+
+    if args.warmup < 0:
+        parser.error("Parameter 'warmup' must be nonnegative")
+
+    return args
+
+
+if __name__ == '__main__':
+    args = validate_args(sys.argv)
+
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        if baseline.get('format_version') != FORMAT_VERSION:
+            print(f"Unsupported baseline format version: {baseline.get('format_version')}")
+            quit()
+
+    results = benchmark(args)
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    comparisons = list() if baseline is None else compare(results, baseline)
+
+    print(file=sys.stderr)
+    print_results(results, comparisons, args.threshold)
+
+    # A nonzero exit status makes regressions visible to scripts
+    if any(ratio > 1 + args.threshold for _, _, ratio in comparisons):
+        sys.exit(1)
@@ -0,0 +1,613 @@
+import heapq, io, struct, sys
+from array import array
+from collections import deque
+
+from base_graph import BaseGraph
+from frontier import AUTO_QUEUE
+from csr_graph import build_csr
+from search_state import SearchState
+from arc_node import NO_NODE
+from exceptions import NoDirectedPathError, InvalidSnapshotError
+
+# Binary format of a saved ContractionHierarchy (version 1): a header
+# (magic bytes, format version, byte order marker, number of nodes, number of
+# upward arcs, number of downward arcs), zero padded to HEADER_SIZE bytes and
+# followed by the arrays listed in SECTIONS, in native byte order.
+
+MAGIC = b'DIJKCHRC'
+VERSION = 1
+BYTE_ORDER_MARK = 0x01020304
+
+HEADER_FORMAT = '=8sIIQQQ'
+HEADER_SIZE = 64
+
+# (name, typecode, number of items: 'nodes', 'offsets', 'up' or 'down'),
+# in the order they're stored in the file
+SECTIONS = (
+    ('rank', 'q', 'nodes'),
+    ('up_offsets', 'q', 'offsets'),
+    ('up_heads', 'q', 'up'),
+    ('up_costs', 'd', 'up'),
+    ('up_middles', 'q', 'up'),
+    ('down_offsets', 'q', 'offsets'),
+    ('down_tails', 'q', 'down'),
+    ('down_costs', 'd', 'down'),
+    ('down_middles', 'q', 'down'),
+)
+
+
+class ContractionHierarchy:
+    """
+    Contraction Hierarchies preprocessing of a graph.
+
+    The nodes are "contracted" one at a time, in order of importance: each
+    contracted node is removed from the graph, and shortcut arcs are added
+    between its remaining neighbours whenever it lies on the only shortest
+    path between them. A node's rank is its position in the contraction order.
+
+    Every shortest path of the original graph then has a counterpart made
+    of an "upward" part (arcs towards nodes of higher rank) followed by a
+    "downward" part (arcs towards nodes of lower rank), so queries only
+    need a forward search on the upward arcs and a reverse search on the
+    downward ones, both settling a tiny portion of the graph (see
+    dijkstra_ch()).
+
+    Both sets of arcs are stored in CSR format (see csr_graph.py):
+        - The upward arcs leaving node i are in the range
+          [up_offsets[i], up_offsets[i+1]) of "up_heads"/"up_costs"/"up_middles";
+        - The downward arcs entering node j (that is, the upward arcs of
+          the reverse search from j) are in the range
+          [down_offsets[j], down_offsets[j+1]) of
+          "down_tails"/"down_costs"/"down_middles".
+
+    Each arc's "middle" value is the contracted node a shortcut bypasses
+    (NO_NODE for the original graph's arcs), so that shortcuts can be
+    unpacked back into the original arcs.
+    """
+    __slots__ = (
+        'num_nodes',
+        'rank',
+
+        'up_offsets',
+        'up_heads',
+        'up_costs',
+        'up_middles',
+
+        'down_offsets',
+        'down_tails',
+        'down_costs',
+        'down_middles',
+    )
+
+
+    @classmethod
+    def build(
+        cls,
+        graph:BaseGraph,
+        witness_limit:int=500,
+        progress=None) -> 'ContractionHierarchy':
+        """
+        Preprocesses the specified graph.
+
+        "witness_limit" is the maximum number of nodes settled by each
+        witness search (the local search looking for a path which makes a
+        shortcut unnecessary); a lower limit speeds up the preprocessing but
+        adds superfluous shortcuts, making queries slower (though still exact).
+
+        "progress", if specified, is called with the number of nodes
+        contracted so far every 1000 contracted nodes.
+        """
+        contraction = Contraction(graph, witness_limit)
+        num_nodes = graph.num_nodes
+
+        # Nodes are contracted in order of priority, which is updated lazily:
+        # when a node is extracted, its priority is recomputed, and the node
+        # is put back if it's not the minimum anymore.
+        heap = [(contraction.priority(node), node) for node in range(num_nodes)]
+        heapq.heapify(heap)
+
+        rank = array('q', [0]) * num_nodes
+        num_contracted = 0
+
+        while heap:
+            _, node = heapq.heappop(heap)
+
+            priority = contraction.priority(node)
+            if heap and priority > heap[0][0]:
+                heapq.heappush(heap, (priority, node))
+                continue
+
+            contraction.contract(node)
+
+            rank[node] = num_contracted
+            num_contracted += 1
+
+            if progress is not None and num_contracted % 1000 == 0:
+                progress(num_contracted)
+
+        ch = cls.__new__(cls)
+        ch.num_nodes = num_nodes
+        ch.rank = rank
+
+        ch.up_offsets, ch.up_heads, ch.up_costs, ch.up_middles = build_arcs_csr(
+            num_nodes, contraction.up_arcs
+        )
+        ch.down_offsets, ch.down_tails, ch.down_costs, ch.down_middles = build_arcs_csr(
+            num_nodes, contraction.down_arcs
+        )
+
+        return ch
+
+
+    @property
+    def num_shortcuts(self) -> int:
+        return (
+            sum(1 for middle in self.up_middles if middle != NO_NODE)
+            + sum(1 for middle in self.down_middles if middle != NO_NODE)
+        )
+
+
+    def up_arcs(self, node:int):
+        """
+        Returns an iterable of (head, cost) pairs, representing the upward
+        arcs leaving the specified node.
+        """
+        start = self.up_offsets[node]
+        end = self.up_offsets[node + 1]
+        return zip(self.up_heads[start:end], self.up_costs[start:end])
+
+
+    def down_arcs(self, node:int):
+        """
+        Returns an iterable of (tail, cost) pairs, representing the downward
+        arcs entering the specified node.
+        """
+        start = self.down_offsets[node]
+        end = self.down_offsets[node + 1]
+        return zip(self.down_tails[start:end], self.down_costs[start:end])
+
+
+    def middle(self, tail:int, head:int) -> int:
+        """
+        Returns the node bypassed by the arc (tail, head), or NO_NODE if
+        it's an arc of the original graph.
+        """
+        if self.rank[head] > self.rank[tail]:
+            start = self.up_offsets[tail]
+            end = self.up_offsets[tail + 1]
+            index = self.up_heads[start:end].index(head)
+            return self.up_middles[start + index]
+
+        start = self.down_offsets[head]
+        end = self.down_offsets[head + 1]
+        index = self.down_tails[start:end].index(tail)
+        return self.down_middles[start + index]
+
+
+    def unpack_arc(self, tail:int, head:int, path:deque):
+        """
+        Appends to "path" the nodes following "tail" on the original graph's
+        path represented by the arc (tail, head), up to "head" included.
+        """
+        stack = [(tail, head)]
+
+        while stack:
+            tail, head = stack.pop()
+            middle = self.middle(tail, head)
+
+            if middle == NO_NODE:
+                path.append(head)
+            else:
+                # (tail, middle) must be unpacked first
+                stack.append( (middle, head) )
+                stack.append( (tail, middle) )
+
+
+    def save(self, file_bin:io.BufferedIOBase):
+        """Writes the preprocessed structure to a binary file."""
+        header = struct.pack(
+            HEADER_FORMAT,
+            MAGIC, VERSION, BYTE_ORDER_MARK,
+            self.num_nodes, len(self.up_heads), len(self.down_tails)
+        )
+        file_bin.write(header.ljust(HEADER_SIZE, b'\0'))
+
+        for name, _, _ in SECTIONS:
+            file_bin.write(getattr(self, name))
+
+
+    @classmethod
+    def load(cls, filename:str) -> 'ContractionHierarchy':
+        """Reads a preprocessed structure written by save()."""
+        with open(filename, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE:
+                raise InvalidSnapshotError(filename, "Truncated header")
+
+            magic, version, byte_order_mark, num_nodes, num_up, num_down = struct.unpack_from(
+                HEADER_FORMAT, header
+            )
+
+            if magic != MAGIC:
+                raise InvalidSnapshotError(filename, "Not a contraction hierarchy")
+
+            if version != VERSION:
+                raise InvalidSnapshotError(filename, f"Unsupported format version {version}")
+
+            if byte_order_mark != BYTE_ORDER_MARK:
+                raise InvalidSnapshotError(
+                    filename, f"Byte order differs from this machine's ({sys.byteorder})"
+                )
+
+            sizes = {
+                'nodes': num_nodes,
+                'offsets': num_nodes + 1,
+                'up': num_up,
+                'down': num_down,
+            }
+
+            ch = cls.__new__(cls)
+            ch.num_nodes = num_nodes
+
+            for name, typecode, size in SECTIONS:
+                items = array(typecode)
+                try:
+                    items.fromfile(f, sizes[size])
+                except EOFError:
+                    raise InvalidSnapshotError(filename, "Truncated file") from None
+
+                setattr(ch, name, items)
+
+            if f.read(1):
+                raise InvalidSnapshotError(filename, "Unexpected data after the last section")
+
+        return ch
+
+
+class Contraction:
+    """
+    The graph being contracted by ContractionHierarchy.build(): the remaining
+    (not yet contracted) nodes, with their arcs and shortcuts, along with
+    the arcs frozen into the hierarchy so far.
+    """
+    __slots__ = (
+        'witness_limit',
+
+        # For each remaining node, dictionaries mapping its remaining
+        # out-neighbours (in-neighbours) to the (cost, middle) pair of the
+        # arc connecting them; None for contracted nodes
+        'out_adj',
+        'in_adj',
+
+        # For each node, the number of its neighbours contracted so far
+        'deleted_neighbours',
+
+        # For each contracted node, the list of (head, cost, middle) tuples of
+        # its upward arcs and the list of (tail, cost, middle) tuples of its
+        # downward arcs, respectively
+        'up_arcs',
+        'down_arcs',
+    )
+
+
+    def __init__(self, graph:BaseGraph, witness_limit:int):
+        num_nodes = graph.num_nodes
+
+        self.witness_limit = witness_limit
+        self.out_adj = [dict() for _ in range(num_nodes)]
+        self.in_adj = [dict() for _ in range(num_nodes)]
+        self.deleted_neighbours = array('q', [0]) * num_nodes
+        self.up_arcs = [None] * num_nodes
+        self.down_arcs = [None] * num_nodes
+
+        for node in range(num_nodes):
+            for tail, head, cost in graph.out_arcs(node):
+                self.out_adj[tail][head] = (cost, NO_NODE)
+                self.in_adj[head][tail] = (cost, NO_NODE)
+
+
+    def priority(self, node:int) -> int:
+        """
+        Returns the node's contraction priority (lower is contracted first):
+        its edge difference (the number of shortcuts its contraction would add
+        minus the number of arcs it would remove), plus the number of its
+        neighbours already contracted, which spreads the contracted nodes
+        uniformly over the graph.
+        """
+        edge_difference = (
+            len(self.shortcuts(node))
+            - len(self.in_adj[node])
+            - len(self.out_adj[node])
+        )
+        return edge_difference + self.deleted_neighbours[node]
+
+
+    def shortcuts(self, node:int) -> list:
+        """
+        Returns the (tail, head, cost) tuples of the shortcuts needed to
+        contract the specified node: one for each pair of in/out-neighbours
+        whose shortest path goes through the node, as far as the limited
+        witness searches can tell.
+        """
+        shortcuts = list()
+        out_arcs = self.out_adj[node].items()
+
+        for tail, (tail_cost, _) in self.in_adj[node].items():
+            targets = {
+                head: tail_cost + head_cost
+                for head, (head_cost, _) in out_arcs
+                if head != tail
+            }
+            if not targets:
+                continue
+
+            witness_dist = self.witness_search(tail, node, targets)
+
+            for head, cost in targets.items():
+                if witness_dist.get(head, float('+inf')) > cost:
+                    shortcuts.append( (tail, head, cost) )
+
+        return shortcuts
+
+
+    def witness_search(self, src:int, excluded_node:int, targets:dict) -> dict:
+        """
+        Dijkstra's search from "src" on the remaining graph without the
+        excluded node, stopping once every target is settled, once the
+        distance exceeds the maximum target cost or after settling
+        "witness_limit" nodes.
+
+        Returns the distance labels found, which are the lengths of
+        actual paths avoiding the excluded node.
+        """
+        max_cost = max(targets.values())
+        num_targets = len(targets)
+
+        dist = {src: 0}
+        heap = [(0, src)]
+        num_settled = 0
+
+        while heap:
+            i_dist, i = heapq.heappop(heap)
+            if i_dist > dist[i]:
+                # Stale entry
+                continue
+
+            if i_dist > max_cost or num_settled == self.witness_limit:
+                break
+
+            num_settled += 1
+
+            if i in targets:
+                num_targets -= 1
+                if num_targets == 0:
+                    break
+
+            for j, (cost, _) in self.out_adj[i].items():
+                if j != excluded_node and i_dist + cost < dist.get(j, float('+inf')):
+                    dist[j] = i_dist + cost
+                    heapq.heappush(heap, (dist[j], j))
+
+        return dist
+
+
+    def contract(self, node:int):
+        """
+        Adds the shortcuts needed to remove the specified node, then removes
+        it from the remaining graph, freezing its arcs into the hierarchy.
+        """
+        for tail, head, cost in self.shortcuts(node):
+            existing_arc = self.out_adj[tail].get(head)
+
+            if existing_arc is None or cost < existing_arc[0]:
+                self.out_adj[tail][head] = (cost, node)
+                self.in_adj[head][tail] = (cost, node)
+
+        out_arcs = self.out_adj[node]
+        in_arcs = self.in_adj[node]
+
+        # All of the node's remaining neighbours will be contracted later,
+        # hence they have a higher rank
+        self.up_arcs[node] = [(head, cost, middle) for head, (cost, middle) in out_arcs.items()]
+        self.down_arcs[node] = [(tail, cost, middle) for tail, (cost, middle) in in_arcs.items()]
+
+        for head in out_arcs:
+            del self.in_adj[head][node]
+            self.deleted_neighbours[head] += 1
+
+        for tail in in_arcs:
+            del self.out_adj[tail][node]
+            self.deleted_neighbours[tail] += 1
+
+        self.out_adj[node] = None
+        self.in_adj[node] = None
+
+
+def build_arcs_csr(num_nodes:int, node_arcs:list) -> tuple:
+    """
+    Converts a list holding each node's (neighbour, cost, middle) tuples
+    into the (offsets, neighbours, costs, middles) arrays of a CSR structure.
+    """
+    keys = array('q')
+    neighbours = array('q')
+    costs = array('d')
+    middles = array('q')
+
+    for node, arcs in enumerate(node_arcs):
+        for neighbour, cost, middle in arcs:
+            keys.append(node)
+            neighbours.append(neighbour)
+            costs.append(cost)
+            middles.append(middle)
+
+    offsets, _, _ = build_csr(num_nodes, keys, neighbours, costs)
+
+    return (offsets, neighbours, costs, middles)
+
+
+def hierarchy_queue(graph:BaseGraph, queue:str) -> str:
+    """
+    Returns the frontier implementation of the searches on the contraction
+    hierarchy of the graph, for the specified "queue" parameter; raises
+    ValueError just like BaseGraph.select_queue().
+    """
+    # The shortcuts may cost more than the graph's arcs, which bound the
+    # range of Dial's buckets: use the radix heap instead, but not for
+    # AUTO_QUEUE, since it's slower than the binary heap (see
+    # BaseGraph.select_queue())
+    if queue == AUTO_QUEUE:
+        queue = 'heap'
+    elif queue == 'dial':
+        queue = 'radix'
+
+    return graph.select_queue(queue)
+
+
+def dijkstra_ch(
+    graph:BaseGraph,
+    src:int,
+    dest:int,
+    ch:ContractionHierarchy,
+    queue:str=AUTO_QUEUE,
+    state:SearchState=None) -> deque:
+    """
+    Contraction Hierarchies query: a bidirectional Dijkstra's search, where
+    the forward search only follows the upward arcs and the reverse search
+    only follows the downward arcs of the preprocessed graph "ch".
+
+    Each search goes on until its minimum temporary distance label reaches
+    the cost of the best path found so far; the path is then unpacked
+    into the original graph's arcs.
+
+    See algorithms.dijkstra_fwd() for the "queue" and "state" parameters
+    (but see hierarchy_queue()); the "pred"/"succ" labels in the state
+    refer to the hierarchy's arcs, which may be shortcuts.
+    """
+    state = graph.init_state(src, dest, hierarchy_queue(graph, queue), state)
+
+    inf = float('+inf')
+    best_cost = inf
+    meeting_node = NO_NODE
+    forward_turn = True
+
+    while True:
+        fwd_active = state.temp_fwd.min_key() < best_cost
+        rev_active = state.temp_rev.min_key() < best_cost
+
+        if not (fwd_active or rev_active):
+            break
+
+        if fwd_active and (forward_turn or not rev_active):
+            ###################################################
+            ############ FORWARD (upward) step ################
+            ###################################################
+            i = state.make_node_perm_fwd()
+            i_dist_s = state.dist_s[i]
+
+            for j, cost in ch.up_arcs(i):
+                if state.dist_s[j] > i_dist_s + cost:
+                    state.dist_s[j] = i_dist_s + cost
+                    state.pred[j] = i
+                    state.temp_fwd.push(j, state.dist_s[j])
+
+                    # j may have been reached by the reverse search as well
+                    if state.dist_s[j] + state.dist_t[j] < best_cost:
+                        best_cost = state.dist_s[j] + state.dist_t[j]
+                        meeting_node = j
+
+            if i_dist_s + state.dist_t[i] < best_cost:
+                best_cost = i_dist_s + state.dist_t[i]
+                meeting_node = i
+        else:
+            ###################################################
+            ############ REVERSE (downward) step ##############
+            ###################################################
+            j = state.make_node_perm_rev()
+            j_dist_t = state.dist_t[j]
+
+            for i, cost in ch.down_arcs(j):
+                if state.dist_t[i] > j_dist_t + cost:
+                    state.dist_t[i] = j_dist_t + cost
+                    state.succ[i] = j
+                    state.temp_rev.push(i, state.dist_t[i])
+
+                    if state.dist_s[i] + state.dist_t[i] < best_cost:
+                        best_cost = state.dist_s[i] + state.dist_t[i]
+                        meeting_node = i
+
+            if state.dist_s[j] + j_dist_t < best_cost:
+                best_cost = state.dist_s[j] + j_dist_t
+                meeting_node = j
+
+        forward_turn = not forward_turn
+
+    if meeting_node == NO_NODE:
+        raise NoDirectedPathError(src, dest)
+
+    # The path in the hierarchy, through the meeting node
+    ch_path = deque([meeting_node])
+
+    curr_node = meeting_node
+    while (curr_node := state.pred[curr_node]) != NO_NODE:
+        ch_path.appendleft(curr_node)
+
+    curr_node = meeting_node
+    while (curr_node := state.succ[curr_node]) != NO_NODE:
+        ch_path.append(curr_node)
+
+    # Unpack the shortcuts
+    src_dest_path = deque([src])
+
+    for tail, head in zip(ch_path, list(ch_path)[1:]):
+        ch.unpack_arc(tail, head, src_dest_path)
+
+    return src_dest_path
+
+
+def validate_args(argv) -> tuple:
+    usage_msg = (
+        "\nUsage:\n"
+        "python contraction.py <input_graph> <output_ch>\n"
+    )
+    if len(argv) != 3:
+        print(usage_msg)
+        quit()
+
+    input_graph = argv[1]
+    if not input_graph.endswith( ('.json', '.json.gz', '.snap') ):
+        print("Parameter 'input_graph' must have .json, .json.gz or .snap extension")
+        quit()
+
+    output_ch = argv[2]
+    if not output_ch.endswith('.ch'):
+        print("Parameter 'output_ch' must have .ch extension")
+        quit()
+
+    return (input_graph, output_ch)
+
+
+if __name__ == '__main__':
+    from csr_graph import CSRGraph
+    from graph_loader import open_graph_file
+    from snapshot import open_snapshot
+
+    input_graph, output_ch = validate_args(sys.argv)
+
+    print("Building the graph...", end=' ', flush=True)
+    if input_graph.endswith('.snap'):
+        graph = open_snapshot(input_graph)
+    else:
+        with open_graph_file(input_graph) as f:
+            graph = CSRGraph(f)
+    print('done')
+
+    def print_progress(num_contracted:int):
+        print(f'\rContracting the nodes... {num_contracted}/{graph.num_nodes}', end='', flush=True)
+
+    print("Contracting the nodes...", end=' ', flush=True)
+    ch = ContractionHierarchy.build(graph, progress=print_progress)
+    print(f' done ({ch.num_shortcuts} shortcuts)')
+
+    with open(output_ch, 'wb') as f:
+        ch.save(f)
+    print("The contraction hierarchy has been saved.")
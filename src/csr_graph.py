@@ -0,0 +1,180 @@
+import io
+from array import array
+from itertools import repeat
+
+from base_graph import BaseGraph
+from graph_loader import GraphJSONReader
+
+class CSRGraph(BaseGraph):
+    """
+    Compact graph representation, storing the arcs in compressed sparse row
+    (CSR) format inside flat arrays instead of per-node lists of Arc tuples.
+
+    The arcs leaving node i are the ones in the range
+    [fwd_offsets[i], fwd_offsets[i+1]) of the "heads"/"fwd_costs" arrays;
+    likewise, the arcs entering node j are the ones in the range
+    [rev_offsets[j], rev_offsets[j+1]) of the "tails"/"rev_costs" arrays.
+    Arcs sharing the same tail (head) keep the order they were read in.
+
+    Each arc takes 32 bytes (8 for its head/tail and 8 for its cost, in both
+    directions), plus 16 bytes per node for the offsets; Graph's Arc tuples,
+    their integers and the list references take well over 100 bytes per arc.
+    """
+    __slots__ = (
+        'fwd_offsets',
+        'heads',
+        'fwd_costs',
+
+        'rev_offsets',
+        'tails',
+        'rev_costs'
+    )
+
+
+    def __init__(self, file_json:io.TextIOBase, progress=None, trusted:bool=False):
+        """
+        Builds the graph from the specified JSON file, streaming the arcs
+        straight into the adjacency storage (see graph_loader.py).
+
+        "progress", if specified, is called with the number of arcs
+        read so far while loading.
+
+        If "trusted" is True the arcs aren't validated, which is only safe
+        for files already known to be valid (such as the generated ones).
+        """
+        reader = GraphJSONReader(file_json, progress)
+
+        num_nodes = reader.read_num_nodes()
+
+        self.init_nodes(num_nodes)
+
+        tails, heads, costs = reader.read_arc_arrays()
+
+        if not trusted:
+            self._validate_arcs(tails, heads, costs)
+
+        self.set_arcs(tails, heads, costs)
+
+
+    @classmethod
+    def from_arcs(
+        cls,
+        num_nodes:int,
+        tails:array,
+        heads:array,
+        costs:array) -> 'CSRGraph':
+        """
+        Builds a graph from three parallel arrays holding each arc's tail,
+        head and cost, respectively.
+
+        NOTE: the arcs are NOT validated; this is meant for arcs coming from
+        a trusted source, such as a generator.
+        """
+        graph = cls.__new__(cls)
+        graph.init_nodes(num_nodes)
+        graph.set_arcs(tails, heads, costs)
+
+        return graph
+
+
+    @classmethod
+    def from_buffers(
+        cls,
+        num_nodes:int,
+        fwd_offsets,
+        heads,
+        fwd_costs,
+        rev_offsets,
+        tails,
+        rev_costs) -> 'CSRGraph':
+        """
+        Builds a graph on top of already built CSR structures, without
+        copying them; the buffers can be any indexable sequences supporting
+        slicing, such as arrays or memoryviews (see snapshot.py).
+        """
+        graph = cls.__new__(cls)
+        graph.init_nodes(num_nodes)
+
+        graph.fwd_offsets = fwd_offsets
+        graph.heads = heads
+        graph.fwd_costs = fwd_costs
+
+        graph.rev_offsets = rev_offsets
+        graph.tails = tails
+        graph.rev_costs = rev_costs
+
+        return graph
+
+
+    def set_arcs(self, tails:array, heads:array, costs:array):
+        """
+        Builds both CSR adjacency structures from three parallel arrays
+        holding each arc's tail, head and cost, respectively.
+        """
+        self.fwd_offsets, self.heads, self.fwd_costs = build_csr(
+            self.num_nodes, tails, heads, costs
+        )
+        self.rev_offsets, self.tails, self.rev_costs = build_csr(
+            self.num_nodes, heads, tails, costs
+        )
+
+
+    @property
+    def num_arcs(self) -> int:
+        return len(self.heads)
+
+
+    def out_arcs(self, node:int):
+        start = self.fwd_offsets[node]
+        end = self.fwd_offsets[node + 1]
+
+        return zip(
+            repeat(node, end - start),
+            self.heads[start:end],
+            self.fwd_costs[start:end]
+        )
+
+
+    def in_arcs(self, node:int):
+        start = self.rev_offsets[node]
+        end = self.rev_offsets[node + 1]
+
+        return zip(
+            self.tails[start:end],
+            repeat(node, end - start),
+            self.rev_costs[start:end]
+        )
+
+
+    def arc_costs(self):
+        return self.fwd_costs
+
+
+def build_csr(num_nodes:int, keys:array, values:array, costs:array) -> tuple:
+    """
+    Groups the arcs by their "keys" node (tail for the forward structure,
+    head for the reverse one) through a stable counting sort.
+
+    Returns the (offsets, values, costs) arrays of the CSR structure.
+    """
+    offsets = array('q', [0]) * (num_nodes + 1)
+
+    for key in keys:
+        offsets[key + 1] += 1
+
+    for i in range(num_nodes):
+        offsets[i + 1] += offsets[i]
+
+    # The next free position for each node's arcs
+    positions = offsets[:-1]
+
+    sorted_values = array('q', [0]) * len(keys)
+    sorted_costs = array('d', [0.0]) * len(keys)
+
+    for key, value, cost in zip(keys, values, costs):
+        pos = positions[key]
+        sorted_values[pos] = value
+        sorted_costs[pos] = cost
+        positions[key] = pos + 1
+
+    return (offsets, sorted_values, sorted_costs)
@@ -1,104 +1,337 @@
-from sys import argv
-from collections import deque
-from time import time
+import sys, argparse
+from functools import partial
 
 from graph import Graph
-from algorithms import dijkstra_fwd, dijkstra_rev, dijkstra_bidir
+from graph_loader import open_graph_file
+from snapshot import open_snapshot
+from exceptions import InvalidSnapshotError, InvalidArcError, DuplicateArcError
+from frontier import FRONTIERS, AUTO_QUEUE
+from queries import (
+    ALGORITHMS, run_query, read_queries, QueryResultWriter, QueryStats
+)
+from parallel import ParallelQueryExecutor
+from graph_deltas import read_deltas, apply_deltas
+from algorithms import astar, dijkstra_bidir_mu, BALANCE_MODES
+from heuristics import GridHeuristic, LandmarkHeuristic
+from contraction import ContractionHierarchy, dijkstra_ch
+from arc_flags import ArcFlags, dijkstra_arc_flags
 
-def validate_args(argv) -> tuple:
-    usage_msg = (
-        "\nUsage:\n"
-        "python dijkstra_cmp.py <input_graph_json> <src_node> <dest_node>\n"
+def validate_args(argv) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='dijkstra_cmp.py',
+        description=(
+            "Compares the Forward, Reverse and Bidirectional Dijkstra's "
+            "algorithms, either on a single (src_node, dest_node) pair or on "
+            "a batch of pairs read from a file."
+        )
     )
-    if len(argv) != 4:
-        print(usage_msg)
-        quit()
-    
-    input_graph_json = argv[1]
-    
-    if not input_graph_json.endswith('.json'):
-        print("Parameter 'input_graph_json' must have .json extension")
-        quit()
-    
-    try:
-        src_node = int(argv[2])
-    except ValueError:
-        print("Parameter 'src_node' must be integer")
-        quit()
-    
-    try:
-        dest_node = int(argv[3])
-    except ValueError:
-        print("Parameter 'dest_node' must be integer")
-        quit()
-    
-    return (input_graph_json, src_node, dest_node)
+    parser.add_argument(
+        'input_graph',
+        help="either a .json/.json.gz file or a .snap binary snapshot"
+    )
+    parser.add_argument('src_node', type=int, nargs='?')
+    parser.add_argument('dest_node', type=int, nargs='?')
+    parser.add_argument(
+        '--queue', nargs='+', choices=[*FRONTIERS, AUTO_QUEUE], default=[AUTO_QUEUE],
+        help="the queue type(s) to run the algorithms with (default: auto)"
+    )
+    parser.add_argument(
+        '--trusted', action='store_true',
+        help=(
+            "skip the validation of the JSON graph's arcs, for files already "
+            "known to be valid (snapshots are never validated)"
+        )
+    )
+    parser.add_argument(
+        '--deltas', metavar='DELTAS_FILE',
+        help=(
+            "apply the arc changes in the specified file (see graph_deltas.py) "
+            "to the graph before running the queries; not available for snapshots"
+        )
+    )
+    parser.add_argument(
+        '--bidir-mu', nargs='+', choices=BALANCE_MODES, metavar='BALANCE',
+        help=(
+            "also run the bidirectional Dijkstra with the best meeting cost "
+            "stopping criterion, once for each of the specified balance modes "
+            f"({', '.join(BALANCE_MODES)})"
+        )
+    )
+    parser.add_argument(
+        '--grid-side', type=int, metavar='NUM_SIDE_NODES',
+        help=(
+            "also run A* with the Manhattan distance heuristic, for grid "
+            "graphs made by grid_graph_gen.py with the specified side"
+        )
+    )
+    parser.add_argument(
+        '--landmarks', type=int, metavar='NUM_LANDMARKS',
+        help="also run A* with the ALT heuristic, using the specified number of landmarks"
+    )
+    parser.add_argument(
+        '--seed', type=int,
+        help="seed for the choice of the ALT landmarks"
+    )
+    parser.add_argument(
+        '--ch', metavar='CH_FILE',
+        help=(
+            "also run the Contraction Hierarchies query, using the .ch file "
+            "made by contraction.py for the same graph"
+        )
+    )
+    parser.add_argument(
+        '--arc-flags', metavar='FLAGS_FILE',
+        help=(
+            "also run the arc flags query, using the .flags file made by "
+            "arc_flags.py for the same graph"
+        )
+    )
+    parser.add_argument(
+        '--batch', metavar='QUERIES_FILE',
+        help=(
+            "read the (src_node, dest_node) pairs from the specified file, "
+            "one per line ('-' for standard input)"
+        )
+    )
+    parser.add_argument(
+        '--format', choices=QueryResultWriter.FORMATS, default='jsonl',
+        help="batch mode's output format (default: jsonl)"
+    )
+    parser.add_argument(
+        '--output', metavar='OUTPUT_FILE',
+        help="batch mode's output file (default: standard output)"
+    )
+    parser.add_argument(
+        '--jobs', type=int, default=1,
+        help=(
+            "batch mode's number of worker processes running the queries "
+            "in parallel (default: 1, 0 for one per CPU)"
+        )
+    )
+
+    args = parser.parse_args(argv[1:])
+
+    if not args.input_graph.endswith( ('.json', '.json.gz', '.snap') ):
+        parser.error("Parameter 'input_graph' must have .json, .json.gz or .snap extension")
+
+    if args.batch is None and (args.src_node is None or args.dest_node is None):
+        parser.error("Parameters 'src_node' and 'dest_node' are required outside batch mode")
+
+    if args.batch is not None and args.src_node is not None:
+        parser.error("Parameters 'src_node' and 'dest_node' can't be used in batch mode")
+
+    if args.jobs < 0:
+        parser.error("Parameter 'jobs' must be nonnegative")
+
+    if args.grid_side is not None and args.grid_side <= 0:
+        parser.error("Parameter 'grid_side' must be positive")
+
+    if args.landmarks is not None and args.landmarks <= 0:
+        parser.error("Parameter 'landmarks' must be positive")
+
+    if args.deltas is not None and args.input_graph.endswith('.snap'):
+        parser.error("Parameter 'deltas' can't be used with read-only snapshots")
+
+    if args.ch is not None and not args.ch.endswith('.ch'):
+        parser.error("Parameter 'ch' must have .ch extension")
+
+    if args.arc_flags is not None and not args.arc_flags.endswith('.flags'):
+        parser.error("Parameter 'arc_flags' must have .flags extension")
+
+    if args.arc_flags is not None and args.deltas is not None:
+        parser.error("Parameter 'arc_flags' can't be used with 'deltas', which invalidate the flags")
+
+    return args
 
 
 def print_results(
-    path:deque,
-    perf_times:list,
-    perm_nodes:list,
-    num_total_nodes:int) -> None:
+    path:list,
+    queues:list,
+    alg_names:list,
+    stats:QueryStats,
+    num_total_nodes:int,
+    file=sys.stdout) -> None:
 
-    print(40 * '=')
-    print('RESULTS\n')
+    print(40 * '=', file=file)
+    print('RESULTS\n', file=file)
 
-    print('Optimal path:')
-    for i, node in enumerate(path, start=1):
-        print(f'{i:>10}: {node:>10}')
-    
-    print()
-    print(40 * '-')
+    if path is not None:
+        print('Optimal path:', file=file)
+        for i, node in enumerate(path, start=1):
+            print(f'{i:>10}: {node:>10}', file=file)
 
-    print(f'Number of nodes in graph: {num_total_nodes}\n')
+        print(file=file)
+        print(40 * '-', file=file)
 
-    print("{0:->12}{1:->16}{2:->16}{3:->20}".format("", "Forward", "Reverse", "Bidirectional"))
-    print("{0:<12}{1:>14.3f}{2:>16.3f}{3:>20.3f}".format("Execution time", *perf_times))
-    print("{0:<12}{1:>13}{2:>16}{3:>20}".format("Permanent nodes", *perm_nodes))
+    print(f'Number of nodes in graph: {num_total_nodes}', file=file)
+    print(f'Number of queries: {stats.num_queries}\n', file=file)
 
-    print(64 * '-')
-    print()
+    def format_row(label:str, values:list, value_format:str) -> str:
+        return "{0:<16}{1}".format(label, ''.join(
+            "{0:>16}".format('-' if value is None else format(value, value_format))
+            for value in values
+        ))
 
+    # One table for each queue type
+    for queue in queues:
+        time_summaries = [stats.time_summary(queue, alg_name) for alg_name in alg_names]
 
-if __name__ == '__main__':
-    input_graph_json, src_node, dest_node = validate_args(argv)
-
-    print("Building the graph...", end=' ', flush=True)
-    with open(input_graph_json, 'r') as f:
-        graph = Graph(f)
-    print('done\n')
-    
-    alg_funcs = [dijkstra_fwd, dijkstra_rev, dijkstra_bidir]
-    alg_perf_times = list()
-    alg_perm_nodes = list() 
-    
-    for alg_func in alg_funcs:
-        print(f'Executing {alg_func.__name__}()...', end=' ', flush=True)
-
-        start = time()
-        path = alg_func(graph, src_node, dest_node)
-        perf_time = time() - start
+        def time_row(label:str, index:int) -> str:
+            return format_row(
+                label,
+                [None if summary is None else summary[index] for summary in time_summaries],
+                '.3f'
+            )
 
-        print('done')
+        print(f'Queue: {queue}', file=file)
+        print("{0:->16}{1}".format("", ''.join(f"{alg_name:->16}" for alg_name in alg_names)), file=file)
+        print(time_row("Mean time", 0), file=file)
+        print(time_row("Median time", 1), file=file)
+        print(time_row("99th pct time", 2), file=file)
+        print(format_row(
+            "Permanent nodes",
+            [stats.mean_perm_nodes(queue, alg_name) for alg_name in alg_names],
+            '.1f'
+        ), file=file)
+
+        print((16 + 16 * len(alg_names)) * '-', file=file)
+        print(file=file)
+
+
+def load_graph(input_graph:str, trusted:bool=False):
+    def print_progress(num_arcs:int):
+        print(f'\rBuilding the graph... {num_arcs} arcs', end='', file=sys.stderr, flush=True)
 
-        alg_perf_times.append(perf_time)
+    print("Building the graph...", end=' ', file=sys.stderr, flush=True)
+    if input_graph.endswith('.snap'):
+        graph = open_snapshot(input_graph)
+    else:
+        with open_graph_file(input_graph) as f:
+            graph = Graph(f, print_progress, trusted)
+    print(' done\n', file=sys.stderr)
 
-        num_perm_nodes = len( graph.perm_fwd.union(graph.perm_rev) )
-        alg_perm_nodes.append(num_perm_nodes)
-    
-    num_total_nodes = len(graph.nodes)
+    return graph
 
-    print_results(path, alg_perf_times, alg_perm_nodes, num_total_nodes)
 
+def get_algorithms(graph, args) -> dict:
+    """
+    Returns the compared algorithms: the three Dijkstra's variants, plus
+    the bidirectional one with the best meeting cost criterion, A* with
+    each of the heuristics selected by the command line arguments, and the
+    Contraction Hierarchies and arc flags queries, if their files are specified.
+    """
+    algorithms = dict(ALGORITHMS)
 
+    if args.bidir_mu is not None:
+        for balance in args.bidir_mu:
+            # Short enough to fit the results table's columns
+            label = 'alt' if balance == 'alternate' else balance
+            algorithms[f'Bidir-mu ({label})'] = partial(dijkstra_bidir_mu, balance=balance)
 
+    if args.grid_side is not None:
+        heuristic = GridHeuristic(graph, args.grid_side)
+        algorithms['A* (grid)'] = partial(astar, heuristic=heuristic)
 
-    
+    if args.landmarks is not None:
+        print("Computing the landmarks' distances...", end=' ', file=sys.stderr, flush=True)
+        heuristic = LandmarkHeuristic(graph, args.landmarks, args.seed)
+        algorithms['A* (ALT)'] = partial(astar, heuristic=heuristic)
+        print('done\n', file=sys.stderr)
 
+    if args.ch is not None:
+        ch = ContractionHierarchy.load(args.ch)
+        if ch.num_nodes != graph.num_nodes:
+            raise ValueError(
+                f"The contraction hierarchy has {ch.num_nodes} nodes, the graph {graph.num_nodes}"
+            )
 
+        algorithms['CH'] = partial(dijkstra_ch, ch=ch)
 
+    if args.arc_flags is not None:
+        arc_flags = ArcFlags.load(args.arc_flags)
+        arc_flags.check_graph(graph)
+
+        algorithms['Arc flags'] = partial(dijkstra_arc_flags, arc_flags=arc_flags)
+
+    return algorithms
+
+
+def run_batch(graph, algorithms:dict, args) -> QueryStats:
+    """
+    Runs the queries read from the batch file, streaming each result to
+    the output file as soon as it's available.
+    """
+    stats = QueryStats()
+
+    file_queries = sys.stdin if args.batch == '-' else open(args.batch, 'r')
+    file_out = sys.stdout if args.output is None else open(args.output, 'w', newline='')
+
+    try:
+        writer = QueryResultWriter(file_out, args.format, args.queue, list(algorithms))
+        queries = read_queries(file_queries)
 
+        if args.jobs == 1:
+            for src, dest in queries:
+                result = run_query(graph, src, dest, args.queue, algorithms=algorithms)
+                writer.write(result)
+                stats.add(result)
+        else:
+            snapshot_filename = args.input_graph if args.input_graph.endswith('.snap') else None
+            processes = args.jobs or None
+
+            with ParallelQueryExecutor(graph, processes, snapshot_filename, algorithms) as executor:
+                for result in executor.map(queries, args.queue):
+                    writer.write(result)
+                    stats.add(result)
+    finally:
+        if file_queries is not sys.stdin:
+            file_queries.close()
+        if file_out is not sys.stdout:
+            file_out.close()
+
+    return stats
+
+
+if __name__ == '__main__':
+    args = validate_args(sys.argv)
+
+    graph = load_graph(args.input_graph, args.trusted)
+
+    if args.deltas is not None:
+        print("Applying the deltas...", end=' ', file=sys.stderr, flush=True)
+        try:
+            with open(args.deltas) as f:
+                num_deltas = apply_deltas(graph, read_deltas(f))
+        except (ValueError, KeyError, InvalidArcError, DuplicateArcError) as exc:
+            print(exc)
+            quit()
+        print(f'done ({num_deltas} changes)\n', file=sys.stderr)
+
+    try:
+        for queue in args.queue:
+            graph.select_queue(queue)
+
+        algorithms = get_algorithms(graph, args)
+    except (ValueError, InvalidSnapshotError) as exc:
+        print(exc)
+        quit()
+
+    if args.batch is not None:
+        stats = run_batch(graph, algorithms, args)
+
+        # Keep the standard output for the results, if they're written there
+        summary_file = sys.stderr if args.output is None else sys.stdout
+        print_results(None, args.queue, list(algorithms), stats, graph.num_nodes, summary_file)
+    else:
+        print('Executing the algorithms...', end=' ', flush=True)
+        result = run_query(graph, args.src_node, args.dest_node, args.queue, algorithms=algorithms)
+        print('done')
 
+        if result.error is not None:
+            print(result.error)
+            quit()
 
+        stats = QueryStats()
+        stats.add(result)
 
+        print_results(result.path, args.queue, list(algorithms), stats, graph.num_nodes)
@@ -0,0 +1,204 @@
+from array import array
+
+from base_graph import BaseGraph
+from frontier import AUTO_QUEUE
+from search_state import SearchState
+from contraction import ContractionHierarchy, hierarchy_queue
+
+
+class DistanceTable:
+    """
+    Dense matrix of the shortest path distances between a list of source
+    nodes (rows) and a list of target nodes (columns), as returned by
+    distance_table(); unreachable pairs have infinite distance.
+
+    The distances are stored row by row in the flat "data" array, so the
+    table can be wrapped without copies by libraries supporting the buffer
+    protocol, e.g. numpy.frombuffer(table.data).reshape(table.shape).
+    """
+    __slots__ = (
+        'sources',
+        'targets',
+        'shape',
+        'data',
+    )
+
+
+    def __init__(self, sources:list, targets:list):
+        self.sources = sources
+        self.targets = targets
+        self.shape = (len(sources), len(targets))
+        self.data = array('d', [float('+inf')]) * (len(sources) * len(targets))
+
+
+    def __getitem__(self, index:tuple) -> float:
+        """Returns the distance at the (row, column) index."""
+        row, col = index
+        return self.data[row * self.shape[1] + col]
+
+
+    def __setitem__(self, index:tuple, dist:float):
+        row, col = index
+        self.data[row * self.shape[1] + col] = dist
+
+
+    def row(self, row:int) -> array:
+        """Returns a copy of the distances from the row's source node."""
+        num_cols = self.shape[1]
+        return self.data[row * num_cols : (row + 1) * num_cols]
+
+
+    def tolist(self) -> list:
+        """Returns the table as a list of rows, each one a list of distances."""
+        return [self.row(row).tolist() for row in range(self.shape[0])]
+
+
+def distance_table(
+    graph:BaseGraph,
+    sources:list,
+    targets:list,
+    ch:ContractionHierarchy=None,
+    queue:str=AUTO_QUEUE,
+    state:SearchState=None) -> DistanceTable:
+    """
+    Returns the DistanceTable holding the shortest path distance from each
+    of the source nodes to each of the target nodes; pairs with no directed
+    path between them have infinite distance, instead of raising
+    NoDirectedPathError.
+
+    Without "ch", one forward Dijkstra's search is run from each source node,
+    stopping as soon as every target node is permanent; this costs about as
+    much as a single src-dest query per source, no matter how many targets
+    there are.
+
+    For large tables, pass the graph's ContractionHierarchy (see
+    contraction.py) to use the bucket-based many-to-many algorithm instead:
+    a reverse upward search from each target leaves its distances in
+    "buckets" at the nodes it settles, then a forward upward search from
+    each source combines its distances with the buckets it finds. Each
+    search only settles a tiny portion of the graph, hence the table costs
+    len(sources) + len(targets) small searches plus the bucket scans.
+
+    See algorithms.dijkstra_fwd() for the "queue" and "state" parameters;
+    with "ch", the queue type is picked like contraction.dijkstra_ch() does
+    (see contraction.hierarchy_queue()).
+    """
+    sources = list(sources)
+    targets = list(targets)
+
+    for node in sources:
+        validate_node(graph, node, 'source')
+    for node in targets:
+        validate_node(graph, node, 'target')
+
+    if state is None:
+        state = graph.default_state()
+
+    table = DistanceTable(sources, targets)
+
+    if ch is None:
+        fill_table_search(graph, table, *graph.resolve_queue(queue), state)
+    else:
+        if ch.num_nodes != graph.num_nodes:
+            raise ValueError(
+                f"The contraction hierarchy has {ch.num_nodes} nodes, the graph {graph.num_nodes}"
+            )
+        fill_table_buckets(ch, table, hierarchy_queue(graph, queue), state)
+
+    return table
+
+
+def validate_node(graph:BaseGraph, node:int, role:str):
+    if not(0 <= node < graph.num_nodes):
+        raise KeyError(
+            f"The {role} node {node} is not inside the range [0, {graph.num_nodes-1}]"
+        )
+
+
+def fill_table_search(
+    graph:BaseGraph,
+    table:DistanceTable,
+    queue:str,
+    max_cost:int,
+    state:SearchState):
+    """
+    One forward search per source node, each stopping once all targets are
+    permanent; "queue" and "max_cost" are the ones of BaseGraph.resolve_queue().
+    """
+    target_nodes = set(table.targets)
+
+    for row, src in enumerate(table.sources):
+        # Only the forward half of the state is used
+        state.init(src, src, queue, max_cost)
+        num_remaining = len(target_nodes)
+
+        while state.temp_fwd:
+            i = state.make_node_perm_fwd()
+
+            if i in target_nodes:
+                num_remaining -= 1
+                if num_remaining == 0:
+                    break
+
+            i_dist_s = state.dist_s[i]
+
+            for _, j, cost in graph.out_arcs(i):
+                if state.dist_s[j] > i_dist_s + cost:
+                    state.dist_s[j] = i_dist_s + cost
+                    state.pred[j] = i
+                    state.temp_fwd.push(j, state.dist_s[j])
+
+        # Every target is either permanent or unreachable (with an
+        # infinite label) at this point
+        for col, dest in enumerate(table.targets):
+            table[row, col] = state.dist_s[dest]
+
+
+def fill_table_buckets(
+    ch:ContractionHierarchy,
+    table:DistanceTable,
+    queue:str,
+    state:SearchState):
+    """Bucket-based many-to-many algorithm on the contraction hierarchy."""
+
+    # For each node, the (column, distance to the column's target) pairs
+    # left by the reverse searches that settled it
+    buckets = dict()
+
+    for col, dest in enumerate(table.targets):
+        # Only the reverse half of the state is used
+        state.init(dest, dest, queue)
+
+        while state.temp_rev:
+            j = state.make_node_perm_rev()
+            j_dist_t = state.dist_t[j]
+
+            buckets.setdefault(j, []).append( (col, j_dist_t) )
+
+            for i, cost in ch.down_arcs(j):
+                if state.dist_t[i] > j_dist_t + cost:
+                    state.dist_t[i] = j_dist_t + cost
+                    state.succ[i] = j
+                    state.temp_rev.push(i, state.dist_t[i])
+
+    num_cols = table.shape[1]
+    data = table.data
+
+    for row, src in enumerate(table.sources):
+        # Only the forward half of the state is used
+        state.init(src, src, queue)
+        row_offset = row * num_cols
+
+        while state.temp_fwd:
+            i = state.make_node_perm_fwd()
+            i_dist_s = state.dist_s[i]
+
+            for col, dist_t in buckets.get(i, ()):
+                if i_dist_s + dist_t < data[row_offset + col]:
+                    data[row_offset + col] = i_dist_s + dist_t
+
+            for j, cost in ch.up_arcs(i):
+                if state.dist_s[j] > i_dist_s + cost:
+                    state.dist_s[j] = i_dist_s + cost
+                    state.pred[j] = i
+                    state.temp_fwd.push(j, state.dist_s[j])
@@ -3,7 +3,7 @@ from arc_node import Arc
 class InvalidArcError(Exception):
   """
   Raised whenever an invalid arc is read from the input JSON file passed as
-  a parameter to Graph's constructor.
+  a parameter to Graph's constructor, or passed to Graph.add_arc().
   NOTE: "Invalid" means that either of the following situations happened:
 
       - The arc has one or both "tail"/"head" fields referencing an invalid node
@@ -23,7 +23,8 @@ class InvalidArcError(Exception):
 class DuplicateArcError(Exception):
   """
   Raised whenever the Graph's constructor reads the same 
-  arc from the input JSON file more than once.
+  arc from the input JSON file more than once, or Graph.add_arc()
+  is passed an arc which is already in the graph.
   """
   def __init__(self, arc_without_cost:tuple):
     super().__init__(arc_without_cost)
@@ -37,4 +38,27 @@ class NoDirectedPathError(Exception):
   def __init__(self, src:int, dest:int):
     super().__init__(src, dest)
     self.src = src
-    self.dest = dest
\ No newline at end of file
+    self.dest = dest
+
+class InvalidSnapshotError(Exception):
+  """
+  Raised whenever a binary graph snapshot (see snapshot.py) can't be opened,
+  because it's either not a snapshot file, written with an unsupported format
+  version or byte order, or truncated.
+  """
+  def __init__(self, filename:str, details:str):
+    super().__init__(filename, details)
+    self.filename = filename
+    self.details = details
+
+class SearchBudgetError(Exception):
+  """
+  Raised whenever a search restricted by a SearchFilter (see search_filter.py)
+  would make more than "max_settled" nodes permanent, before finding the path
+  between the source node "src" and the destination node "dest".
+  """
+  def __init__(self, src:int, dest:int, max_settled:int):
+    super().__init__(src, dest, max_settled)
+    self.src = src
+    self.dest = dest
+    self.max_settled = max_settled
@@ -0,0 +1,345 @@
+import heapq
+from itertools import islice
+
+class SetFrontier:
+    """
+    Reference implementation of the set of temporary nodes: the node with
+    the minimum distance label is found by scanning the whole set, which
+    makes each extraction O(|temporary nodes|) and the whole search O(V^2).
+
+    It's kept as a baseline for comparing the other frontiers against.
+    """
+    __slots__ = (
+        # A dictionary mapping each temporary node to its distance label
+        'keys',
+    )
+
+    def __init__(self):
+        self.keys = dict()
+
+    def push(self, node:int, key:float):
+        """
+        Inserts the node in the set of temporary nodes with the specified
+        distance label, or updates its label if it's already there.
+        """
+        self.keys[node] = key
+
+    def pop_min(self) -> int:
+        """
+        Removes and returns the temporary node with the minimum distance label.
+        """
+        node = min(self.keys, key=self.keys.__getitem__)
+        del self.keys[node]
+        return node
+
+    def min_key(self) -> float:
+        """
+        Returns the minimum distance label among the temporary nodes
+        (+inf if there are none), without removing the node.
+        """
+        return min(self.keys.values(), default=float('+inf'))
+
+    def clear(self):
+        self.keys.clear()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, node:int) -> bool:
+        return node in self.keys
+
+    def __iter__(self):
+        return iter(self.keys)
+
+
+class HeapFrontier(SetFrontier):
+    """
+    Binary heap implementation of the set of temporary nodes, based on the
+    "lazy deletion" technique: instead of performing a decrease-key operation
+    whenever a node's distance label improves, a new (key, node) entry is
+    pushed on the heap and the stale ones are discarded when they reach
+    the top.
+
+    Each extraction costs O(log E), hence the whole search is O(E log E).
+    """
+    __slots__ = (
+        # A binary min-heap of (key, node) tuples; it may contain stale
+        # entries, that is entries whose key is not equal to the node's
+        # current key in "keys" (or whose node isn't temporary anymore).
+        'heap',
+    )
+
+    def __init__(self):
+        super().__init__()
+        self.heap = list()
+
+    def push(self, node:int, key:float):
+        self.keys[node] = key
+        heapq.heappush(self.heap, (key, node))
+
+    def pop_min(self) -> int:
+        keys = self.keys
+        heap = self.heap
+
+        while True:
+            key, node = heapq.heappop(heap)
+
+            # Discard the stale entries
+            if keys.get(node) == key:
+                del keys[node]
+                return node
+
+    def min_key(self) -> float:
+        keys = self.keys
+        heap = self.heap
+
+        # Discard the stale entries on top of the heap
+        while heap and keys.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+        return heap[0][0] if heap else float('+inf')
+
+    def clear(self):
+        self.keys.clear()
+        self.heap.clear()
+
+
+class DialFrontier(SetFrontier):
+    """
+    Dial's bucket queue, for integer distance labels only: the temporary
+    nodes are kept in a circular array of max_cost + 1 buckets, one for each
+    label in the range [minimum label, minimum label + max_cost], which holds
+    all of them as long as the labels are pushed in Dijkstra's order (that
+    is, each label is at most max_cost above the last extracted one, and
+    not below it).
+
+    Each extraction scans the buckets from the last extracted label onward,
+    so the whole search is O(E + max_cost * V) and it pays off for small
+    maximum costs only. Like HeapFrontier, each bucket is a binary heap of
+    nodes with lazy deletion, so that the nodes with the same label are
+    extracted in the same order, which makes the algorithms return the
+    same paths.
+    """
+    __slots__ = (
+        # A list of max_cost + 1 binary min-heaps of nodes; the nodes with
+        # label "key" are in buckets[key % len(buckets)], possibly along with
+        # stale entries, just like in HeapFrontier.
+        'buckets',
+
+        # The last extracted label, from which the next extraction starts
+        # scanning the buckets (None until the first insertion, which can
+        # have any label)
+        'cursor',
+    )
+
+    def __init__(self, max_cost:int):
+        super().__init__()
+        self.buckets = [list() for _ in range(int(max_cost) + 1)]
+        self.cursor = None
+
+    def push(self, node:int, key:float):
+        key = int(key)
+
+        if self.cursor is None:
+            self.cursor = key
+
+        self.keys[node] = key
+        heapq.heappush(self.buckets[key % len(self.buckets)], node)
+
+    def pop_min(self) -> int:
+        keys = self.keys
+        buckets = self.buckets
+        num_buckets = len(buckets)
+
+        if not keys:
+            raise IndexError("pop from an empty frontier")
+
+        for cursor in range(self.cursor, self.cursor + num_buckets):
+            bucket = buckets[cursor % num_buckets]
+
+            while bucket:
+                node = heapq.heappop(bucket)
+
+                # Discard the stale entries
+                if keys.get(node) == cursor:
+                    del keys[node]
+                    self.cursor = cursor
+                    return node
+
+        raise_out_of_range()
+
+    def min_key(self) -> float:
+        keys = self.keys
+        buckets = self.buckets
+        num_buckets = len(buckets)
+
+        if not keys:
+            return float('+inf')
+
+        for cursor in range(self.cursor, self.cursor + num_buckets):
+            bucket = buckets[cursor % num_buckets]
+
+            # Discard the stale entries on top of the bucket
+            while bucket:
+                if keys.get(bucket[0]) == cursor:
+                    return cursor
+                heapq.heappop(bucket)
+
+        raise_out_of_range()
+
+    def clear(self):
+        self.keys.clear()
+        for bucket in self.buckets:
+            bucket.clear()
+        self.cursor = None
+
+
+def raise_out_of_range():
+    raise ValueError(
+        "The temporary labels are out of the range of Dial's buckets: "
+        "they must be integers pushed in Dijkstra's order"
+    )
+
+
+class RadixHeapFrontier(SetFrontier):
+    """
+    Radix heap, for integer distance labels only, pushed in Dijkstra's
+    order (that is, never below the last extracted label): bucket i > 0
+    holds the (key, node) entries whose key differs from the last extracted
+    label in bit i-1 and in no higher bit, while bucket 0 holds the nodes
+    whose key is equal to it.
+
+    Once bucket 0 is empty, the first nonempty bucket is redistributed among
+    the lower ones around its minimum key, so each entry moves down at most
+    once per bit and the whole search is O(E + V log C), C being the maximum
+    arc cost. min_key() redistributes as well, taking the minimum key as the
+    last extracted label, since it's the next one extracted anyway.
+
+    Bucket 0 is a binary heap of nodes, so that the nodes with the same
+    label are extracted in the same order as HeapFrontier.
+    """
+    __slots__ = (
+        # 65 buckets (one per bit of a 64 bits label, plus bucket 0); the
+        # stale entries are discarded lazily, just like in HeapFrontier
+        'buckets',
+
+        # The last extracted label (None until the first insertion, which
+        # can have any label)
+        'last',
+    )
+
+    def __init__(self):
+        super().__init__()
+        self.buckets = [list() for _ in range(65)]
+        self.last = None
+
+    def push(self, node:int, key:float):
+        key = int(key)
+
+        if self.last is None:
+            self.last = key
+
+        self.keys[node] = key
+
+        if key == self.last:
+            heapq.heappush(self.buckets[0], node)
+        else:
+            self.buckets[(key ^ self.last).bit_length()].append( (key, node) )
+
+    def pop_min(self) -> int:
+        keys = self.keys
+        bucket = self.buckets[0]
+
+        while True:
+            while bucket:
+                node = heapq.heappop(bucket)
+
+                # Discard the stale entries
+                if keys.get(node) == self.last:
+                    del keys[node]
+                    return node
+
+            self.redistribute()
+
+    def redistribute(self):
+        """
+        Moves the entries of the first bucket holding any non-stale one to
+        the lower buckets, around their minimum key, which becomes the last
+        extracted label; raises IndexError if there are none.
+        """
+        keys = self.keys
+        buckets = self.buckets
+
+        for bucket in islice(buckets, 1, None):
+            entries = [(key, node) for key, node in bucket if keys.get(node) == key]
+            bucket.clear()
+
+            if entries:
+                last = self.last = min(entries)[0]
+
+                for key, node in entries:
+                    if key == last:
+                        heapq.heappush(buckets[0], node)
+                    else:
+                        buckets[(key ^ last).bit_length()].append( (key, node) )
+
+                return
+
+        raise IndexError("pop from an empty frontier")
+
+    def min_key(self) -> float:
+        keys = self.keys
+        bucket = self.buckets[0]
+
+        while True:
+            # Discard the stale entries on top of bucket 0
+            while bucket:
+                if keys.get(bucket[0]) == self.last:
+                    return self.last
+                heapq.heappop(bucket)
+
+            # Just like pop_min(), so that the next calls find the minimum
+            # key in bucket 0 rather than scanning the higher buckets again
+            try:
+                self.redistribute()
+            except IndexError:
+                return float('+inf')
+
+    def clear(self):
+        self.keys.clear()
+        for bucket in self.buckets:
+            bucket.clear()
+        self.last = None
+
+
+# The available frontier implementations, selectable through the
+# "queue" parameter of the algorithms in algorithms.py; the 'dial' and
+# 'radix' ones require integer arc costs (see BaseGraph.select_queue())
+FRONTIERS = {
+    'heap': HeapFrontier,
+    'set': SetFrontier,
+    'dial': DialFrontier,
+    'radix': RadixHeapFrontier,
+}
+
+# The "queue" value letting the graph pick the frontier implementation,
+# according to its arc costs (see BaseGraph.select_queue())
+AUTO_QUEUE = 'auto'
+
+def make_frontier(queue:str, max_cost:int=None) -> SetFrontier:
+    """
+    Returns a new, empty frontier of the specified type; "max_cost", the
+    maximum arc cost, is required by the 'dial' frontier only.
+    """
+    if queue == 'dial':
+        if max_cost is None:
+            raise ValueError("The 'dial' queue requires the maximum arc cost")
+
+        return DialFrontier(max_cost)
+
+    try:
+        return FRONTIERS[queue]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown queue type '{queue}' (expected one of: {', '.join(FRONTIERS)})"
+        ) from None
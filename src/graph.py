@@ -1,137 +1,151 @@
-import json, io
+import io
+from itertools import chain
+from operator import attrgetter
 
-from exceptions import InvalidArcError, DuplicateArcError
+from base_graph import BaseGraph
+from graph_loader import GraphJSONReader
 from arc_node import Arc, Node
+from exceptions import InvalidArcError, DuplicateArcError
 
-class Graph:
+class Graph(BaseGraph):
     __slots__ = (
-        # A list of Node tuples; each node is identified by its index
-        # inside this list
-        'nodes',  
-
-        # The following two fields are sets of node indices, referencing 
-        # Node tuples inside the "nodes" list defined above and representing,
-        # respectively:
-        #   - The set of permanent nodes (whose distance from the source node s
-        #     is proven to be optimal);
-        #   - The set of temporary nodes, whose distance's optimality has
-        #     not been proven yet.
-        #
-        # Both fields are used for the FORWARD Dijkstra's implementation:
-        # the algorithm starts with
-        #   - "perm_fwd" as an empty set;
-        #   - The source node s in "temp_fwd".
-        #
-        'perm_fwd',
-        'temp_fwd',
-
-        # Everything that has already been said about "perm_fwd" and
-        # "temp_fwd" still applies for the two fields below, except
-        # for the following:
-        #   - Both fields are used for the REVERSE Dijkstra's implementation;
-        #   - The algorithm starts with "perm_rev" as an empty set, and
-        #     the destination node t in "temp_rev".
-        #     
-        'perm_rev',
-        'temp_rev'
+        # A list of Node objects, holding each node's incoming and leaving
+        # arcs; each node is identified by its index inside this list
+        'nodes',
+
+        # Kept up to date by the methods changing the arcs, like CSRGraph's
+        'num_arcs',
     )
 
 
-    def __init__(self, file_json:io.TextIOWrapper):
-        graph_dict = json.load(file_json)
+    def __init__(self, file_json:io.TextIOBase, progress=None, trusted:bool=False):
+        """
+        Builds the graph from the specified JSON file (see graph_loader.py).
+
+        "progress", if specified, is called with the number of arcs
+        read so far while loading.
+
+        The arcs are read into flat arrays and validated all at once (see
+        BaseGraph._validate_arcs()) before the nodes' lists are built; if
+        "trusted" is True they aren't validated at all, which is only safe
+        for files already known to be valid (such as the generated ones).
+        """
+        reader = GraphJSONReader(file_json, progress)
 
-        num_nodes = graph_dict['num_nodes']
+        num_nodes = reader.read_num_nodes()
 
+        self.init_nodes(num_nodes)
         self.nodes = [Node() for _ in range(num_nodes)]
 
-        # In order to check for duplicate arcs, we'll insert each (tail, head)
-        # pair (without the cost, since two arcs with the same (tail, head)
-        # values but different cost are still duplicates) inside a list of
-        # sets (one set for each node).
-        arc_sets = [set() for _ in range(num_nodes)]
+        tails, heads, costs = reader.read_arc_arrays()
 
-        for curr_arc in graph_dict['arcs']:
-            arc = Arc(*curr_arc)
-            self.__validate_arc(arc, arc_sets)
+        if not trusted:
+            self._validate_arcs(tails, heads, costs)
 
-            self.nodes[arc.tail].out_arcs.append(arc)
-            self.nodes[arc.head].in_arcs.append(arc)
+        self.num_arcs = len(tails)
 
-            arc_sets[arc.tail].add( (arc.tail, arc.head) )
-    
+        nodes = self.nodes
+        for arc in map(Arc, tails, heads, costs):
+            nodes[arc.tail].out_arcs.append(arc)
+            nodes[arc.head].in_arcs.append(arc)
 
-    def init_state(self, src:int, dest:int):
-        """
-        Resets nodes' distance labels and predecessor/successor values.
 
-        Also, initialize the sets of permanent and temporary nodes, 
-        in order to prepare the graph for an execution of
-        one of the three variants of Dijkstra's algorithm.
+    def out_arcs(self, node:int) -> list:
+        return self.nodes[node].out_arcs
+
+
+    def in_arcs(self, node:int) -> list:
+        return self.nodes[node].in_arcs
+
+
+    def arc_costs(self):
+        return map(
+            attrgetter('cost'),
+            chain.from_iterable(map(attrgetter('out_arcs'), self.nodes))
+        )
+
+
+    # The following methods change the graph's arcs in place, in O(degree)
+    # time: each one only scans the arc lists of the arc's tail and head.
+    # They increment the graph's version (see BaseGraph.mark_modified()).
+
+    def add_arc(self, tail:int, head:int, cost:float):
+        """
+        Adds the arc (tail, head) with the specified cost; raises
+        InvalidArcError or DuplicateArcError, just like the constructor,
+        if the arc isn't valid or is already in the graph.
         """
+        arc = Arc(tail, head, cost)
+        self._validate_arc_values(arc)
 
-        self.__validate_src_dest(src, dest)
-        
-        self.perm_fwd = set()
-        self.temp_fwd = {src}
+        out_arcs = self.nodes[tail].out_arcs
+        if find_arc(out_arcs, tail, head) is not None:
+            raise DuplicateArcError( (tail, head) )
 
-        self.perm_rev = set()
-        self.temp_rev = {dest}
+        out_arcs.append(arc)
+        self.nodes[head].in_arcs.append(arc)
+        self.num_arcs += 1
 
-        for node in self.nodes:
-            node.reset_node()
-        
-        self.nodes[src].dist_s = 0
-        self.nodes[dest].dist_t = 0
+        self.mark_modified()
 
-        
-    def make_node_perm_fwd(self, node:int):
+
+    def remove_arc(self, tail:int, head:int) -> float:
         """
-        Moves the specified node from the set of temporary nodes to the
-        set of permanent nodes, for the FORWARD Dijkstra implementation.
+        Removes the arc (tail, head) and returns its cost; raises KeyError
+        if there's no such arc.
         """
-        self.temp_fwd.remove(node)
-        self.perm_fwd.add(node)
+        out_arcs, out_index, in_arcs, in_index = self._locate_arc(tail, head)
+        cost = out_arcs[out_index].cost
+
+        del out_arcs[out_index]
+        del in_arcs[in_index]
+        self.num_arcs -= 1
+
+        self.mark_modified()
+
+        return cost
 
 
-    def make_node_perm_rev(self, node:int):
+    def update_arc_cost(self, tail:int, head:int, cost:float):
         """
-        Moves the specified node from the set of temporary nodes to the
-        set of permanent nodes, for the REVERSE Dijkstra implementation.
+        Changes the cost of the arc (tail, head); raises KeyError if there's
+        no such arc, and InvalidArcError if the cost is negative.
         """
-        self.temp_rev.remove(node)
-        self.perm_rev.add(node)
-        
-    
-    def __validate_src_dest(self, src:int, dest:int):
-        num_nodes = len(self.nodes)
-
-        if not(0 <= src < num_nodes):
-            raise KeyError(
-                f"The source node {src} is not inside the range [0, {num_nodes-1}]"
-            )
-        if not(0 <= dest < num_nodes):
-            raise KeyError(
-                f"The destination node {dest} is not inside the range [0, {num_nodes-1}]"
-            )
-        if src == dest:
-            raise ValueError("The source/destination values must be different")
-
-
-    def __validate_arc(self, arc:Arc, arc_sets:list[set]):
-        num_nodes = len(self.nodes)
-
-        if  not(0 <= arc.tail < num_nodes):
-            raise InvalidArcError(arc, f"Tail not in range [0, {num_nodes-1}]")
-
-        if  not(0 <= arc.head < num_nodes):
-            raise InvalidArcError(arc, f"Head not in range [0, {num_nodes-1}]")
-
-        if arc.cost < 0:
+        arc = Arc(tail, head, cost)
+        if cost < 0:
             raise InvalidArcError(arc, "Negative cost")
-        
-        if arc.tail == arc.head:
-            raise InvalidArcError(arc, "Loopback arc: tail is equal to head")
 
-        arc_without_cost = (arc.tail, arc.head)
-        if arc_without_cost in arc_sets[arc.tail]:
-            raise DuplicateArcError(arc_without_cost)
\ No newline at end of file
+        out_arcs, out_index, in_arcs, in_index = self._locate_arc(tail, head)
+
+        out_arcs[out_index] = arc
+        in_arcs[in_index] = arc
+
+        self.mark_modified()
+
+
+    def _locate_arc(self, tail:int, head:int) -> tuple:
+        """
+        Returns the (out_arcs, index, in_arcs, index) tuple locating the arc
+        (tail, head) inside the arc lists of its tail and head.
+        """
+        if 0 <= tail < self.num_nodes and 0 <= head < self.num_nodes:
+            out_arcs = self.nodes[tail].out_arcs
+            out_index = find_arc(out_arcs, tail, head)
+
+            if out_index is not None:
+                in_arcs = self.nodes[head].in_arcs
+                return (out_arcs, out_index, in_arcs, find_arc(in_arcs, tail, head))
+
+        raise KeyError(f"There is no arc from node {tail} to node {head}")
+
+
+def find_arc(arcs:list, tail:int, head:int) -> int:
+    """
+    Returns the index of the arc (tail, head) inside the specified list
+    of arcs, or None if it's not there.
+    """
+    for index, arc in enumerate(arcs):
+        if arc.tail == tail and arc.head == head:
+            return index
+
+    return None
@@ -0,0 +1,73 @@
+import io
+
+from graph import Graph
+
+# The operations of a delta file, and the number of fields following each
+# one: the arc's tail and head, plus the cost for 'add' and 'set'
+OPERATIONS = {
+    'add': 3,
+    'set': 3,
+    'del': 2,
+}
+
+
+def read_deltas(file_deltas:io.TextIOBase):
+    """
+    Generator returning the (operation, tail, head, cost) tuples read from
+    the specified delta file, one per line, with the fields separated by
+    whitespace or a comma:
+
+        add <tail> <head> <cost>    adds a new arc;
+        set <tail> <head> <cost>    changes the cost of an existing arc;
+        del <tail> <head>           removes an existing arc (cost is None).
+
+    Blank lines and lines starting with '#' are skipped.
+    """
+    for line_num, line in enumerate(file_deltas, start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        operation, *fields = line.replace(',', ' ').split()
+        try:
+            if len(fields) != OPERATIONS[operation]:
+                raise ValueError
+
+            tail = int(fields[0])
+            head = int(fields[1])
+            cost = float(fields[2]) if operation != 'del' else None
+        except (KeyError, ValueError):
+            raise ValueError(
+                f"Line {line_num}: expected 'add|set <tail> <head> <cost>' or "
+                f"'del <tail> <head>', found '{line}'"
+            ) from None
+
+        yield (operation, tail, head, cost)
+
+
+def apply_deltas(graph:Graph, deltas) -> int:
+    """
+    Applies the (operation, tail, head, cost) tuples returned by read_deltas()
+    to the graph, in order, and returns their number; each one costs
+    O(degree) (see Graph.add_arc()/update_arc_cost()/remove_arc()).
+
+    The first invalid delta raises the corresponding exception, leaving
+    the previous ones applied.
+    """
+    add_arc = graph.add_arc
+    update_arc_cost = graph.update_arc_cost
+    remove_arc = graph.remove_arc
+
+    num_deltas = 0
+
+    for operation, tail, head, cost in deltas:
+        if operation == 'set':
+            update_arc_cost(tail, head, cost)
+        elif operation == 'add':
+            add_arc(tail, head, cost)
+        else:
+            remove_arc(tail, head)
+
+        num_deltas += 1
+
+    return num_deltas
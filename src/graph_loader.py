@@ -0,0 +1,327 @@
+import json, io, re, gzip
+from array import array
+
+from arc_node import Arc
+
+# Matches an arc written as a plain [<tail>, <head>, <cost>] array of
+# numbers, along with the whitespace around it and the ',' or ']' following
+# it; this is by far the most common case, and anything else is handed over
+# to the standard json decoder.
+ARC_REGEX = re.compile(
+    r'\s*\[\s*(-?\d+)\s*,\s*(-?\d+)\s*,\s*(-?\d+(\.\d+)?([eE][-+]?\d+)?)\s*\]\s*([,\]])'
+)
+
+WHITESPACE_REGEX = re.compile(r'\s*')
+
+# How many arcs are read between two calls of the progress callback
+PROGRESS_STEP = 100_000
+
+
+def open_graph_file(filename:str) -> io.TextIOBase:
+    """
+    Opens the specified JSON graph file for reading, transparently
+    decompressing it if its name ends with .gz
+    """
+    if filename.endswith('.gz'):
+        return gzip.open(filename, 'rt')
+
+    return open(filename, 'r')
+
+
+class GraphJSONReader:
+    """
+    Incremental parser for the JSON graph format (see README.md), reading
+    the input file in chunks and returning the arcs one at a time, without
+    ever materializing the whole "arcs" list in memory.
+
+    Usage:
+        reader = GraphJSONReader(file_json)
+        num_nodes = reader.read_num_nodes()
+        for arc in reader.read_arcs():
+            ...
+
+    Parsing errors raise json.JSONDecodeError, and a missing "num_nodes" or
+    "arcs" field raises KeyError, like indexing the dictionary returned by
+    json.load() would.
+    """
+    __slots__ = (
+        'file',
+        'chunk_size',
+
+        # Optional callable, invoked with the number of arcs read so far
+        # every PROGRESS_STEP arcs and once the last arc has been read
+        'progress',
+
+        # The text read from the file and not parsed yet starts at
+        # index "pos" of "buf"
+        'buf',
+        'pos',
+        'eof',
+
+        # The number of keys of the top-level object read so far
+        'num_keys',
+
+        'num_nodes',
+
+        # Arcs found before the "num_nodes" field (if any), which must be
+        # kept until the number of nodes is known
+        'pending_arcs',
+
+        # Whether the "arcs" field has already been read
+        'arcs_read',
+        'num_arcs',
+    )
+
+    decoder = json.JSONDecoder()
+
+
+    def __init__(
+        self,
+        file_json:io.TextIOBase,
+        progress=None,
+        chunk_size:int=1 << 20):
+
+        self.file = file_json
+        self.chunk_size = chunk_size
+        self.progress = progress
+
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+        self.num_keys = 0
+        self.num_nodes = None
+        self.pending_arcs = list()
+        self.arcs_read = False
+        self.num_arcs = 0
+
+
+    def read_num_nodes(self) -> int:
+        """
+        Parses the input up to the "num_nodes" field, and returns its value.
+        """
+        self._skip_whitespace()
+        self._expect('{')
+
+        while self.num_nodes is None:
+            key = self._read_key()
+            if key is None:
+                raise KeyError('num_nodes')
+
+            if key == 'arcs':
+                # Unusual field order: the arcs have to be kept aside
+                self.pending_arcs.extend(self._parse_arcs())
+            else:
+                self._read_value(key)
+
+        return self.num_nodes
+
+
+    def read_arcs(self):
+        """
+        Generator returning the graph's arcs as Arc tuples, in the same
+        order as they appear in the input; it must be called after
+        read_num_nodes().
+
+        The remaining part of the input is parsed and checked as well.
+        """
+        yield from self.pending_arcs
+        self.pending_arcs = list()
+
+        while (key := self._read_key()) is not None:
+            if key == 'arcs':
+                yield from self._parse_arcs()
+            else:
+                self._read_value(key)
+
+        if not self.arcs_read:
+            raise KeyError('arcs')
+
+        self._skip_whitespace()
+        if self.pos != len(self.buf):
+            self._error("Extra data")
+
+
+    def read_arc_arrays(self) -> tuple:
+        """
+        Reads all the arcs (see read_arcs()) into three parallel arrays,
+        and returns the (tails, heads, costs) tuple.
+        """
+        tails = array('q')
+        heads = array('q')
+        costs = array('d')
+
+        append_tail = tails.append
+        append_head = heads.append
+        append_cost = costs.append
+
+        for tail, head, cost in self.read_arcs():
+            append_tail(tail)
+            append_head(head)
+            append_cost(cost)
+
+        return (tails, heads, costs)
+
+
+    def _parse_arcs(self):
+        self.arcs_read = True
+
+        self._skip_whitespace()
+        self._expect('[')
+
+        self._skip_whitespace()
+        if self._peek() == ']':
+            self.pos += 1
+            return
+
+        # Hot loop: the buffer and the position are kept in local variables,
+        # and written back before any other method is called.
+        buf = self.buf
+        pos = self.pos
+        match_arc = ARC_REGEX.match
+        progress = self.progress
+
+        while True:
+            match = match_arc(buf, pos)
+
+            if match is not None:
+                tail, head, cost, fraction, exponent, separator = match.groups()
+                if fraction or exponent:
+                    cost = float(cost)
+                else:
+                    cost = int(cost)
+
+                arc = Arc(int(tail), int(head), cost)
+                pos = match.end()
+
+            else:
+                self.pos = pos
+
+                if not self.eof and len(buf) - pos < 1024:
+                    # The arc may be split between this chunk and the next one
+                    self._fill()
+                    buf = self.buf
+                    pos = self.pos
+                    continue
+
+                # Not a plain array of three numbers: let the json module
+                # deal with it, like json.load() would
+                arc = Arc(*self._decode_value())
+
+                self._skip_whitespace()
+                separator = self._peek()
+                if separator != ']':
+                    self._expect(',')
+                else:
+                    self.pos += 1
+
+                buf = self.buf
+                pos = self.pos
+
+            yield arc
+
+            self.num_arcs += 1
+            if progress is not None and self.num_arcs % PROGRESS_STEP == 0:
+                progress(self.num_arcs)
+
+            if separator == ']':
+                break
+
+        self.pos = pos
+
+        if progress is not None:
+            progress(self.num_arcs)
+
+
+    def _read_key(self) -> str:
+        """
+        Reads the next key of the top-level object along with the ':'
+        separator, or returns None if the closing '}' is found instead.
+        """
+        self._skip_whitespace()
+
+        if self._peek() == '}':
+            self.pos += 1
+            return None
+
+        if self.num_keys > 0:
+            self._expect(',')
+
+        key = self._decode_value()
+        self.num_keys += 1
+        if not isinstance(key, str):
+            self._error("Expecting property name enclosed in double quotes")
+
+        self._skip_whitespace()
+        self._expect(':')
+
+        return key
+
+
+    def _read_value(self, key:str):
+        value = self._decode_value()
+
+        if key == 'num_nodes':
+            self.num_nodes = value
+
+
+    def _decode_value(self):
+        """Decodes the JSON value starting at the current position."""
+        self._skip_whitespace()
+
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill()
+                continue
+
+            # A number at the end of the chunk may continue in the next one
+            if end == len(self.buf) and not self.eof:
+                self._fill()
+                continue
+
+            self.pos = end
+            return value
+
+
+    def _fill(self):
+        """Reads the next chunk from the input file."""
+        chunk = self.file.read(self.chunk_size)
+
+        if not chunk:
+            self.eof = True
+
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+
+    def _skip_whitespace(self):
+        while True:
+            self.pos = WHITESPACE_REGEX.match(self.buf, self.pos).end()
+
+            if self.pos < len(self.buf) or self.eof:
+                return
+
+            self._fill()
+
+
+    def _peek(self) -> str:
+        """Returns the next character (or '' at the end of the input)."""
+        if self.pos == len(self.buf) and not self.eof:
+            self._fill()
+
+        return self.buf[self.pos : self.pos + 1]
+
+
+    def _expect(self, char:str):
+        if self._peek() != char:
+            self._error(f"Expecting '{char}'")
+
+        self.pos += 1
+
+
+    def _error(self, msg:str):
+        raise json.JSONDecodeError(msg, self.buf, self.pos)
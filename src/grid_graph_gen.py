@@ -1,90 +1,371 @@
-import random, sys, json
+import argparse, gzip, math, random, sys
+from array import array
+from itertools import repeat, starmap
+from operator import add, mul, sub
 
 
-def grid_graph_gen(num_side_nodes:int, max_cost:int) -> dict:
+# Benchmark graph generators. Each topology yields its arcs in batches of
+# three parallel arrays (tails, heads, costs), which are written straight to
+# the output file, so that the whole list of arcs is never held in memory
+# (except for binary snapshots, whose CSR arrays need all of them at once).
+
+
+def random_costs(rng:random.Random, max_cost:int, num_costs:int) -> array:
+    """
+    Returns an array of "num_costs" random integer costs inside the range
+    [0, max_cost], computed by builtin functions chained through map(),
+    without running Python code (nor calling random.randint()) for each cost.
+    """
+    return array('q', map(
+        int,
+        map(mul, starmap(rng.random, repeat((), num_costs)), repeat(max_cost + 1))
+    ))
+
+
+def node_range(start:int, stop:int, step:int=1) -> array:
+    return array('q', range(start, stop, step))
+
+
+def grid_arcs(
+    num_side_nodes:int,
+    max_cost:int,
+    rng:random.Random,
+    diagonals:bool=False):
+    """
+    Generator returning the arcs of a (num_side_nodes) * (num_side_nodes)
+    grid graph, one batch per row of nodes: the node (i, j) has ID
+    i * num_side_nodes + j, and is connected to its 4 neighbors (plus the
+    4 diagonal ones, if "diagonals" is True) in both directions, with
+    random costs inside the range [0, max_cost].
+    """
+    # The (delta_row, delta_col) offsets of each node's neighbors
+    directions = [(0, 1), (-1, 0), (0, -1), (1, 0)]
+    if diagonals:
+        directions += [(-1, 1), (-1, -1), (1, -1), (1, 1)]
+
+    for i in range(num_side_nodes):
+        row_node = i * num_side_nodes
+
+        tails = array('q')
+        heads = array('q')
+
+        for delta_row, delta_col in directions:
+            if not(0 <= i + delta_row < num_side_nodes):
+                continue
+
+            # The columns whose neighbor in this direction is inside the grid
+            first_col = max(0, -delta_col)
+            last_col = num_side_nodes - max(0, delta_col)
+
+            row_tails = node_range(row_node + first_col, row_node + last_col)
+            delta = delta_row * num_side_nodes + delta_col
+
+            tails.extend(row_tails)
+            heads.extend(map(add, row_tails, repeat(delta)))
+
+        yield (tails, heads, random_costs(rng, max_cost, len(tails)))
+
+
+def geometric_points(num_nodes:int, rng:random.Random) -> tuple:
+    """Returns the (x, y) arrays of random points inside the unit square."""
+    x = array('d', starmap(rng.random, repeat((), num_nodes)))
+    y = array('d', starmap(rng.random, repeat((), num_nodes)))
+    return (x, y)
+
+
+def geometric_arcs(x:array, y:array, radius:float, max_cost:int):
+    """
+    Generator returning the arcs of a random geometric graph: the nodes are
+    the points (x, y), and each pair of them closer than "radius" is
+    connected in both directions, with cost equal to their Euclidean distance
+    scaled so that the longest possible arc costs "max_cost".
+
+    The points are bucketed into square cells of side "radius", so that each
+    node is only compared with the ones in its own and neighboring cells;
+    one batch is returned for each row of cells.
+    """
+    num_cells = max(1, int(1 / radius))
+    cells = dict()
+
+    for node, (node_x, node_y) in enumerate(zip(x, y)):
+        cell = ( min(int(node_x * num_cells), num_cells - 1),
+                 min(int(node_y * num_cells), num_cells - 1) )
+        cells.setdefault(cell, array('q')).append(node)
+
+    scale = max_cost / radius
+    empty = array('q')
+
+    for cell_x in range(num_cells):
+        tails = array('q')
+        heads = array('q')
+        costs = array('d')
+
+        for cell_y in range(num_cells):
+            cell_nodes = cells.get( (cell_x, cell_y), empty )
+
+            neighbors = array('q')
+            for delta_x in (-1, 0, 1):
+                for delta_y in (-1, 0, 1):
+                    neighbors.extend(cells.get( (cell_x + delta_x, cell_y + delta_y), empty ))
+
+            neighbors_x = array('d', map(x.__getitem__, neighbors))
+            neighbors_y = array('d', map(y.__getitem__, neighbors))
+
+            for node in cell_nodes:
+                dists = list(map(
+                    math.hypot,
+                    map(sub, neighbors_x, repeat(x[node])),
+                    map(sub, neighbors_y, repeat(y[node]))
+                ))
+
+                for neighbor, dist in zip(neighbors, dists):
+                    if dist < radius and neighbor != node:
+                        tails.append(node)
+                        heads.append(neighbor)
+                        costs.append(dist * scale)
+
+        yield (tails, heads, costs)
+
+
+def scale_free_arcs(num_nodes:int, max_cost:int, rng:random.Random, num_links:int):
+    """
+    Generator returning the arcs of a scale-free graph, grown by
+    preferential attachment (Barabasi-Albert model): each new node is
+    connected to "num_links" distinct older nodes, each one chosen with
+    probability proportional to its degree, in both directions and with
+    random costs inside the range [0, max_cost].
+
+    One batch is returned every 10000 nodes.
+    """
+    # Each node appears once for each arc incident to it, so that picking
+    # a random element picks a node with probability proportional to its degree
+    endpoints = array('q')
+
+    batch_size = 10_000
+
+    for first_node in range(0, num_nodes, batch_size):
+        tails = array('q')
+        heads = array('q')
+
+        for node in range(first_node, min(first_node + batch_size, num_nodes)):
+            if node <= num_links:
+                # The first nodes form a clique
+                targets = range(node)
+            else:
+                targets = set()
+                while len(targets) < num_links:
+                    targets.add(endpoints[int(rng.random() * len(endpoints))])
+
+            for target in targets:
+                tails.append(node)
+                heads.append(target)
+                tails.append(target)
+                heads.append(node)
+
+                endpoints.append(node)
+                endpoints.append(target)
+
+        yield (tails, heads, random_costs(rng, max_cost, len(tails)))
+
+
+# For each topology, the meaning of the "size" parameter of generate_graph()
+TOPOLOGIES = {
+    'grid4': 'number of side nodes',
+    'grid8': 'number of side nodes',
+    'geometric': 'number of nodes',
+    'scale-free': 'number of nodes',
+}
+
+def generate_graph(
+    topology:str,
+    size:int,
+    max_cost:int,
+    seed:int=None,
+    degree:int=6) -> tuple:
+    """
+    Returns the (num_nodes, batches, extra_fields) tuple describing a random
+    graph of the specified topology (see TOPOLOGIES):
+        - "batches" is an iterator over the (tails, heads, costs) arrays of
+          the arcs, generated lazily;
+        - "extra_fields" is a dictionary of additional fields for the JSON
+          file, holding the nodes' coordinates ("x", "y") for the geometric
+          graphs, whose arcs' costs are proportional to their length.
+
+    "degree" is the approximate average out-degree of the geometric and
+    scale-free graphs; the same seed always yields the same graph.
+    """
+    rng = random.Random(seed)
+
+    if topology in ('grid4', 'grid8'):
+        num_nodes = size * size
+        batches = grid_arcs(size, max_cost, rng, diagonals = topology == 'grid8')
+        return (num_nodes, batches, dict())
+
+    if topology == 'geometric':
+        x, y = geometric_points(size, rng)
+
+        # Each node has about num_nodes * pi * radius^2 neighbors
+        radius = min(1.0, math.sqrt(degree / (math.pi * max(size, 1))))
+
+        return (size, geometric_arcs(x, y, radius, max_cost), {'x': x, 'y': y})
+
+    if topology == 'scale-free':
+        num_links = max(1, degree // 2)
+        return (size, scale_free_arcs(size, max_cost, rng, num_links), dict())
+
+    raise ValueError(
+        f"Unknown topology '{topology}' (expected one of: {', '.join(TOPOLOGIES)})"
+    )
+
+
+def grid_graph_gen(num_side_nodes:int, max_cost:int, seed:int=None) -> dict:
     """Generates a 4-neighbors grid graph made up of
     (num_side_nodes) * (num_side_nodes) nodes, with
     randomized arc costs inside the range [0, max_cost].
+
+    The whole graph is returned as a dictionary with the same structure
+    as the JSON files; use write_json() for large graphs instead.
     """
-    num_nodes = num_side_nodes * num_side_nodes
+    rng = random.Random(seed)
+
+    arcs = list()
+    for tails, heads, costs in grid_arcs(num_side_nodes, max_cost, rng):
+        arcs.extend(zip(tails, heads, costs))
 
-    graph_dict = {
-        'num_nodes': num_nodes,
-        'arcs': list()
+    return {
+        'num_nodes': num_side_nodes * num_side_nodes,
+        'arcs': arcs
     }
 
-    random.seed()
 
-    for i in range(num_side_nodes):
-        row_node = i * num_side_nodes
-        for j in range(num_side_nodes):
-            # NOTE: for each direction, we check that
-            # the head index is not out of bounds.
-            # There are more efficient ways to deal with this, but this is
-            # a one-off generator to save JSON files and therefore I prefer
-            # code simplicity over efficiency.
-
-            nodeId = row_node + j
-
-            # East
-            if j != num_side_nodes - 1: 
-                arc = ( nodeId, nodeId+1, random.randint(0, max_cost) )
-                graph_dict['arcs'].append(arc)
-            
-            # South
-            if i != 0:
-                arc = ( nodeId, nodeId - num_side_nodes, random.randint(0, max_cost) )
-                graph_dict['arcs'].append(arc)
-            
-            # West
-            if j != 0:
-                arc = ( nodeId, nodeId - 1, random.randint(0, max_cost) )
-                graph_dict['arcs'].append(arc)
-            
-            # North
-            if i != num_side_nodes - 1:
-                arc = ( nodeId, nodeId + num_side_nodes, random.randint(0, max_cost) )
-                graph_dict['arcs'].append(arc)
-    
-    return graph_dict
-
-
-def validate_args(argv) -> tuple:
-    usage_msg = (
-        "\nUsage:\n"
-        "python grid_graph_gen.py <num_side_nodes> <max_cost> <output_json_filename>\n"
+def arc_arrays(batches) -> tuple:
+    """Concatenates the batches of arcs into single (tails, heads, costs) arrays."""
+    tails = array('q')
+    heads = array('q')
+    costs = array('d')
+
+    for batch_tails, batch_heads, batch_costs in batches:
+        tails.extend(batch_tails)
+        heads.extend(batch_heads)
+        costs.extend(map(float, batch_costs))
+
+    return (tails, heads, costs)
+
+
+def write_json(file_json, num_nodes:int, batches, extra_fields:dict=None, progress=None):
+    """
+    Writes the graph to a JSON file (see README.md), one batch of arcs at
+    a time; "progress", if specified, is called with the number of arcs
+    written so far after each batch.
+    """
+    file_json.write(f'{{"num_nodes": {num_nodes}')
+
+    for key, values in (extra_fields or dict()).items():
+        file_json.write(f', "{key}": [')
+        file_json.write(','.join(map(repr, values)))
+        file_json.write(']')
+
+    file_json.write(', "arcs": [')
+
+    num_arcs = 0
+    for tails, heads, costs in batches:
+        if not tails:
+            continue
+
+        if num_arcs > 0:
+            file_json.write(',')
+
+        file_json.write(','.join(map('[{},{},{!r}]'.format, tails, heads, costs)))
+
+        num_arcs += len(tails)
+        if progress is not None:
+            progress(num_arcs)
+
+    file_json.write(']}')
+
+
+def write_binary(file_bin, num_nodes:int, batches):
+    """Writes the graph to a binary snapshot file (see snapshot.py)."""
+    from csr_graph import CSRGraph
+    from snapshot import write_snapshot
+
+    graph = CSRGraph.from_arcs(num_nodes, *arc_arrays(batches))
+    write_snapshot(graph, file_bin)
+
+
+def validate_args(argv) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='grid_graph_gen.py',
+        description="Generates random benchmark graphs, usable as input for dijkstra_cmp.py."
+    )
+    parser.add_argument(
+        'size', type=int,
+        help=(
+            "the number of side nodes for grids, the number of nodes "
+            "for the other topologies"
+        )
+    )
+    parser.add_argument('max_cost', type=int, help="the maximum arc cost")
+    parser.add_argument(
+        'output_filename',
+        help="either a .json/.json.gz file or a .snap binary snapshot"
+    )
+    parser.add_argument(
+        '--topology', choices=TOPOLOGIES, default='grid4',
+        help=(
+            "grid4: 4-neighbors grid (default); grid8: 8-neighbors grid; "
+            "geometric: random geometric graph; scale-free: preferential "
+            "attachment graph"
+        )
+    )
+    parser.add_argument(
+        '--degree', type=int, default=6,
+        help="the average out-degree of geometric and scale-free graphs (default: 6)"
     )
-    if len(argv) != 4:
-        print(usage_msg)
-        quit()
-
-    try:
-        num_side_nodes = int(argv[1])
-    except ValueError:
-        print("Parameter 'num_side_nodes' must be integer")
-        quit()
-
-    try:
-        max_cost = int(argv[2])
-    except ValueError:
-        print("Parameter 'max_cost' must be integer")
-        quit()
-    
-    output_json_filename = argv[3]
-    if not output_json_filename.endswith('.json'):
-        print("Parameter 'output_json_filename' must have .json extension")
-        quit()
-    
-    return (num_side_nodes, max_cost, output_json_filename)
+    parser.add_argument(
+        '--seed', type=int,
+        help="seed for the random generator, to make the graph reproducible"
+    )
+
+    args = parser.parse_args(argv[1:])
+
+    if args.size < 0:
+        parser.error("Parameter 'size' must be nonnegative")
+
+    if args.max_cost < 0:
+        parser.error("Parameter 'max_cost' must be nonnegative")
+
+    if args.degree <= 0:
+        parser.error("Parameter 'degree' must be positive")
+
+    if not args.output_filename.endswith( ('.json', '.json.gz', '.snap') ):
+        parser.error("Parameter 'output_filename' must have .json, .json.gz or .snap extension")
+
+    return args
+
 
 if __name__ == '__main__':
-    num_side_nodes, max_cost, output_json_filename = validate_args(sys.argv)
+    args = validate_args(sys.argv)
+
+    num_nodes, batches, extra_fields = generate_graph(
+        args.topology, args.size, args.max_cost, args.seed, args.degree
+    )
+
+    def print_progress(num_arcs:int):
+        print(f'\rSaving the graph... {num_arcs} arcs', end='', flush=True)
+
+    print("Saving the graph...", end=' ', flush=True)
+    if args.output_filename.endswith('.snap'):
+        with open(args.output_filename, 'wb') as f:
+            write_binary(f, num_nodes, batches)
+    else:
+        if args.output_filename.endswith('.gz'):
+            f = gzip.open(args.output_filename, 'wt')
+        else:
+            f = open(args.output_filename, 'w')
 
-    print("Creating the grid graph...")
-    graph_dict = grid_graph_gen(num_side_nodes, max_cost)
+        with f:
+            write_json(f, num_nodes, batches, extra_fields, print_progress)
+    print(' done')
 
-    print("Saving the grid graph...")
-    graph_dict = grid_graph_gen(num_side_nodes, max_cost)
-    with open(output_json_filename, 'w') as f:
-        json.dump(graph_dict, f)
-    print("The grid graph has been saved.")
\ No newline at end of file
+    print("The graph has been saved.")
@@ -0,0 +1,216 @@
+import math, random
+from array import array
+
+from base_graph import BaseGraph
+from sssp import shortest_path_tree
+
+# Heuristics for the A* algorithm (see algorithms.astar()): callables taking
+# a node and the destination node, and returning a lower bound on the cost
+# of the optimal path between them.
+
+
+def min_arc_cost(graph:BaseGraph) -> float:
+    """Returns the minimum cost among the graph's arcs (0 if there are none)."""
+    return min(
+        (cost for node in range(graph.num_nodes) for _, _, cost in graph.out_arcs(node)),
+        default=0
+    )
+
+
+class CoordinateHeuristic:
+    """
+    Estimates the distance between two nodes as the distance between their
+    coordinates, multiplied by "scale": the minimum cost of an arc per unit
+    of distance between its tail and head.
+
+    The "metric" must be one of:
+        - 'manhattan': for graphs whose arcs only connect nodes differing in
+          a single coordinate (such as 4-neighbors grids);
+        - 'chebyshev': for 8-neighbors grids, whose diagonal arcs cover one
+          unit of distance along both coordinates;
+        - 'euclidean': for graphs embedded in the plane (such as road
+          networks), with "scale" being the minimum cost per unit of length.
+    """
+    __slots__ = (
+        'x',
+        'y',
+        'scale',
+        'metric',
+    )
+
+    METRICS = ('manhattan', 'chebyshev', 'euclidean')
+
+
+    def __init__(self, x:array, y:array, scale:float, metric:str='euclidean'):
+        if metric not in self.METRICS:
+            raise ValueError(
+                f"Unknown metric '{metric}' (expected one of: {', '.join(self.METRICS)})"
+            )
+
+        self.x = x
+        self.y = y
+        self.scale = scale
+        self.metric = metric
+
+
+    def __call__(self, node:int, dest:int) -> float:
+        dx = abs(self.x[node] - self.x[dest])
+        dy = abs(self.y[node] - self.y[dest])
+
+        if self.metric == 'manhattan':
+            return self.scale * (dx + dy)
+        if self.metric == 'chebyshev':
+            return self.scale * max(dx, dy)
+
+        return self.scale * math.hypot(dx, dy)
+
+
+class GridHeuristic:
+    """
+    Manhattan distance heuristic for the 4-neighbors grid graphs generated
+    by grid_graph_gen.py, where the node (i, j) has ID i * num_side_nodes + j.
+
+    The number of steps between two nodes is multiplied by the graph's
+    minimum arc cost, hence the heuristic is only useful on grids whose
+    arc costs are all strictly positive.
+    """
+    __slots__ = (
+        'num_side_nodes',
+        'scale',
+    )
+
+
+    def __init__(self, graph:BaseGraph, num_side_nodes:int):
+        if num_side_nodes * num_side_nodes != graph.num_nodes:
+            raise ValueError(
+                f"A {num_side_nodes}x{num_side_nodes} grid can't have {graph.num_nodes} nodes"
+            )
+
+        self.num_side_nodes = num_side_nodes
+        self.scale = min_arc_cost(graph)
+
+
+    def __call__(self, node:int, dest:int) -> float:
+        node_row, node_col = divmod(node, self.num_side_nodes)
+        dest_row, dest_col = divmod(dest, self.num_side_nodes)
+
+        return self.scale * (abs(node_row - dest_row) + abs(node_col - dest_col))
+
+
+class LandmarkHeuristic:
+    """
+    ALT (A*, Landmarks, Triangle inequality) heuristic: the distances from and
+    to a few "landmark" nodes are precomputed, and for each landmark L the
+    triangle inequality gives two lower bounds on the distance from v to t:
+
+        dist(v, t) >= dist(L, t) - dist(L, v)
+        dist(v, t) >= dist(v, L) - dist(t, L)
+
+    The heuristic returns the best of these bounds over all landmarks.
+
+    Landmarks are chosen with the "farthest" strategy: the first one at
+    random, then each following one as the node farthest from the ones
+    already chosen, which tends to pick nodes on the graph's periphery
+    (where landmarks give the tightest bounds).
+    """
+    __slots__ = (
+        'landmarks',
+
+        # For each landmark, the distances from it to each node and
+        # from each node to it, respectively
+        'dist_from',
+        'dist_to',
+
+        # The destination node of the last call, and the (dist_from, dist(L, t),
+        # dist_to, dist(t, L)) tuple of each landmark reaching and reachable
+        # from it, which only depend on the destination node
+        'cached_dest',
+        'cached_bounds',
+    )
+
+
+    def __init__(
+        self,
+        graph:BaseGraph,
+        num_landmarks:int,
+        seed:int=None,
+        landmarks:list=None):
+        """
+        Chooses "num_landmarks" landmarks (unless they're explicitly passed
+        in the "landmarks" list) and computes their distances; "seed" makes
+        the choice of the first landmark reproducible.
+
+        The precomputation costs 2 * num_landmarks searches over the
+        whole graph, and 16 * num_landmarks bytes per node.
+        """
+        self.dist_from = list()
+        self.dist_to = list()
+
+        if landmarks is None:
+            landmarks = list()
+            rng = random.Random(seed)
+            next_landmark = rng.randrange(graph.num_nodes)
+
+            # The minimum distance of each node from the landmarks chosen
+            # so far; unreachable nodes are never chosen
+            min_dist = array('d', [float('+inf')]) * graph.num_nodes
+
+            while len(landmarks) < num_landmarks:
+                landmarks.append(next_landmark)
+                self.add_landmark(graph, next_landmark)
+
+                for node, dist in enumerate(self.dist_from[-1]):
+                    if dist < min_dist[node]:
+                        min_dist[node] = dist
+
+                next_landmark = max(
+                    range(graph.num_nodes),
+                    key = lambda node: min_dist[node] if min_dist[node] != float('+inf') else -1
+                )
+                if next_landmark in landmarks:
+                    # Every reachable node has already been chosen
+                    break
+        else:
+            for landmark in landmarks:
+                self.add_landmark(graph, landmark)
+
+        self.landmarks = landmarks
+        self.cached_dest = None
+        self.cached_bounds = None
+
+
+    def add_landmark(self, graph:BaseGraph, landmark:int):
+        self.dist_from.append(shortest_distances(graph, landmark))
+        self.dist_to.append(shortest_distances(graph, landmark, reverse=True))
+
+
+    def __call__(self, node:int, dest:int) -> float:
+        if dest != self.cached_dest:
+            self.cached_dest = dest
+            self.cached_bounds = [
+                (dist_from, dist_from[dest], dist_to, dist_to[dest])
+                for dist_from, dist_to in zip(self.dist_from, self.dist_to)
+            ]
+
+        bound = 0
+        inf = float('+inf')
+
+        for dist_from, landmark_dest, dist_to, dest_landmark in self.cached_bounds:
+            landmark_node = dist_from[node]
+            if landmark_dest != inf and landmark_node != inf:
+                bound = max(bound, landmark_dest - landmark_node)
+
+            node_landmark = dist_to[node]
+            if node_landmark != inf and dest_landmark != inf:
+                bound = max(bound, node_landmark - dest_landmark)
+
+        return bound
+
+
+def shortest_distances(graph:BaseGraph, root:int, reverse:bool=False) -> array:
+    """
+    Returns the distances from the root node to every node (or from every
+    node to the root node, if "reverse" is True); unreachable nodes have
+    infinite distance. See sssp.shortest_path_tree().
+    """
+    return shortest_path_tree(graph, root, reverse).dist
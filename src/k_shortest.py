@@ -0,0 +1,209 @@
+import heapq
+from array import array
+from collections import deque
+
+from base_graph import BaseGraph
+from search_state import SearchState
+from sssp import ShortestPathTree, shortest_path_tree
+from frontier import AUTO_QUEUE
+from arc_node import NO_NODE
+
+
+def k_shortest_paths(
+    graph:BaseGraph,
+    src:int,
+    dest:int,
+    k:int,
+    queue:str=AUTO_QUEUE,
+    state:SearchState=None) -> list:
+    """
+    Yen's algorithm: returns the k shortest loopless paths from src to dest,
+    as a list of (cost, path) pairs sorted by cost, with each path in the
+    same format as the algorithms in algorithms.py; fewer than k pairs are
+    returned if there aren't as many loopless paths.
+
+    The first path comes from the reverse shortest path tree rooted at dest
+    (see sssp.shortest_path_tree()), whose exact distances then act as the
+    A* heuristic of every spur search: each one stops as soon as it reaches
+    a node whose tree path to dest isn't blocked, and is cut short once it
+    can't beat the candidates already enough to fill the k paths.
+
+    The spur searches skip the blocked nodes and arcs on the fly, rather
+    than removing them from a copy of the graph; they run on "state" (see
+    algorithms.dijkstra_fwd(), as for the "queue" parameter).
+
+    Raises NoDirectedPathError if there's no directed path from src to dest.
+    """
+    graph._validate_src_dest(src, dest)
+
+    if k <= 0:
+        raise ValueError("The number of paths must be positive")
+
+    # A*'s keys may grow by more than the maximum arc cost (see
+    # contraction.hierarchy_queue()), and are integers for integer costs only
+    if queue == AUTO_QUEUE:
+        queue = 'heap'
+    elif queue == 'dial':
+        queue = 'radix'
+
+    tree = shortest_path_tree(graph, dest, reverse=True, queue=graph.select_queue(queue))
+    first_path = tree.path(src)
+    dist_t = tree.dist
+
+    # Each path is kept as a tuple of nodes along with the tuple of their
+    # distances from src
+    nodes = tuple(first_path)
+    paths = [ (dist_t[src], nodes, tuple(dist_t[src] - dist_t[node] for node in nodes)) ]
+
+    candidates = list()
+    seen = {nodes}
+
+    blocked = bytearray(graph.num_nodes)
+
+    while len(paths) < k:
+        _, prev_nodes, prev_dists = paths[-1]
+        num_missing = k - len(paths)
+
+        for i in range(len(prev_nodes) - 1):
+            spur_node = prev_nodes[i]
+            root_nodes = prev_nodes[:i+1]
+
+            # Only the spur paths cheaper than the candidates already
+            # filling the missing paths are worth searching for
+            if len(candidates) < num_missing:
+                bound = float('+inf')
+            else:
+                bound = heapq.nsmallest(num_missing, candidates)[-1][0] - prev_dists[i]
+
+            if dist_t[spur_node] >= bound:
+                continue
+
+            # The arcs leaving the spur node along the paths already found
+            # with the same root
+            blocked_heads = {
+                path_nodes[i+1] for _, path_nodes, _ in paths
+                if path_nodes[:i+1] == root_nodes
+            }
+
+            for node in prev_nodes[:i]:
+                blocked[node] = True
+
+            spur = spur_path(graph, spur_node, dest, tree, blocked, blocked_heads, bound, queue, state)
+
+            for node in prev_nodes[:i]:
+                blocked[node] = False
+
+            if spur is None:
+                continue
+
+            spur_nodes, spur_dists = spur
+            path_nodes = root_nodes[:-1] + spur_nodes
+
+            if path_nodes not in seen:
+                seen.add(path_nodes)
+
+                root_dist = prev_dists[i]
+                path_dists = prev_dists[:i] + tuple(root_dist + dist for dist in spur_dists)
+                heapq.heappush(candidates, (path_dists[-1], path_nodes, path_dists))
+
+        if not candidates:
+            break
+
+        paths.append(heapq.heappop(candidates))
+
+    return [(cost, deque(path_nodes)) for cost, path_nodes, _ in paths]
+
+
+def spur_path(
+    graph:BaseGraph,
+    spur_node:int,
+    dest:int,
+    tree:ShortestPathTree,
+    blocked:bytearray,
+    blocked_heads:set,
+    bound:float,
+    queue:str,
+    state:SearchState) -> tuple:
+    """
+    Returns the optimal path from spur_node to dest avoiding the blocked
+    nodes and the arcs from spur_node to the blocked heads, as a pair of
+    tuples (nodes, distances from spur_node), or None if there isn't any
+    costing less than "bound".
+
+    A* search, using the distances to dest of the reverse shortest path
+    "tree" as the heuristic: blocking nodes and arcs can only make the
+    distances longer, so they're still a consistent lower bound.
+    """
+    inf = float('+inf')
+
+    state = graph.init_state(spur_node, dest, queue, state)
+
+    dist_s = state.dist_s
+    pred = state.pred
+    dist_t = tree.dist
+
+    while state.temp_fwd:
+        if state.temp_fwd.min_key() >= bound:
+            return None
+
+        i = state.make_node_perm_fwd()
+
+        # If the tree path from i is still available, it's optimal: no
+        # other path can cost less than i's key, which is its exact cost
+        tree_nodes = available_tree_path(tree, i, spur_node, blocked, blocked_heads)
+        if tree_nodes is not None:
+            break
+
+        i_dist_s = dist_s[i]
+
+        for _, j, cost in graph.out_arcs(i):
+            if blocked[j] or dist_t[j] == inf or (i == spur_node and j in blocked_heads):
+                continue
+
+            if dist_s[j] > i_dist_s + cost:
+                dist_s[j] = i_dist_s + cost
+                pred[j] = i
+                state.temp_fwd.push(j, dist_s[j] + dist_t[j])
+    else:
+        return None
+
+    # The nodes found by the search, from spur_node to i
+    nodes = deque([i])
+    curr_node = i
+
+    while (curr_node := pred[curr_node]) != NO_NODE:
+        nodes.appendleft(curr_node)
+
+    dists = [dist_s[node] for node in nodes]
+
+    i_cost = dist_s[i] + dist_t[i]
+    for node in tree_nodes:
+        nodes.append(node)
+        dists.append(i_cost - dist_t[node])
+
+    return (tuple(nodes), tuple(dists))
+
+
+def available_tree_path(
+    tree:ShortestPathTree,
+    node:int,
+    spur_node:int,
+    blocked:bytearray,
+    blocked_heads:set) -> list:
+    """
+    Returns the nodes following "node" along its reverse tree path to the
+    root, unless the path crosses a blocked node or arc, or loops back to
+    spur_node; returns None in that case.
+    """
+    succ = tree.pred
+
+    if node == spur_node and succ[node] in blocked_heads:
+        return None
+
+    tree_nodes = list()
+    while (node := succ[node]) != NO_NODE:
+        if blocked[node] or node == spur_node:
+            return None
+        tree_nodes.append(node)
+
+    return tree_nodes
@@ -0,0 +1,112 @@
+import multiprocessing
+
+from base_graph import BaseGraph
+from snapshot import open_snapshot
+from queries import ALGORITHMS, run_query
+
+# The graph, the SearchState and the compared algorithms used by each worker
+# process; the graph is either inherited from the parent process (fork start
+# method) or opened by init_worker() from a snapshot file.
+worker_graph = None
+worker_state = None
+worker_algorithms = None
+
+
+def init_worker(snapshot_filename:str, algorithms:dict):
+    global worker_graph, worker_state, worker_algorithms
+
+    if snapshot_filename is not None:
+        worker_graph = open_snapshot(snapshot_filename)
+
+    worker_state = worker_graph.new_state()
+    worker_algorithms = algorithms
+
+
+def run_worker_query(query:tuple):
+    src, dest, queues = query
+    return run_query(worker_graph, src, dest, queues, worker_state, worker_algorithms)
+
+
+class ParallelQueryExecutor:
+    """
+    Runs batches of queries (see queries.run_query()) on a pool of worker
+    processes, all sharing the same read-only graph topology; each worker
+    keeps its own SearchState.
+
+    The topology is shared in either of the following ways:
+        - If "snapshot_filename" is specified, each worker memory-maps
+          the snapshot (see snapshot.py), so all of them share the same
+          copy of it in the page cache;
+        - Otherwise, the workers are forked from the current process and
+          inherit "graph" through copy-on-write memory. This is best
+          suited to CSRGraph, whose few large arrays are never written to;
+          a Node-based Graph works as well, but its pages get gradually
+          copied as the workers update the reference counts of its objects.
+    """
+    __slots__ = (
+        'pool',
+    )
+
+
+    def __init__(
+        self,
+        graph:BaseGraph=None,
+        processes:int=None,
+        snapshot_filename:str=None,
+        algorithms:dict=ALGORITHMS):
+        """
+        "processes" is the number of worker processes (default: the number
+        of CPUs); "algorithms" maps the names of the compared algorithms to
+        their functions (see queries.ALGORITHMS), and must be picklable.
+        """
+        global worker_graph
+
+        if snapshot_filename is not None:
+            context = multiprocessing.get_context()
+
+        elif graph is None:
+            raise ValueError("Either a graph or a snapshot filename must be specified")
+
+        elif 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+
+            # Inherited by the workers, which are forked right away
+            worker_graph = graph
+
+        else:
+            raise ValueError(
+                "Sharing a graph requires the 'fork' start method, which isn't "
+                "available on this platform: use a snapshot file instead"
+            )
+
+        self.pool = context.Pool(processes, init_worker, (snapshot_filename, algorithms))
+
+
+    def map(self, queries, queues:list, chunksize:int=64):
+        """
+        Returns an iterator over the QueryResult of each (src, dest) pair in
+        "queries", in the same order; the queries are consumed lazily and
+        the results are returned as soon as they're available.
+        """
+        return self.pool.imap(
+            run_worker_query,
+            ( (src, dest, queues) for src, dest in queries ),
+            chunksize
+        )
+
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.pool.terminate()
+            self.pool.join()
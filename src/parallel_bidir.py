@@ -0,0 +1,297 @@
+import multiprocessing
+from collections import deque
+
+from base_graph import BaseGraph
+from snapshot import open_snapshot
+from frontier import make_frontier, AUTO_QUEUE
+from arc_node import NO_NODE
+from exceptions import NoDirectedPathError
+
+# The indices of the two searches inside the shared arrays
+FORWARD = 0
+REVERSE = 1
+
+# The graph searched by the worker processes; it's either inherited from the
+# parent process (fork start method) or opened by each worker from a
+# snapshot file, just like in parallel.py.
+worker_graph = None
+
+
+class SharedLabels:
+    """
+    The labels of a bidirectional search, in shared memory, so that each of
+    the two worker processes can read the other one's distance labels:
+        - "dist": the distance labels from the source node (FORWARD) and to
+          the destination node (REVERSE), indexed by node ID;
+        - "links": the predecessor (FORWARD) and successor (REVERSE) labels;
+        - "tops": the minimum temporary distance label of each search;
+        - "bound": the cost of the best path found so far (mu);
+        - "meeting": the node where that path's two halves meet.
+
+    Each worker only writes its own "dist", "links" and "tops" items, while
+    "bound" and "meeting" are updated together under "lock".
+    """
+    __slots__ = (
+        'dist',
+        'links',
+        'tops',
+        'bound',
+        'meeting',
+        'lock',
+
+        # Lets each worker wait for the other one to reset its labels,
+        # before reading them in a new query
+        'barrier',
+    )
+
+
+    def __init__(self, context, num_nodes:int):
+        inf = float('+inf')
+
+        self.dist = tuple(context.RawArray('d', [inf] * num_nodes) for _ in range(2))
+        self.links = tuple(context.RawArray('q', [NO_NODE] * num_nodes) for _ in range(2))
+        self.tops = context.RawArray('d', 2)
+        self.bound = context.RawArray('d', [inf])
+        self.meeting = context.RawArray('q', [NO_NODE])
+        self.lock = context.Lock()
+        self.barrier = context.Barrier(2)
+
+
+def run_search_worker(direction:int, conn, shared:SharedLabels, snapshot_filename:str):
+    """
+    Main loop of a worker process, running one direction of each query
+    received through "conn" as a (root node, queue, max_cost) tuple, until
+    None is received; the number of nodes made permanent (or the raised
+    exception) is sent back at the end of each query.
+    """
+    graph = worker_graph if snapshot_filename is None else open_snapshot(snapshot_filename)
+
+    if direction == FORWARD:
+        arcs = graph.out_arcs
+        neighbor_index = 1      # The arcs' heads
+    else:
+        arcs = graph.in_arcs
+        neighbor_index = 0      # The arcs' tails
+
+    inf = float('+inf')
+    other = 1 - direction
+
+    dist = shared.dist[direction]
+    other_dist = shared.dist[other]
+    links = shared.links[direction]
+    tops = shared.tops
+    bound = shared.bound
+    meeting = shared.meeting
+    lock = shared.lock
+
+    # The nodes whose labels have been set by the previous query
+    touched = list()
+
+    while (request := conn.recv()) is not None:
+        root, queue, max_cost = request
+
+        for node in touched:
+            dist[node] = inf
+            links[node] = NO_NODE
+        touched.clear()
+
+        # The root's label must be visible to the other search from the
+        # start, in case it reaches the root before this search scans any arc
+        dist[root] = 0
+        touched.append(root)
+
+        shared.barrier.wait()
+
+        try:
+            temp = make_frontier(queue, max_cost)
+            temp.push(root, 0)
+
+            num_settled = 0
+
+            while temp:
+                top = temp.min_key()
+                tops[direction] = top
+
+                # Any path through a temporary node of both searches costs
+                # at least the sum of their minimum labels
+                if top + tops[other] >= bound[0]:
+                    break
+
+                u = temp.pop_min()
+                num_settled += 1
+
+                u_dist = dist[u]
+
+                for arc in arcs(u):
+                    v = arc[neighbor_index]
+                    v_dist = u_dist + arc[2]
+
+                    if v_dist < dist[v]:
+                        if dist[v] == inf:
+                            touched.append(v)
+
+                        dist[v] = v_dist
+                        links[v] = u
+                        temp.push(v, v_dist)
+
+                    # Whichever search scans an arc of the optimal path
+                    # last finds the other one's label of its far end
+                    path_cost = v_dist + other_dist[v]
+                    if path_cost < bound[0]:
+                        with lock:
+                            if path_cost < bound[0]:
+                                bound[0] = path_cost
+                                meeting[0] = v
+            else:
+                # An exhausted search stops the other one as well
+                tops[direction] = inf
+
+            conn.send(num_settled)
+
+        except Exception as exc:
+            tops[direction] = inf
+            conn.send(exc)
+
+
+class ParallelBidirSearch:
+    """
+    Bidirectional Dijkstra's search, whose forward and reverse halves run
+    concurrently on two worker processes, each one on its own CPU core; the
+    distance labels are kept in shared memory (see SharedLabels), and each
+    search stops once the sum of both minimum temporary labels reaches the
+    cost "mu" of the best path found so far, shared by the two processes.
+
+    The graph's topology is shared with the workers just like
+    parallel.ParallelQueryExecutor does, either through copy-on-write memory
+    or by memory-mapping the snapshot file "snapshot_filename", and the
+    workers are kept alive for any number of queries.
+    """
+    __slots__ = (
+        'graph',
+        'shared',
+        'workers',
+        'conns',
+
+        # The (forward, reverse) number of nodes made permanent by the
+        # last query
+        'num_settled',
+    )
+
+
+    def __init__(self, graph:BaseGraph=None, snapshot_filename:str=None):
+        global worker_graph
+
+        if snapshot_filename is not None:
+            context = multiprocessing.get_context()
+
+            if graph is None:
+                graph = open_snapshot(snapshot_filename)
+
+        elif graph is None:
+            raise ValueError("Either a graph or a snapshot filename must be specified")
+
+        elif 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+
+            # Inherited by the workers, which are forked right away
+            worker_graph = graph
+
+        else:
+            raise ValueError(
+                "Sharing a graph requires the 'fork' start method, which isn't "
+                "available on this platform: use a snapshot file instead"
+            )
+
+        self.graph = graph
+        self.shared = SharedLabels(context, graph.num_nodes)
+        self.workers = list()
+        self.conns = list()
+        self.num_settled = (0, 0)
+
+        for direction in (FORWARD, REVERSE):
+            conn, worker_conn = context.Pipe()
+
+            worker = context.Process(
+                target=run_search_worker,
+                args=(direction, worker_conn, self.shared, snapshot_filename),
+                daemon=True
+            )
+            worker.start()
+
+            self.workers.append(worker)
+            self.conns.append(conn)
+
+
+    def path(self, src:int, dest:int, queue:str=AUTO_QUEUE) -> deque:
+        """
+        Returns the optimal path from src to dest, just like
+        algorithms.dijkstra_bidir(); see algorithms.dijkstra_fwd() for the
+        "queue" parameter.
+        """
+        graph = self.graph
+        shared = self.shared
+
+        graph._validate_src_dest(src, dest)
+
+        queue = graph.select_queue(queue)
+        max_cost = graph.max_integer_cost() if queue == 'dial' else None
+
+        # Raises ValueError for unknown queue types, before involving the workers
+        make_frontier(queue, max_cost)
+
+        shared.tops[FORWARD] = 0
+        shared.tops[REVERSE] = 0
+        shared.bound[0] = float('+inf')
+        shared.meeting[0] = NO_NODE
+
+        self.conns[FORWARD].send( (src, queue, max_cost) )
+        self.conns[REVERSE].send( (dest, queue, max_cost) )
+
+        results = [conn.recv() for conn in self.conns]
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+        self.num_settled = tuple(results)
+
+        meeting_node = shared.meeting[0]
+        if meeting_node == NO_NODE:
+            raise NoDirectedPathError(src, dest)
+
+        pred = shared.links[FORWARD]
+        succ = shared.links[REVERSE]
+
+        src_dest_path = deque([meeting_node])
+
+        # Trace the path from meeting_node to src
+        curr_node = meeting_node
+        while (curr_node := pred[curr_node]) != NO_NODE:
+            src_dest_path.appendleft(curr_node)
+
+        # Trace the path from meeting_node to dest
+        curr_node = meeting_node
+        while (curr_node := succ[curr_node]) != NO_NODE:
+            src_dest_path.append(curr_node)
+
+        return src_dest_path
+
+
+    def close(self):
+        for conn in self.conns:
+            conn.send(None)
+
+        for worker in self.workers:
+            worker.join()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            for worker in self.workers:
+                worker.terminate()
+                worker.join()
@@ -0,0 +1,231 @@
+import io, json, csv, math
+from collections import namedtuple
+from time import perf_counter
+
+from base_graph import BaseGraph
+from search_state import SearchState
+from algorithms import dijkstra_fwd, dijkstra_rev, dijkstra_bidir
+from exceptions import NoDirectedPathError
+
+# The compared algorithms, along with the names they're reported with;
+# each one is called as alg_func(graph, src, dest, queue=..., state=...)
+ALGORITHMS = {
+    'Forward': dijkstra_fwd,
+    'Reverse': dijkstra_rev,
+    'Bidirectional': dijkstra_bidir,
+}
+
+# The outcome of running all the compared algorithms on a (src, dest) pair:
+#   - "path": the optimal path, as a list of node IDs (None if there's none);
+#   - "error": a description of why there's no path (None if there is one);
+#   - "perf_times", "perm_nodes": dictionaries mapping each
+#     (queue, algorithm name) pair to the algorithm's execution time and
+#     number of permanent nodes, respectively.
+QueryResult = namedtuple(
+    'QueryResult',
+    ['src', 'dest', 'path', 'error', 'perf_times', 'perm_nodes']
+)
+
+
+def run_query(
+    graph:BaseGraph,
+    src:int,
+    dest:int,
+    queues:list,
+    state:SearchState=None,
+    algorithms:dict=ALGORITHMS) -> QueryResult:
+    """
+    Runs each of the compared algorithms (once for each queue type) on the
+    specified (src, dest) pair, using the specified SearchState (or the
+    graph's own one, if None).
+
+    "algorithms" maps the names of the compared algorithms to their
+    functions (see ALGORITHMS).
+
+    Invalid or unreachable pairs don't raise any exception: the reason is
+    reported in the result's "error" field instead. Invalid queue types do,
+    just like in the algorithms (e.g. ValueError for the 'dial' and 'radix'
+    queues on non-integer arc costs).
+    """
+    path = None
+    error = None
+    perf_times = dict()
+    perm_nodes = dict()
+
+    try:
+        graph._validate_src_dest(src, dest)
+    except (KeyError, ValueError) as exc:
+        # Invalid (src, dest) pair: no algorithm can run at all
+        return QueryResult(src, dest, None, str(exc.args[0]), perf_times, perm_nodes)
+
+    if state is None:
+        state = graph.default_state()
+
+    for queue in queues:
+        for alg_name, alg_func in algorithms.items():
+            start = perf_counter()
+            try:
+                alg_path = alg_func(graph, src, dest, queue=queue, state=state)
+            except NoDirectedPathError:
+                alg_path = None
+                error = f"No directed path from {src} to {dest}"
+
+            perf_times[queue, alg_name] = perf_counter() - start
+            perm_nodes[queue, alg_name] = state.num_perm_nodes()
+
+            if path is None and alg_path is not None:
+                path = list(alg_path)
+
+    return QueryResult(src, dest, path, error, perf_times, perm_nodes)
+
+
+def read_queries(file_queries:io.TextIOBase):
+    """
+    Generator returning the (src, dest) pairs read from the specified file,
+    one per line, with the two node IDs separated by whitespace or a comma.
+    Blank lines and lines starting with '#' are skipped.
+    """
+    for line_num, line in enumerate(file_queries, start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        fields = line.replace(',', ' ').split()
+        try:
+            src, dest = map(int, fields)
+        except ValueError:
+            raise ValueError(
+                f"Line {line_num}: expected '<src_node> <dest_node>', found '{line}'"
+            ) from None
+
+        yield (src, dest)
+
+
+class QueryResultWriter:
+    """
+    Writes query results to a text file as they're produced, either as
+    JSON lines or as CSV rows.
+    """
+    __slots__ = (
+        'file',
+        'format',
+        'csv_writer',
+        'columns',
+    )
+
+    FORMATS = ('jsonl', 'csv')
+
+
+    def __init__(
+        self,
+        file_out:io.TextIOBase,
+        format:str,
+        queues:list,
+        alg_names:list=tuple(ALGORITHMS)):
+        if format not in self.FORMATS:
+            raise ValueError(
+                f"Unknown output format '{format}' (expected one of: {', '.join(self.FORMATS)})"
+            )
+
+        self.file = file_out
+        self.format = format
+        self.columns = [
+            (queue, alg_name) for queue in queues for alg_name in alg_names
+        ]
+
+        if format == 'csv':
+            self.csv_writer = csv.writer(file_out)
+            self.csv_writer.writerow(
+                ['src', 'dest', 'path', 'error']
+                + [f'{alg_name} time ({queue})' for queue, alg_name in self.columns]
+                + [f'{alg_name} permanent nodes ({queue})' for queue, alg_name in self.columns]
+            )
+
+
+    def write(self, result:QueryResult):
+        if self.format == 'jsonl':
+            record = {
+                'src': result.src,
+                'dest': result.dest,
+                'path': result.path,
+                'error': result.error,
+                'perf_times': {
+                    f'{alg_name}/{queue}': perf_time
+                    for (queue, alg_name), perf_time in result.perf_times.items()
+                },
+                'perm_nodes': {
+                    f'{alg_name}/{queue}': num_perm_nodes
+                    for (queue, alg_name), num_perm_nodes in result.perm_nodes.items()
+                },
+            }
+            self.file.write(json.dumps(record) + '\n')
+        else:
+            path = '' if result.path is None else ' '.join(map(str, result.path))
+            self.csv_writer.writerow(
+                [result.src, result.dest, path, result.error or '']
+                + [result.perf_times.get(column, '') for column in self.columns]
+                + [result.perm_nodes.get(column, '') for column in self.columns]
+            )
+
+
+class QueryStats:
+    """
+    Collects the execution times and the numbers of permanent nodes of
+    each (queue, algorithm name) pair over a batch of queries.
+    """
+    __slots__ = (
+        'num_queries',
+        'perf_times',
+        'perm_nodes',
+    )
+
+
+    def __init__(self):
+        self.num_queries = 0
+        self.perf_times = dict()
+        self.perm_nodes = dict()
+
+
+    def add(self, result:QueryResult):
+        self.num_queries += 1
+
+        for column, perf_time in result.perf_times.items():
+            self.perf_times.setdefault(column, list()).append(perf_time)
+
+        for column, num_perm_nodes in result.perm_nodes.items():
+            self.perm_nodes.setdefault(column, list()).append(num_perm_nodes)
+
+
+    def time_summary(self, queue:str, alg_name:str) -> tuple:
+        """
+        Returns the (mean, median, 99th percentile) execution time of the
+        specified algorithm, or None if it never ran.
+        """
+        perf_times = self.perf_times.get( (queue, alg_name) )
+        if not perf_times:
+            return None
+
+        perf_times = sorted(perf_times)
+
+        return (
+            sum(perf_times) / len(perf_times),
+            percentile(perf_times, 0.50),
+            percentile(perf_times, 0.99)
+        )
+
+
+    def mean_perm_nodes(self, queue:str, alg_name:str) -> float:
+        perm_nodes = self.perm_nodes.get( (queue, alg_name) )
+        if not perm_nodes:
+            return None
+
+        return sum(perm_nodes) / len(perm_nodes)
+
+
+def percentile(sorted_values:list, fraction:float):
+    """
+    Returns the specified percentile (as a fraction in [0, 1]) of a
+    non-empty sorted list, using the nearest-rank method.
+    """
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
@@ -0,0 +1,237 @@
+from collections import OrderedDict, deque
+
+from base_graph import BaseGraph
+from frontier import make_frontier, AUTO_QUEUE
+from algorithms import dijkstra_fwd
+from exceptions import NoDirectedPathError
+
+
+class SourceTree:
+    """
+    A forward Dijkstra's search from a source node, which can be resumed
+    later: the labels of its permanent nodes are final, so the path to any
+    of them is rebuilt without searching, while the path to any other node
+    is found by carrying on with the search from where it stopped.
+
+    Only the nodes touched by the search are stored, in dictionaries; the
+    "queue" and "max_cost" parameters are the ones of frontier.make_frontier()
+    (see BaseGraph.resolve_queue()).
+    """
+    __slots__ = (
+        'src',
+        'dist',
+        'pred',
+        'perm',
+        'temp',
+    )
+
+
+    def __init__(self, src:int, queue:str='heap', max_cost:int=None):
+        self.src = src
+        self.dist = {src: 0}
+        self.pred = dict()
+        self.perm = set()
+        self.temp = make_frontier(queue, max_cost)
+        self.temp.push(src, 0)
+
+
+    def path(self, graph:BaseGraph, dest:int) -> deque:
+        """
+        Returns the optimal path from the source node to "dest", resuming
+        the search until "dest" is permanent if it isn't already.
+
+        Raises NoDirectedPathError if there's no such path.
+        """
+        dist = self.dist
+        pred = self.pred
+        perm = self.perm
+        temp = self.temp
+
+        while dest not in perm and temp:
+            i = temp.pop_min()
+            perm.add(i)
+            i_dist = dist[i]
+
+            for _, j, cost in graph.out_arcs(i):
+                if dist.get(j, float('+inf')) > i_dist + cost:
+                    dist[j] = i_dist + cost
+                    pred[j] = i
+                    temp.push(j, dist[j])
+
+        if dest not in perm:
+            raise NoDirectedPathError(self.src, dest)
+
+        src_dest_path = deque([dest])
+        curr_node = dest
+
+        while (curr_node := pred.get(curr_node)) is not None:
+            src_dest_path.appendleft(curr_node)
+
+        return src_dest_path
+
+
+class QueryCache:
+    """
+    Bounded cache of the optimal paths between (src, dest) pairs, with
+    LRU (least recently used) eviction.
+
+    If "max_trees" is positive, the forward search tree of each source is
+    cached as well (see SourceTree), up to "max_trees" sources with LRU
+    eviction: a query for a new destination from a cached source then
+    returns instantly if the destination was already made permanent by a
+    previous search, and resumes that search otherwise.
+
+    Every entry is discarded as soon as the graph's version changes (see
+    BaseGraph.mark_modified()); the hit/miss counters are kept.
+    """
+    __slots__ = (
+        'graph',
+        'algorithm',
+        'queue',
+        'max_paths',
+        'max_trees',
+
+        # The graph's version the cached entries were computed on
+        'version',
+
+        # Map (src, dest) pairs to their paths (None if there's no path),
+        # and source nodes to their SourceTree, from the least to the most
+        # recently used
+        'paths',
+        'trees',
+
+        # Queries answered by the cached paths, by the cached trees
+        # (without searching or by resuming a search) and by neither,
+        # and the number of times the graph's changes emptied the cache
+        'path_hits',
+        'tree_hits',
+        'misses',
+        'invalidations',
+    )
+
+
+    def __init__(
+        self,
+        graph:BaseGraph,
+        max_paths:int=1024,
+        max_trees:int=0,
+        algorithm=dijkstra_fwd,
+        queue:str=AUTO_QUEUE):
+        """
+        "algorithm" computes the paths that aren't cached, when the trees
+        aren't (see queries.ALGORITHMS); "queue" is passed to it and to
+        the trees' searches (see algorithms.dijkstra_fwd()).
+        """
+        if max_paths < 0 or max_trees < 0:
+            raise ValueError("The cache sizes must be nonnegative")
+
+        self.graph = graph
+        self.algorithm = algorithm
+        self.queue = queue
+        self.max_paths = max_paths
+        self.max_trees = max_trees
+
+        self.version = graph.version
+        self.paths = OrderedDict()
+        self.trees = OrderedDict()
+
+        self.path_hits = 0
+        self.tree_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+
+    def path(self, src:int, dest:int) -> deque:
+        """
+        Returns the optimal path from "src" to "dest", in the same format as
+        the algorithms in algorithms.py; the caller may modify it freely.
+
+        Raises NoDirectedPathError if there's no such path (which is cached
+        as well), plus the same errors as the algorithms for invalid nodes.
+        """
+        graph = self.graph
+        graph._validate_src_dest(src, dest)
+
+        if graph.version != self.version:
+            self.clear()
+            self.version = graph.version
+            self.invalidations += 1
+
+        key = (src, dest)
+        if key in self.paths:
+            self.path_hits += 1
+            self.paths.move_to_end(key)
+            src_dest_path = self.paths[key]
+
+        elif self.max_trees > 0:
+            tree = self.trees.get(src)
+            if tree is None:
+                self.misses += 1
+                tree = SourceTree(src, *graph.resolve_queue(self.queue))
+                self.add_entry(self.trees, src, tree, self.max_trees)
+            else:
+                self.tree_hits += 1
+                self.trees.move_to_end(src)
+
+            try:
+                src_dest_path = tree.path(graph, dest)
+            except NoDirectedPathError:
+                src_dest_path = None
+
+            self.add_entry(self.paths, key, src_dest_path, self.max_paths)
+
+        else:
+            self.misses += 1
+            try:
+                src_dest_path = self.algorithm(graph, src, dest, queue=self.queue)
+            except NoDirectedPathError:
+                src_dest_path = None
+
+            self.add_entry(self.paths, key, src_dest_path, self.max_paths)
+
+        if src_dest_path is None:
+            raise NoDirectedPathError(src, dest)
+
+        return deque(src_dest_path)
+
+
+    @staticmethod
+    def add_entry(entries:OrderedDict, key, value, max_entries:int):
+        """Adds the entry, evicting the least recently used one if needed."""
+        if max_entries == 0:
+            return
+
+        entries[key] = value
+        if len(entries) > max_entries:
+            entries.popitem(last=False)
+
+
+    def clear(self):
+        """Discards all the cached paths and trees."""
+        self.paths.clear()
+        self.trees.clear()
+
+
+    @property
+    def hits(self) -> int:
+        return self.path_hits + self.tree_hits
+
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of queries answered by the cache (0 if there were none)."""
+        num_queries = self.hits + self.misses
+        return self.hits / num_queries if num_queries else 0.0
+
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters and the current number of entries."""
+        return {
+            'path_hits': self.path_hits,
+            'tree_hits': self.tree_hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'invalidations': self.invalidations,
+            'num_paths': len(self.paths),
+            'num_trees': len(self.trees),
+        }
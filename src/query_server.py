@@ -0,0 +1,341 @@
+import argparse, asyncio, json, multiprocessing, sys, threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from base_graph import BaseGraph
+from snapshot import open_snapshot
+from algorithms import dijkstra_bidir
+from queries import ALGORITHMS
+from frontier import FRONTIERS, AUTO_QUEUE
+from exceptions import NoDirectedPathError
+
+# Line-based protocol, over a TCP connection:
+#   - Each request is a line holding the source and destination node IDs,
+#     separated by whitespace or a comma;
+#   - Each response is a JSON line holding either the "path" (a list of
+#     node IDs) or an "error" message, along with the request's "src" and
+#     "dest" (null if the line couldn't be parsed).
+# Requests on the same connection are answered in order, one at a time.
+
+
+class QueryWorker:
+    """
+    Runs single queries with a fixed algorithm and queue type, keeping one
+    SearchState per thread, so that a pool of threads can share it.
+    """
+    __slots__ = (
+        'graph',
+        'algorithm',
+        'queue',
+        'local',
+    )
+
+
+    def __init__(self, graph:BaseGraph, algorithm, queue:str):
+        self.graph = graph
+        self.algorithm = algorithm
+        self.queue = queue
+        self.local = threading.local()
+
+
+    def __call__(self, src:int, dest:int) -> dict:
+        """
+        Returns the query's response: a dictionary holding either the "path"
+        or the "error" message, for invalid or unreachable pairs; errors of
+        the queue type are raised instead, since they aren't the request's.
+        """
+        try:
+            self.graph._validate_src_dest(src, dest)
+        except (KeyError, ValueError) as exc:
+            return {'src': src, 'dest': dest, 'error': str(exc.args[0])}
+
+        try:
+            state = self.local.state
+        except AttributeError:
+            state = self.local.state = self.graph.new_state()
+
+        try:
+            path = self.algorithm(self.graph, src, dest, queue=self.queue, state=state)
+        except NoDirectedPathError:
+            return {'src': src, 'dest': dest, 'error': f"No directed path from {src} to {dest}"}
+
+        return {'src': src, 'dest': dest, 'path': list(path)}
+
+
+# The QueryWorker of each worker process; the graph is either inherited from
+# the parent process (fork start method) or opened by init_worker() from a
+# snapshot file, just like in parallel.py.
+worker_graph = None
+worker = None
+
+
+def init_worker(snapshot_filename:str, algorithm, queue:str):
+    global worker_graph, worker
+
+    if snapshot_filename is not None:
+        worker_graph = open_snapshot(snapshot_filename)
+
+    worker = QueryWorker(worker_graph, algorithm, queue)
+
+
+def run_worker_query(src:int, dest:int) -> dict:
+    return worker(src, dest)
+
+
+def parse_request(line:str) -> tuple:
+    """Returns the (src, dest) pair of a request line; raises ValueError if it's malformed."""
+    fields = line.replace(',', ' ').split()
+    try:
+        src, dest = map(int, fields)
+    except ValueError:
+        raise ValueError(f"Expected '<src_node> <dest_node>', found '{line.strip()}'") from None
+
+    return (src, dest)
+
+
+class QueryServer:
+    """
+    Long-running server answering shortest path queries on a graph loaded
+    once, over the line-based protocol described above.
+
+    The queries run on a pool of "workers" threads or, if "processes" is
+    True, worker processes sharing the graph as in parallel.py (through the
+    snapshot file, if "snapshot_filename" is specified), so that the event
+    loop keeps serving other connections meanwhile.
+
+    Identical queries in flight at the same time are coalesced: they all
+    wait for the same execution. A query still running after "timeout"
+    seconds is answered with an error; its execution can't be interrupted,
+    though, so it keeps its worker busy until it ends.
+    """
+    __slots__ = (
+        'timeout',
+        'executor',
+        'run_query',
+        'server',
+
+        # Maps the (src, dest) pair of each query in flight to its future
+        'in_flight',
+
+        # Counters of the answered, coalesced and timed out queries
+        'num_queries',
+        'num_coalesced',
+        'num_timeouts',
+    )
+
+
+    def __init__(
+        self,
+        graph:BaseGraph=None,
+        algorithm=dijkstra_bidir,
+        queue:str=AUTO_QUEUE,
+        workers:int=1,
+        processes:bool=False,
+        timeout:float=10.0,
+        snapshot_filename:str=None):
+        """
+        "algorithm" is called as algorithm(graph, src, dest, queue=...,
+        state=...), like the ones in queries.ALGORITHMS, and must be
+        picklable if "processes" is True.
+        """
+        global worker_graph
+
+        if queue not in FRONTIERS and queue != AUTO_QUEUE:
+            raise ValueError(f"Unknown queue type '{queue}' (expected one of: {', '.join(FRONTIERS)}, {AUTO_QUEUE})")
+
+        if timeout <= 0:
+            raise ValueError("The timeout must be positive")
+
+        if graph is None and snapshot_filename is None:
+            raise ValueError("Either a graph or a snapshot filename must be specified")
+
+        if graph is not None:
+            # Rejects the integer queues on non-integer arc costs, before any query
+            graph.select_queue(queue)
+
+        self.timeout = timeout
+
+        if not processes:
+            if graph is None:
+                graph = open_snapshot(snapshot_filename)
+
+            self.executor = ThreadPoolExecutor(workers)
+            self.run_query = QueryWorker(graph, algorithm, queue)
+
+        else:
+            if snapshot_filename is not None:
+                context = multiprocessing.get_context()
+
+            elif 'fork' in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context('fork')
+
+                # Inherited by the workers when they're forked
+                worker_graph = graph
+
+            else:
+                raise ValueError(
+                    "Sharing a graph requires the 'fork' start method, which isn't "
+                    "available on this platform: use a snapshot file instead"
+                )
+
+            self.executor = ProcessPoolExecutor(
+                workers, context, init_worker, (snapshot_filename, algorithm, queue)
+            )
+            self.run_query = run_worker_query
+
+        self.server = None
+        self.in_flight = dict()
+
+        self.num_queries = 0
+        self.num_coalesced = 0
+        self.num_timeouts = 0
+
+
+    async def start(self, host:str='127.0.0.1', port:int=0) -> int:
+        """
+        Starts listening on the specified address, and returns the port
+        (useful with port 0, which picks a free one).
+        """
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+
+    async def close(self):
+        """Stops listening and shuts the worker pool down."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+        # Waiting for the running queries mustn't block the event loop
+        await asyncio.to_thread(self.executor.shutdown, wait=True, cancel_futures=True)
+
+
+    async def query(self, src:int, dest:int) -> dict:
+        """
+        Returns the response to the query (src, dest), joining the execution
+        of an identical query in flight, if any.
+        """
+        self.num_queries += 1
+
+        future = self.in_flight.get( (src, dest) )
+        if future is not None:
+            self.num_coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, self.run_query, src, dest)
+
+            self.in_flight[src, dest] = future
+            future.add_done_callback(lambda _: self.in_flight.pop( (src, dest), None ))
+
+        try:
+            # Shielded, since the other coalesced queries are still waiting for it
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.num_timeouts += 1
+            return {'src': src, 'dest': dest, 'error': f"Timed out after {self.timeout} seconds"}
+
+
+    async def handle_client(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                try:
+                    line = line.decode()
+                    if not line.strip():
+                        continue
+
+                    src, dest = parse_request(line)
+                except ValueError as exc:
+                    response = {'src': None, 'dest': None, 'error': str(exc)}
+                else:
+                    response = await self.query(src, dest)
+
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def validate_args(argv) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='query_server.py',
+        description=(
+            "Loads a graph once and answers shortest path queries over TCP: "
+            "each request is a '<src_node> <dest_node>' line, and each response "
+            "a JSON line holding either the path or an error message."
+        )
+    )
+    parser.add_argument('input_graph', help="either a .json/.json.gz file or a .snap binary snapshot")
+    parser.add_argument('--host', default='127.0.0.1', help="the address to listen on (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="the port to listen on (default: 8765)")
+    parser.add_argument(
+        '--algorithm', choices=ALGORITHMS, default='Bidirectional',
+        help="the algorithm answering the queries (default: Bidirectional)"
+    )
+    parser.add_argument(
+        '--queue', choices=[*FRONTIERS, AUTO_QUEUE], default=AUTO_QUEUE,
+        help="the queue type used by the algorithm (default: auto)"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="the number of worker threads, or processes with --processes (default: 1)"
+    )
+    parser.add_argument(
+        '--processes', action='store_true',
+        help="run the queries on worker processes rather than threads"
+    )
+    parser.add_argument(
+        '--timeout', type=float, default=10.0,
+        help="the seconds after which a query is answered with an error (default: 10)"
+    )
+    parser.add_argument(
+        '--trusted', action='store_true',
+        help="skip the validation of the arcs of a JSON graph"
+    )
+
+    args = parser.parse_args(argv[1:])
+
+    if args.workers <= 0:
+        parser.error("Parameter 'workers' must be positive")
+
+    if args.timeout <= 0:
+        parser.error("Parameter 'timeout' must be positive")
+
+    if not args.input_graph.endswith( ('.json', '.json.gz', '.snap') ):
+        parser.error("Parameter 'input_graph' must have .json, .json.gz or .snap extension")
+
+    return args
+
+
+async def main(args):
+    from dijkstra_cmp import load_graph
+
+    graph = load_graph(args.input_graph, args.trusted)
+    snapshot_filename = args.input_graph if args.input_graph.endswith('.snap') else None
+
+    server = QueryServer(
+        graph, ALGORITHMS[args.algorithm], args.queue,
+        args.workers, args.processes, args.timeout, snapshot_filename
+    )
+
+    port = await server.start(args.host, args.port)
+    print(f'Listening on {args.host}:{port}', file=sys.stderr)
+
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == '__main__':
+    args = validate_args(sys.argv)
+
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        pass
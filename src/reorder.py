@@ -0,0 +1,238 @@
+from array import array
+from collections import deque
+
+from base_graph import BaseGraph
+from csr_graph import CSRGraph
+from exceptions import NoDirectedPathError
+
+# Node orderings, improving the memory locality of the searches: nodes close
+# in the graph get close IDs, so their labels and arcs are close in memory.
+ORDERINGS = ('bfs', 'cuthill-mckee', 'hilbert')
+
+
+def bfs_order(graph:BaseGraph, by_degree:bool=False) -> array:
+    """
+    Returns the nodes in breadth-first order, following the arcs in both
+    directions; each connected component is visited from its node of
+    lowest degree (in plus out), in order of node ID.
+
+    If "by_degree" is True, the neighbors of each node are visited by
+    increasing degree (Cuthill-McKee ordering); otherwise, in arcs order.
+    """
+    num_nodes = graph.num_nodes
+
+    degrees = array('q', [0]) * num_nodes
+    for node in range(num_nodes):
+        for _, head, _ in graph.out_arcs(node):
+            degrees[node] += 1
+            degrees[head] += 1
+
+    visited = bytearray(num_nodes)
+    order = array('q')
+
+    for root in sorted(range(num_nodes), key=degrees.__getitem__):
+        if visited[root]:
+            continue
+
+        visited[root] = True
+        order.append(root)
+
+        # The component's nodes still to be scanned are the ones from
+        # index "pos" of "order" onwards
+        pos = len(order) - 1
+
+        while pos < len(order):
+            node = order[pos]
+            pos += 1
+
+            neighbors = [head for _, head, _ in graph.out_arcs(node)]
+            neighbors.extend(tail for tail, _, _ in graph.in_arcs(node))
+
+            if by_degree:
+                neighbors.sort(key=degrees.__getitem__)
+
+            for neighbor in neighbors:
+                if not visited[neighbor]:
+                    visited[neighbor] = True
+                    order.append(neighbor)
+
+    return order
+
+
+def hilbert_index(x:int, y:int, num_bits:int) -> int:
+    """
+    Returns the position of the point (x, y) along the Hilbert curve
+    filling the square [0, 2**num_bits) x [0, 2**num_bits).
+    """
+    index = 0
+    side = 1 << (num_bits - 1)
+
+    while side > 0:
+        rx = 1 if x & side else 0
+        ry = 1 if y & side else 0
+        index += side * side * ((3 * rx) ^ ry)
+
+        # Rotate the quadrant, so that the curve's pieces connect
+        if ry == 0:
+            if rx == 1:
+                x = side - 1 - x
+                y = side - 1 - y
+            x, y = y, x
+
+        x &= side - 1
+        y &= side - 1
+        side >>= 1
+
+    return index
+
+
+def hilbert_order(x:array, y:array, num_bits:int=16) -> array:
+    """
+    Returns the nodes sorted by the position of their coordinates along a
+    Hilbert curve, on a grid of 2**num_bits cells per side spanning their
+    bounding box: nodes close in the plane mostly get close positions.
+    """
+    num_nodes = len(x)
+    if len(y) != num_nodes:
+        raise ValueError("The coordinates' arrays must have the same length")
+
+    if num_nodes == 0:
+        return array('q')
+
+    min_x, min_y = min(x), min(y)
+    max_cells = (1 << num_bits) - 1
+
+    # The same scale for both axes, to keep the distances' proportions
+    extent = max(max(x) - min_x, max(y) - min_y) or 1
+    scale = max_cells / extent
+
+    indices = [
+        hilbert_index(int((x[node] - min_x) * scale), int((y[node] - min_y) * scale), num_bits)
+        for node in range(num_nodes)
+    ]
+
+    return array('q', sorted(range(num_nodes), key=indices.__getitem__))
+
+
+class NodeMap:
+    """
+    The correspondence between the original node IDs of a graph and the
+    ones of its reordered copy (see reorder_graph()):
+        - "new_to_old": the original ID of each new node;
+        - "old_to_new": the new ID of each original node.
+    """
+    __slots__ = (
+        'new_to_old',
+        'old_to_new',
+    )
+
+
+    def __init__(self, order:array):
+        """
+        "order" lists the original IDs of the nodes in their new order;
+        raises ValueError if it isn't a permutation of the node IDs.
+        """
+        num_nodes = len(order)
+
+        self.new_to_old = array('q', order)
+        self.old_to_new = array('q', [-1]) * num_nodes
+
+        for new_node, old_node in enumerate(order):
+            if not(0 <= old_node < num_nodes) or self.old_to_new[old_node] != -1:
+                raise ValueError("The order must list each node ID exactly once")
+
+            self.old_to_new[old_node] = new_node
+
+
+    def path_to_old(self, path) -> deque:
+        """Translates a path of the reordered graph to the original IDs."""
+        return deque(map(self.new_to_old.__getitem__, path))
+
+
+    def permute(self, values:array) -> array:
+        """
+        Returns a copy of the per-node values (such as coordinates) indexed
+        by the new IDs.
+        """
+        return array(values.typecode, map(values.__getitem__, self.new_to_old))
+
+
+def node_order(graph:BaseGraph, ordering:str, x:array=None, y:array=None) -> array:
+    """
+    Returns the nodes in the specified ordering (see ORDERINGS); 'hilbert'
+    requires the nodes' coordinates "x" and "y".
+    """
+    if ordering == 'bfs':
+        return bfs_order(graph)
+
+    if ordering == 'cuthill-mckee':
+        return bfs_order(graph, by_degree=True)
+
+    if ordering == 'hilbert':
+        if x is None or y is None:
+            raise ValueError("The 'hilbert' ordering requires the nodes' coordinates")
+        if len(x) != graph.num_nodes:
+            raise ValueError(f"Expected the coordinates of {graph.num_nodes} nodes, found {len(x)}")
+
+        return hilbert_order(x, y)
+
+    raise ValueError(f"Unknown ordering '{ordering}' (expected one of: {', '.join(ORDERINGS)})")
+
+
+def reorder_graph(graph:BaseGraph, order:array) -> tuple:
+    """
+    Returns the (reordered_graph, node_map) pair: a CSRGraph copy of the
+    graph whose node i is the node order[i] of the original one, so that
+    the adjacency arrays follow the new order, and the NodeMap between
+    the two numberings.
+
+    Each node's arcs keep their relative order.
+    """
+    node_map = NodeMap(order)
+
+    if len(order) != graph.num_nodes:
+        raise ValueError(f"The order has {len(order)} nodes, the graph {graph.num_nodes}")
+
+    old_to_new = node_map.old_to_new
+
+    tails = array('q')
+    heads = array('q')
+    costs = array('d')
+
+    for new_node, old_node in enumerate(order):
+        for _, head, cost in graph.out_arcs(old_node):
+            tails.append(new_node)
+            heads.append(old_to_new[head])
+            costs.append(cost)
+
+    return (CSRGraph.from_arcs(graph.num_nodes, tails, heads, costs), node_map)
+
+
+class RenumberedAlgorithm:
+    """
+    Wrapper of an algorithm (see queries.ALGORITHMS), running it on a
+    reordered graph while taking and returning the original node IDs:
+    it's called just like the wrapped algorithm, with the reordered graph.
+    """
+    __slots__ = (
+        'algorithm',
+        'node_map',
+    )
+
+
+    def __init__(self, algorithm, node_map:NodeMap):
+        self.algorithm = algorithm
+        self.node_map = node_map
+
+
+    def __call__(self, graph:BaseGraph, src:int, dest:int, *args, **kwargs) -> deque:
+        graph._validate_src_dest(src, dest)
+
+        old_to_new = self.node_map.old_to_new
+
+        try:
+            path = self.algorithm(graph, old_to_new[src], old_to_new[dest], *args, **kwargs)
+        except NoDirectedPathError:
+            raise NoDirectedPathError(src, dest) from None
+
+        return self.node_map.path_to_old(path)
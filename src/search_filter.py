@@ -0,0 +1,281 @@
+from base_graph import BaseGraph
+from search_state import SearchState
+from exceptions import NoDirectedPathError, SearchBudgetError
+
+
+class SearchFilter:
+    """
+    Optional restriction of the algorithms in algorithms.py, passed through
+    their "search_filter" parameter, so that a query can be answered on a
+    restricted graph without building a new one:
+        - "node_mask": a read-only view of a bytearray indexed by node ID,
+          whose nonzero items mark the nodes the path must avoid; it's only
+          changed through block_node() and unblock_node(), which keep count
+          of them in "num_blocked_nodes" (also read-only);
+        - "blocked_arcs": the set of the (tail, head) pairs of the arcs the
+          path must avoid;
+        - "max_dist": the maximum cost of the path; the search stops as soon
+          as it can't find a path within it;
+        - "max_settled": the maximum number of nodes the query can make
+          permanent, in both directions; SearchBudgetError is raised if it
+          needs more to find a path.
+
+    Just like SearchStats, the algorithms never check for it inside their
+    loops: at the start of each filtered query they swap the graph and the
+    frontiers for filtering wrappers (see apply()), which skip the blocked
+    arcs while they're scanned, so unfiltered queries don't pay anything.
+
+    A filter holds no per-query state, hence it can be shared by concurrent
+    queries, as long as it isn't changed meanwhile.
+    """
+    __slots__ = (
+        '_node_mask',
+        '_num_blocked_nodes',
+        'blocked_arcs',
+        'max_dist',
+        'max_settled',
+    )
+
+
+    def __init__(
+        self,
+        num_nodes:int,
+        blocked_nodes=(),
+        blocked_arcs=(),
+        max_dist:float=None,
+        max_settled:int=None):
+        """
+        "blocked_nodes" and "blocked_arcs" are iterables of node IDs and
+        (tail, head) pairs respectively; "num_nodes" is the number of nodes
+        of the graphs the filter is applied to.
+        """
+        if max_dist is not None and max_dist < 0:
+            raise ValueError("The maximum distance must be nonnegative")
+
+        if max_settled is not None and max_settled <= 0:
+            raise ValueError("The maximum number of settled nodes must be positive")
+
+        self._node_mask = bytearray(num_nodes)
+        self._num_blocked_nodes = 0
+        self.blocked_arcs = set()
+        self.max_dist = max_dist
+        self.max_settled = max_settled
+
+        for node in blocked_nodes:
+            self.block_node(node)
+
+        for tail, head in blocked_arcs:
+            self.block_arc(tail, head)
+
+
+    @property
+    def node_mask(self) -> memoryview:
+        return memoryview(self._node_mask).toreadonly()
+
+
+    @property
+    def num_blocked_nodes(self) -> int:
+        return self._num_blocked_nodes
+
+
+    def block_node(self, node:int):
+        self._validate_node(node)
+
+        if not self._node_mask[node]:
+            self._node_mask[node] = 1
+            self._num_blocked_nodes += 1
+
+
+    def unblock_node(self, node:int):
+        self._validate_node(node)
+
+        if self._node_mask[node]:
+            self._node_mask[node] = 0
+            self._num_blocked_nodes -= 1
+
+
+    def block_arc(self, tail:int, head:int):
+        self._validate_node(tail)
+        self._validate_node(head)
+        self.blocked_arcs.add( (tail, head) )
+
+
+    def unblock_arc(self, tail:int, head:int):
+        self.blocked_arcs.discard( (tail, head) )
+
+
+    def apply(self, graph:BaseGraph, state:SearchState, src:int, dest:int) -> 'FilteredGraph':
+        """
+        Called by the algorithms once the state has been initialized: wraps
+        the state's frontiers, and returns the graph wrapper the algorithm
+        must use for the rest of the query.
+        """
+        if graph.num_nodes != len(self._node_mask):
+            raise ValueError(
+                f"The filter is for {len(self._node_mask)} nodes, the graph has {graph.num_nodes}"
+            )
+
+        if self.max_dist is not None or self.max_settled is not None:
+            # Shared by the two directions of the query
+            budget = SettledBudget(self.max_settled, src, dest)
+
+            state.temp_fwd = FilteredFrontier(state.temp_fwd, self.max_dist, budget)
+            state.temp_rev = FilteredFrontier(state.temp_rev, self.max_dist, budget)
+
+        if self._num_blocked_nodes == 0 and not self.blocked_arcs:
+            return graph
+
+        return FilteredGraph(graph, self)
+
+
+    def check_dist(self, src:int, dest:int, dist:float):
+        """
+        Called by the algorithms with the cost of the path they found:
+        raises NoDirectedPathError if it exceeds the maximum distance.
+        """
+        if self.max_dist is not None and dist > self.max_dist:
+            raise NoDirectedPathError(src, dest)
+
+
+    def _validate_node(self, node:int):
+        if not(0 <= node < len(self._node_mask)):
+            raise KeyError(
+                f"The node {node} is not inside the range [0, {len(self._node_mask)-1}]"
+            )
+
+
+class SettledBudget:
+    """The number of nodes a filtered query can still make permanent."""
+    __slots__ = (
+        'remaining',
+        'max_settled',
+        'src',
+        'dest',
+    )
+
+
+    def __init__(self, max_settled:int, src:int, dest:int):
+        self.remaining = float('+inf') if max_settled is None else max_settled
+        self.max_settled = max_settled
+        self.src = src
+        self.dest = dest
+
+
+    def spend(self):
+        if self.remaining == 0:
+            raise SearchBudgetError(self.src, self.dest, self.max_settled)
+
+        self.remaining -= 1
+
+
+class FilteredFrontier:
+    """
+    Wrapper of a frontier (see frontier.py), which looks empty as soon as
+    its minimum key exceeds "max_dist" (if not None), and spends one unit
+    of the budget for each node made permanent.
+
+    The keys are lower bounds of the cost of the paths through their nodes,
+    A*'s included, so no path within "max_dist" is missed; the nodes beyond
+    it stay in the frontier, so that the state's reset still finds them.
+    """
+    __slots__ = (
+        'frontier',
+        'max_dist',
+        'budget',
+
+        # The temporary nodes whose keys are within "max_dist": since a
+        # node's key only decreases until it's extracted, the minimum key
+        # exceeds "max_dist" exactly when there are none, which spares
+        # __len__() a min_key() call at each check of the search loop
+        'in_range',
+    )
+
+
+    def __init__(self, frontier, max_dist:float, budget:SettledBudget):
+        self.frontier = frontier
+        self.max_dist = float('+inf') if max_dist is None else max_dist
+        self.budget = budget
+        self.in_range = {node for node, key in frontier.keys.items() if key <= self.max_dist}
+
+
+    def push(self, node:int, key:float):
+        self.frontier.push(node, key)
+
+        if key <= self.max_dist:
+            self.in_range.add(node)
+
+
+    def pop_min(self) -> int:
+        self.budget.spend()
+
+        node = self.frontier.pop_min()
+        self.in_range.discard(node)
+        return node
+
+
+    def min_key(self) -> float:
+        key = self.frontier.min_key()
+        return key if key <= self.max_dist else float('+inf')
+
+
+    def clear(self):
+        self.frontier.clear()
+        self.in_range.clear()
+
+
+    def __len__(self) -> int:
+        return len(self.frontier) if self.in_range else 0
+
+
+    def __contains__(self, node:int) -> bool:
+        return node in self.frontier
+
+
+    def __iter__(self):
+        return iter(self.frontier)
+
+
+class FilteredGraph:
+    """
+    Wrapper of a graph, whose out_arcs()/in_arcs() skip the arcs blocked
+    by a SearchFilter, along with the arcs entering or leaving its blocked
+    nodes; blocked nodes have no arcs at all, so they're never reached nor
+    left by any search.
+    """
+    __slots__ = (
+        'graph',
+        'node_mask',
+        'blocked_arcs',
+    )
+
+
+    def __init__(self, graph:BaseGraph, search_filter:SearchFilter):
+        self.graph = graph
+        self.node_mask = search_filter._node_mask
+        self.blocked_arcs = search_filter.blocked_arcs
+
+
+    def out_arcs(self, node:int):
+        node_mask = self.node_mask
+        blocked_arcs = self.blocked_arcs
+
+        if node_mask[node]:
+            return
+
+        for arc in self.graph.out_arcs(node):
+            head = arc[1]
+            if not node_mask[head] and (node, head) not in blocked_arcs:
+                yield arc
+
+
+    def in_arcs(self, node:int):
+        node_mask = self.node_mask
+        blocked_arcs = self.blocked_arcs
+
+        if node_mask[node]:
+            return
+
+        for arc in self.graph.in_arcs(node):
+            tail = arc[0]
+            if not node_mask[tail] and (tail, node) not in blocked_arcs:
+                yield arc
@@ -0,0 +1,161 @@
+from array import array
+from itertools import chain
+
+from frontier import make_frontier
+from arc_node import NO_NODE
+
+class SearchState:
+    """
+    The state of a Dijkstra's execution (distance labels, predecessor/successor
+    values and sets of permanent/temporary nodes), kept apart from the graph's
+    topology so that a single graph can serve many queries at once, each one
+    with its own SearchState.
+
+    A SearchState can be reused for any number of queries on graphs with
+    the same number of nodes.
+    """
+    __slots__ = (
+        'num_nodes',
+
+        # Distance labels from the source node s and to the destination
+        # node t, indexed by node ID
+        'dist_s',
+        'dist_t',
+
+        # The predecessor node in the optimal path from the source node s
+        # (used for Forward Dijkstra) and the successor node in the optimal
+        # path towards the destination node t (used for Reverse Dijkstra),
+        # indexed by node ID; NO_NODE if there isn't one (yet).
+        'pred',
+        'succ',
+
+        # The following two fields are collections of node indices,
+        # representing, respectively:
+        #   - The set of permanent nodes (whose distance from the source node s
+        #     is proven to be optimal);
+        #   - The set of temporary nodes, whose distance's optimality has
+        #     not been proven yet; it's a frontier object (see frontier.py)
+        #     which also keeps track of the nodes' distance labels, so that
+        #     the one with the minimum label can be extracted efficiently.
+        #
+        # Both fields are used for the FORWARD Dijkstra's implementation:
+        # the algorithm starts with
+        #   - "perm_fwd" as an empty set;
+        #   - The source node s in "temp_fwd".
+        #
+        'perm_fwd',
+        'temp_fwd',
+
+        # Everything that has already been said about "perm_fwd" and
+        # "temp_fwd" still applies for the two fields below, except
+        # for the following:
+        #   - Both fields are used for the REVERSE Dijkstra's implementation;
+        #   - The algorithm starts with "perm_rev" as an empty set, and
+        #     the destination node t in "temp_rev".
+        #
+        'perm_rev',
+        'temp_rev'
+    )
+
+
+    def __init__(self, num_nodes:int):
+        """
+        Allocates the distance labels and predecessor/successor arrays,
+        along with empty sets of permanent/temporary nodes.
+        """
+        self.num_nodes = num_nodes
+
+        self.dist_s = array('d', [float('+inf')]) * num_nodes
+        self.dist_t = array('d', [float('+inf')]) * num_nodes
+        self.pred = array('q', [NO_NODE]) * num_nodes
+        self.succ = array('q', [NO_NODE]) * num_nodes
+
+        self.perm_fwd = set()
+        self.temp_fwd = make_frontier('heap')
+        self.perm_rev = set()
+        self.temp_rev = make_frontier('heap')
+
+
+    def init(self, src:int, dest:int, queue:str='heap', max_cost:int=None):
+        """
+        Resets nodes' distance labels and predecessor/successor values.
+
+        Also, initialize the sets of permanent and temporary nodes,
+        in order to prepare for an execution of
+        one of the three variants of Dijkstra's algorithm.
+
+        The "queue" parameter selects the frontier implementation used for
+        the sets of temporary nodes (see frontier.FRONTIERS); "max_cost",
+        the graph's maximum arc cost, is only required by the 'dial' one.
+        """
+        self.reset()
+
+        self.temp_fwd = make_frontier(queue, max_cost)
+        self.temp_fwd.push(src, 0)
+
+        self.temp_rev = make_frontier(queue, max_cost)
+        self.temp_rev.push(dest, 0)
+
+        self.dist_s[src] = 0
+        self.dist_t[dest] = 0
+
+
+    def reset(self):
+        """
+        Restores the labels modified by the previous execution to their
+        initial values, and empties the sets of permanent/temporary nodes.
+
+        NOTE: the algorithms only change the labels of the nodes they insert
+        in a set of temporary nodes, which either stay there or are moved
+        to the corresponding set of permanent nodes; therefore, the union of
+        the four sets is exactly the set of nodes touched by the previous
+        execution, and resetting them costs O(touched nodes) instead
+        of O(num_nodes).
+        """
+        inf = float('+inf')
+
+        dist_s = self.dist_s
+        dist_t = self.dist_t
+        pred = self.pred
+        succ = self.succ
+
+        for node in chain(self.perm_fwd, self.temp_fwd, self.perm_rev, self.temp_rev):
+            dist_s[node] = inf
+            dist_t[node] = inf
+            pred[node] = NO_NODE
+            succ[node] = NO_NODE
+
+        self.perm_fwd.clear()
+        self.temp_fwd.clear()
+        self.perm_rev.clear()
+        self.temp_rev.clear()
+
+
+    def make_node_perm_fwd(self) -> int:
+        """
+        Moves the temporary node with the minimum distance from the source
+        node to the set of permanent nodes, for the FORWARD Dijkstra
+        implementation, and returns it.
+        """
+        node = self.temp_fwd.pop_min()
+        self.perm_fwd.add(node)
+        return node
+
+
+    def make_node_perm_rev(self) -> int:
+        """
+        Moves the temporary node with the minimum distance to the destination
+        node to the set of permanent nodes, for the REVERSE Dijkstra
+        implementation, and returns it.
+        """
+        node = self.temp_rev.pop_min()
+        self.perm_rev.add(node)
+        return node
+
+
+    def num_perm_nodes(self) -> int:
+        """
+        Returns the number of nodes marked as permanent by the last execution,
+        in either direction.
+        """
+        return len( self.perm_fwd.union(self.perm_rev) )
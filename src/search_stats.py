@@ -0,0 +1,254 @@
+import csv, io
+from time import perf_counter
+
+from base_graph import BaseGraph
+from search_state import SearchState
+
+# The two directions of a search, as reported by SearchStats
+FORWARD = 'fwd'
+REVERSE = 'rev'
+
+
+class SearchStats:
+    """
+    Optional observer of the algorithms in algorithms.py, passed through
+    their "stats" parameter: it collects the counters below for the queries
+    it observes, and calls the optional per-event callbacks.
+
+    The algorithms never check for it inside their loops: at the start of
+    each observed query they swap the graph and the frontiers for observing
+    wrappers (see observe()), so queries run without a SearchStats don't
+    pay anything for it.
+
+    Counters (dictionaries mapping FORWARD/REVERSE to a value, accumulated
+    over all the observed queries):
+        - "settled": nodes made permanent;
+        - "scanned_arcs": arcs examined from the permanent nodes;
+        - "relaxed": arcs improving their head's (tail's, in the reverse
+          direction) distance label, hence the nodes pushed on the frontier;
+        - "decrease_keys": the relaxations which updated the label of a node
+          already in the frontier, instead of inserting a new one;
+        - "max_queue_size": the highest number of temporary nodes.
+
+    "phase_times" maps the name of each phase of the queries ('init' for
+    the state's initialization, 'search' for the main loop) to the total
+    time spent in it, and "num_queries" counts the observed queries.
+
+    Callbacks (each one optional):
+        - on_settle(direction, node, dist): when a node is made permanent;
+        - on_relax(direction, node, dist): when a node's label improves.
+
+    If "trace" is True, the (query, direction, node, dist) tuple of each
+    permanent node is appended to "settle_trace", in settling order, so
+    that the growth of the search frontiers can be visualized (see
+    dump_trace()).
+    """
+    __slots__ = (
+        'settled',
+        'scanned_arcs',
+        'relaxed',
+        'decrease_keys',
+        'max_queue_size',
+
+        'phase_times',
+        'num_queries',
+
+        'on_settle',
+        'on_relax',
+        'trace',
+        'settle_trace',
+
+        # The current phase's name and starting time
+        'phase',
+        'phase_start',
+    )
+
+
+    def __init__(self, on_settle=None, on_relax=None, trace:bool=False):
+        self.on_settle = on_settle
+        self.on_relax = on_relax
+        self.trace = trace
+        self.reset()
+
+
+    def reset(self):
+        """Resets all the counters and empties the trace."""
+        self.settled = {FORWARD: 0, REVERSE: 0}
+        self.scanned_arcs = {FORWARD: 0, REVERSE: 0}
+        self.relaxed = {FORWARD: 0, REVERSE: 0}
+        self.decrease_keys = {FORWARD: 0, REVERSE: 0}
+        self.max_queue_size = {FORWARD: 0, REVERSE: 0}
+
+        self.phase_times = dict()
+        self.num_queries = 0
+
+        self.settle_trace = list()
+        self.phase = None
+        self.phase_start = None
+
+
+    def observe(self, graph:BaseGraph, state:SearchState) -> 'ObservedGraph':
+        """
+        Called by the algorithms once the state has been initialized: wraps
+        the state's frontiers, and returns the graph wrapper the algorithm
+        must use for the rest of the query. Also starts the 'search' phase,
+        after accounting the time since the query started to 'init'.
+        """
+        self.num_queries += 1
+
+        state.temp_fwd = ObservedFrontier(state.temp_fwd, self, FORWARD, state.dist_s)
+        state.temp_rev = ObservedFrontier(state.temp_rev, self, REVERSE, state.dist_t)
+
+        self.start_phase('search')
+
+        return ObservedGraph(graph, self)
+
+
+    def start_phase(self, phase:str):
+        """
+        Ends the current phase (if any) and starts the specified one; None
+        just ends the current phase.
+        """
+        now = perf_counter()
+
+        if self.phase is not None:
+            self.phase_times[self.phase] = (
+                self.phase_times.get(self.phase, 0.0) + now - self.phase_start
+            )
+
+        self.phase = phase
+        self.phase_start = now
+
+
+    def total(self, counter:str) -> int:
+        """Returns the sum of the specified counter over both directions."""
+        return sum(getattr(self, counter).values())
+
+
+    def summary(self) -> dict:
+        """Returns all the counters and phase times, as a dictionary."""
+        return {
+            'num_queries': self.num_queries,
+            'settled': dict(self.settled),
+            'scanned_arcs': dict(self.scanned_arcs),
+            'relaxed': dict(self.relaxed),
+            'decrease_keys': dict(self.decrease_keys),
+            'max_queue_size': dict(self.max_queue_size),
+            'phase_times': dict(self.phase_times),
+        }
+
+
+    def dump_trace(self, file_out:io.TextIOBase):
+        """
+        Writes the settle-order trace as CSV rows, with the columns
+        "order", "query", "direction", "node" and "dist".
+        """
+        writer = csv.writer(file_out)
+        writer.writerow( ('order', 'query', 'direction', 'node', 'dist') )
+
+        for order, row in enumerate(self.settle_trace):
+            writer.writerow( (order, *row) )
+
+
+class ObservedFrontier:
+    """
+    Wrapper of a frontier (see frontier.py), updating the counters of a
+    SearchStats for one direction of the search.
+    """
+    __slots__ = (
+        'frontier',
+        'stats',
+        'direction',
+
+        # The distance labels of the search direction
+        'dist',
+    )
+
+
+    def __init__(self, frontier, stats:SearchStats, direction:str, dist):
+        self.frontier = frontier
+        self.stats = stats
+        self.direction = direction
+        self.dist = dist
+
+
+    def push(self, node:int, key:float):
+        stats = self.stats
+        direction = self.direction
+
+        stats.relaxed[direction] += 1
+        if node in self.frontier:
+            stats.decrease_keys[direction] += 1
+
+        self.frontier.push(node, key)
+
+        queue_size = len(self.frontier)
+        if queue_size > stats.max_queue_size[direction]:
+            stats.max_queue_size[direction] = queue_size
+
+        if stats.on_relax is not None:
+            stats.on_relax(direction, node, self.dist[node])
+
+
+    def pop_min(self) -> int:
+        stats = self.stats
+        direction = self.direction
+
+        node = self.frontier.pop_min()
+        stats.settled[direction] += 1
+
+        if stats.trace:
+            stats.settle_trace.append( (stats.num_queries, direction, node, self.dist[node]) )
+
+        if stats.on_settle is not None:
+            stats.on_settle(direction, node, self.dist[node])
+
+        return node
+
+
+    def min_key(self) -> float:
+        return self.frontier.min_key()
+
+
+    def clear(self):
+        self.frontier.clear()
+
+
+    def __len__(self) -> int:
+        return len(self.frontier)
+
+
+    def __contains__(self, node:int) -> bool:
+        return node in self.frontier
+
+
+    def __iter__(self):
+        return iter(self.frontier)
+
+
+class ObservedGraph:
+    """
+    Wrapper of a graph, counting the arcs scanned by the algorithms
+    through out_arcs()/in_arcs().
+    """
+    __slots__ = (
+        'graph',
+        'scanned_arcs',
+    )
+
+
+    def __init__(self, graph:BaseGraph, stats:SearchStats):
+        self.graph = graph
+        self.scanned_arcs = stats.scanned_arcs
+
+
+    def out_arcs(self, node:int):
+        arcs = list(self.graph.out_arcs(node))
+        self.scanned_arcs[FORWARD] += len(arcs)
+        return arcs
+
+
+    def in_arcs(self, node:int):
+        arcs = list(self.graph.in_arcs(node))
+        self.scanned_arcs[REVERSE] += len(arcs)
+        return arcs
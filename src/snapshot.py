@@ -0,0 +1,155 @@
+import io, mmap, struct, sys
+
+from csr_graph import CSRGraph
+from graph_loader import open_graph_file
+from exceptions import InvalidSnapshotError
+
+# Binary graph snapshot format (version 1).
+#
+# The file starts with a fixed-size header:
+#   - Magic bytes b'DIJKSNAP';
+#   - Format version (uint32);
+#   - Byte order marker (uint32 holding BYTE_ORDER_MARK, written in the
+#     writer's native byte order);
+#   - Number of nodes (uint64);
+#   - Number of arcs (uint64);
+#   - Zero padding up to HEADER_SIZE bytes.
+#
+# It's followed by the arrays of a CSRGraph, in native byte order and
+# without any padding (every item is 8 bytes long, so they're all aligned):
+#   - fwd_offsets (num_nodes + 1 int64);
+#   - heads       (num_arcs int64);
+#   - fwd_costs   (num_arcs float64);
+#   - rev_offsets (num_nodes + 1 int64);
+#   - tails       (num_arcs int64);
+#   - rev_costs   (num_arcs float64).
+#
+# The last three arrays are the reverse index, used for the incoming arcs.
+
+MAGIC = b'DIJKSNAP'
+VERSION = 1
+BYTE_ORDER_MARK = 0x01020304
+
+HEADER_FORMAT = '=8sIIQQ'
+HEADER_SIZE = 64
+
+# (name, typecode, whether the array has num_nodes + 1 items rather than
+# num_arcs items), in the order they're stored in the file
+SECTIONS = (
+    ('fwd_offsets', 'q', True),
+    ('heads', 'q', False),
+    ('fwd_costs', 'd', False),
+    ('rev_offsets', 'q', True),
+    ('tails', 'q', False),
+    ('rev_costs', 'd', False),
+)
+
+ITEM_SIZE = 8
+
+
+def write_snapshot(graph:CSRGraph, file_bin:io.BufferedIOBase):
+    """Writes the specified graph to a binary snapshot file."""
+    header = struct.pack(
+        HEADER_FORMAT,
+        MAGIC, VERSION, BYTE_ORDER_MARK, graph.num_nodes, graph.num_arcs
+    )
+    file_bin.write(header.ljust(HEADER_SIZE, b'\0'))
+
+    for name, _, _ in SECTIONS:
+        file_bin.write(getattr(graph, name))
+
+
+def open_snapshot(filename:str) -> CSRGraph:
+    """
+    Opens a binary snapshot file, returning a CSRGraph whose arrays are
+    views over a read-only memory map of the file: nothing is parsed or
+    copied, and processes opening the same snapshot share the page cache.
+
+    The arcs are not validated: snapshots are meant to be written from
+    already validated graphs only (see convert_json()).
+    """
+    with open(filename, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise InvalidSnapshotError(filename, "Empty file") from None
+
+    if len(mapped) < HEADER_SIZE:
+        raise InvalidSnapshotError(filename, "Truncated header")
+
+    magic, version, byte_order_mark, num_nodes, num_arcs = struct.unpack_from(
+        HEADER_FORMAT, mapped
+    )
+
+    if magic != MAGIC:
+        raise InvalidSnapshotError(filename, "Not a graph snapshot")
+
+    if version != VERSION:
+        raise InvalidSnapshotError(filename, f"Unsupported format version {version}")
+
+    if byte_order_mark != BYTE_ORDER_MARK:
+        raise InvalidSnapshotError(
+            filename, f"Byte order differs from this machine's ({sys.byteorder})"
+        )
+
+    expected_size = HEADER_SIZE + ITEM_SIZE * (2 * (num_nodes + 1) + 4 * num_arcs)
+    if len(mapped) != expected_size:
+        raise InvalidSnapshotError(
+            filename, f"Expected {expected_size} bytes, found {len(mapped)}"
+        )
+
+    buffers = dict()
+    view = memoryview(mapped)
+    offset = HEADER_SIZE
+
+    for name, typecode, per_node in SECTIONS:
+        size = ITEM_SIZE * (num_nodes + 1 if per_node else num_arcs)
+        buffers[name] = view[offset : offset + size].cast(typecode)
+        offset += size
+
+    return CSRGraph.from_buffers(num_nodes, **buffers)
+
+
+def convert_json(json_filename:str, snapshot_filename:str, progress=None):
+    """
+    Builds (and validates) the graph stored in the specified JSON file,
+    then saves it as a binary snapshot.
+    """
+    with open_graph_file(json_filename) as f:
+        graph = CSRGraph(f, progress)
+
+    with open(snapshot_filename, 'wb') as f:
+        write_snapshot(graph, f)
+
+
+def validate_args(argv) -> tuple:
+    usage_msg = (
+        "\nUsage:\n"
+        "python snapshot.py <input_graph_json> <output_snapshot>\n"
+    )
+    if len(argv) != 3:
+        print(usage_msg)
+        quit()
+
+    input_graph_json = argv[1]
+    if not input_graph_json.endswith( ('.json', '.json.gz') ):
+        print("Parameter 'input_graph_json' must have .json or .json.gz extension")
+        quit()
+
+    output_snapshot = argv[2]
+    if not output_snapshot.endswith('.snap'):
+        print("Parameter 'output_snapshot' must have .snap extension")
+        quit()
+
+    return (input_graph_json, output_snapshot)
+
+
+if __name__ == '__main__':
+    input_graph_json, output_snapshot = validate_args(sys.argv)
+
+    def print_progress(num_arcs:int):
+        print(f'\rConverting the graph... {num_arcs} arcs', end='', flush=True)
+
+    print("Converting the graph...", end=' ', flush=True)
+    convert_json(input_graph_json, output_snapshot, print_progress)
+    print(' done')
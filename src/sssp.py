@@ -0,0 +1,122 @@
+from array import array
+from collections import deque
+
+from base_graph import BaseGraph
+from frontier import make_frontier, AUTO_QUEUE
+from arc_node import NO_NODE
+from exceptions import NoDirectedPathError
+
+
+class ShortestPathTree:
+    """
+    The shortest path tree rooted at a node, as computed by
+    shortest_path_tree(): for each node, its distance from the root and its
+    parent in the tree (NO_NODE for the root and for unreachable nodes,
+    whose distance is infinite).
+
+    In a forward tree, "pred" holds each node's predecessor on the optimal
+    path from the root; in a reverse tree, it holds each node's successor
+    on the optimal path to the root, and "dist" the distance to the root.
+    """
+    __slots__ = (
+        'root',
+        'reverse',
+        'dist',
+        'pred',
+    )
+
+
+    def __init__(self, root:int, reverse:bool, dist:array, pred:array):
+        self.root = root
+        self.reverse = reverse
+        self.dist = dist
+        self.pred = pred
+
+
+    def iter_path(self, node:int):
+        """
+        Lazily yields the nodes of the tree's path between the specified node
+        and the root, starting from the node itself and ending with the root:
+        that is, the optimal path from the root backwards for a forward tree,
+        and the optimal path to the root for a reverse tree.
+
+        Nothing is yielded if the node is unreachable.
+        """
+        if self.dist[node] == float('+inf'):
+            return
+
+        yield node
+
+        pred = self.pred
+        while (node := pred[node]) != NO_NODE:
+            yield node
+
+
+    def path(self, node:int) -> deque:
+        """
+        Returns the optimal path between the root and the specified node
+        (from the root for a forward tree, to the root for a reverse one),
+        in the same format as the algorithms in algorithms.py.
+
+        Raises NoDirectedPathError if there's no such path.
+        """
+        if self.dist[node] == float('+inf'):
+            if self.reverse:
+                raise NoDirectedPathError(node, self.root)
+            raise NoDirectedPathError(self.root, node)
+
+        if self.reverse:
+            return deque(self.iter_path(node))
+
+        src_dest_path = deque()
+        src_dest_path.extendleft(self.iter_path(node))
+        return src_dest_path
+
+
+def shortest_path_tree(
+    graph:BaseGraph,
+    root:int,
+    reverse:bool=False,
+    queue:str=AUTO_QUEUE) -> ShortestPathTree:
+    """
+    Runs an exhaustive Dijkstra's search from the root node, without a
+    destination, and returns the resulting ShortestPathTree: the optimal
+    paths from the root to every node, or from every node to the root (on
+    the arcs entering each node) if "reverse" is True.
+
+    See algorithms.dijkstra_fwd() for the "queue" parameter.
+    """
+    if not(0 <= root < graph.num_nodes):
+        raise KeyError(
+            f"The root node {root} is not inside the range [0, {graph.num_nodes-1}]"
+        )
+
+    dist = array('d', [float('+inf')]) * graph.num_nodes
+    pred = array('q', [NO_NODE]) * graph.num_nodes
+    dist[root] = 0
+
+    temp = make_frontier(*graph.resolve_queue(queue))
+    temp.push(root, 0)
+
+    if reverse:
+        while temp:
+            j = temp.pop_min()
+            j_dist = dist[j]
+
+            for i, _, cost in graph.in_arcs(j):
+                if dist[i] > j_dist + cost:
+                    dist[i] = j_dist + cost
+                    pred[i] = j
+                    temp.push(i, dist[i])
+    else:
+        while temp:
+            i = temp.pop_min()
+            i_dist = dist[i]
+
+            for _, j, cost in graph.out_arcs(i):
+                if dist[j] > i_dist + cost:
+                    dist[j] = i_dist + cost
+                    pred[j] = i
+                    temp.push(j, dist[j])
+
+    return ShortestPathTree(root, reverse, dist, pred)
@@ -1,10 +1,22 @@
-import unittest
+import unittest, random
 from io import StringIO
 from collections import deque
+from functools import partial
 
 from graph import Graph
-from algorithms import dijkstra_fwd, dijkstra_rev, dijkstra_bidir
+from csr_graph import CSRGraph
+from algorithms import (
+    dijkstra_fwd, dijkstra_rev, dijkstra_bidir, dijkstra_bidir_mu, astar
+)
+from heuristics import LandmarkHeuristic
+from frontier import FRONTIERS, AUTO_QUEUE, make_frontier
+from grid_graph_gen import generate_graph, arc_arrays
 from exceptions import NoDirectedPathError
+from arc_node import NO_NODE
+
+# The queue types the paths of TestDijkstraBase are checked with: the
+# integer ones must return the very same paths as the binary heap
+QUEUES = (*FRONTIERS, AUTO_QUEUE)
 
 
 graph_valid = """
@@ -33,24 +45,53 @@ class TestDijkstraBase:
     Base class to be inherited by test classes related to each of
     the three Dijkstra's variants.
     Each derived class must do the following in setUp():
-        - Call super().base_setUp(), to create the test graph;
+        - Call super().base_setUp(), to create the test graph (optionally
+          passing the graph representation's class, Graph by default);
         - Define a class method "dijkstra_func", assigning it the
           Dijkstra's variant to be tested.
     """
-    def base_setUp(self):
+    def base_setUp(self, graph_class=Graph):
         with StringIO(graph_valid) as f:
-            self.graph = Graph(f)
+            self.graph = graph_class(f)
 
     def test_optimal_paths(self):
-        path_0_5 = self.dijkstra_func(self.graph, 0, 5)
-        self.assertEqual(path_0_5, deque([0, 1, 4, 5]))
+        for queue in QUEUES:
+            with self.subTest(queue=queue):
+                path_0_5 = self.dijkstra_func(self.graph, 0, 5, queue=queue)
+                self.assertEqual(path_0_5, deque([0, 1, 4, 5]))
 
-        path_0_2 = self.dijkstra_func(self.graph, 0, 2)
-        self.assertEqual(path_0_2, deque([0, 1, 2]))
+                path_0_2 = self.dijkstra_func(self.graph, 0, 2, queue=queue)
+                self.assertEqual(path_0_2, deque([0, 1, 2]))
 
-        path_2_3 = self.dijkstra_func(self.graph, 2, 3)
-        self.assertEqual(path_2_3, deque([2, 4, 3]))
+                path_2_3 = self.dijkstra_func(self.graph, 2, 3, queue=queue)
+                self.assertEqual(path_2_3, deque([2, 4, 3]))
     
+    def test_state_reset(self):
+        state = self.graph.new_state()
+        path_0_5 = self.dijkstra_func(self.graph, 0, 5, state=state)
+        state.reset()
+
+        num_nodes = self.graph.num_nodes
+        self.assertEqual(list(state.dist_s), num_nodes * [float('+inf')])
+        self.assertEqual(list(state.dist_t), num_nodes * [float('+inf')])
+        self.assertEqual(list(state.pred), num_nodes * [NO_NODE])
+        self.assertEqual(list(state.succ), num_nodes * [NO_NODE])
+
+    def test_separate_states(self):
+        # Interleaved queries with their own states don't interfere
+        state_0_5 = self.graph.new_state()
+        state_2_3 = self.graph.new_state()
+
+        for queue in QUEUES:
+            with self.subTest(queue=queue):
+                path_0_5 = self.dijkstra_func(self.graph, 0, 5, queue=queue, state=state_0_5)
+                path_2_3 = self.dijkstra_func(self.graph, 2, 3, queue=queue, state=state_2_3)
+
+                self.assertEqual(path_0_5, deque([0, 1, 4, 5]))
+                self.assertEqual(path_2_3, deque([2, 4, 3]))
+                self.assertNotEqual(state_0_5.perm_fwd | state_0_5.perm_rev, set())
+                self.assertNotEqual(state_2_3.perm_fwd | state_2_3.perm_rev, set())
+
     def test_invalid_src_node_error(self):
         with self.assertRaises(KeyError):
             path = self.dijkstra_func(self.graph, 100, 1)
@@ -63,19 +104,25 @@ class TestDijkstraBase:
         with self.assertRaises(ValueError):
             path = self.dijkstra_func(self.graph, 1, 1)
 
-    def checkIfRaisesNoDirectedPath(self, src:int, dest:int):
+    def test_invalid_queue_error(self):
+        with self.assertRaises(ValueError):
+            path = self.dijkstra_func(self.graph, 0, 5, queue='foo')
+
+    def checkIfRaisesNoDirectedPath(self, src:int, dest:int, queue:str):
         """Helper function for test_unreachable_dest, to reduce cluttering."""
         with self.assertRaises(NoDirectedPathError) as context_manager:
-            path_src_dest = self.dijkstra_func(self.graph, src, dest)
+            path_src_dest = self.dijkstra_func(self.graph, src, dest, queue=queue)
         
         exc = context_manager.exception
         self.assertEqual(exc.src, src)
         self.assertEqual(exc.dest, dest)
 
     def test_unreachable_dest(self):
-        self.checkIfRaisesNoDirectedPath(5, 0)
-        self.checkIfRaisesNoDirectedPath(3, 2)
-        self.checkIfRaisesNoDirectedPath(4, 1)
+        for queue in QUEUES:
+            with self.subTest(queue=queue):
+                self.checkIfRaisesNoDirectedPath(5, 0, queue)
+                self.checkIfRaisesNoDirectedPath(3, 2, queue)
+                self.checkIfRaisesNoDirectedPath(4, 1, queue)
 
 
 class TestDijkstraFwd(unittest.TestCase, TestDijkstraBase):
@@ -96,5 +143,194 @@ class TestDijkstraBidir(unittest.TestCase, TestDijkstraBase):
         self.dijkstra_func = dijkstra_bidir
 
 
+# Same tests as above, using the reference set-scan frontier instead of
+# the default queue in the tests which don't check every queue type.
+
+class TestDijkstraFwdSetQueue(unittest.TestCase, TestDijkstraBase):
+    def setUp(self):
+        super().base_setUp()
+        self.dijkstra_func = partial(dijkstra_fwd, queue='set')
+
+
+class TestDijkstraRevSetQueue(unittest.TestCase, TestDijkstraBase):
+    def setUp(self):
+        super().base_setUp()
+        self.dijkstra_func = partial(dijkstra_rev, queue='set')
+
+
+class TestDijkstraBidirSetQueue(unittest.TestCase, TestDijkstraBase):
+    def setUp(self):
+        super().base_setUp()
+        self.dijkstra_func = partial(dijkstra_bidir, queue='set')
+
+
+
+# Same tests as above, using the compact CSR graph representation.
+
+class TestDijkstraFwdCSR(unittest.TestCase, TestDijkstraBase):
+    def setUp(self):
+        super().base_setUp(CSRGraph)
+        self.dijkstra_func = dijkstra_fwd
+
+
+class TestDijkstraRevCSR(unittest.TestCase, TestDijkstraBase):
+    def setUp(self):
+        super().base_setUp(CSRGraph)
+        self.dijkstra_func = dijkstra_rev
+
+
+class TestDijkstraBidirCSR(unittest.TestCase, TestDijkstraBase):
+    def setUp(self):
+        super().base_setUp(CSRGraph)
+        self.dijkstra_func = dijkstra_bidir
+
+
+
+# Same tests as above, for the A* algorithm with the null heuristic
+# (equivalent to the forward Dijkstra) and with the ALT one.
+
+class TestAstarNull(unittest.TestCase, TestDijkstraBase):
+    def setUp(self):
+        super().base_setUp()
+        self.dijkstra_func = partial(astar, heuristic=lambda node, dest: 0)
+
+
+class TestAstarALT(unittest.TestCase, TestDijkstraBase):
+    def setUp(self):
+        super().base_setUp()
+        heuristic = LandmarkHeuristic(self.graph, 2, seed=0)
+        self.dijkstra_func = partial(astar, heuristic=heuristic)
+
+
+
+# Same tests as above, for the bidirectional Dijkstra with the
+# best meeting cost stopping criterion and each balance mode.
+
+class TestDijkstraBidirMuAlternate(unittest.TestCase, TestDijkstraBase):
+    def setUp(self):
+        super().base_setUp()
+        self.dijkstra_func = partial(dijkstra_bidir_mu, balance='alternate')
+
+
+class TestDijkstraBidirMuSize(unittest.TestCase, TestDijkstraBase):
+    def setUp(self):
+        super().base_setUp()
+        self.dijkstra_func = partial(dijkstra_bidir_mu, balance='size')
+
+
+class TestDijkstraBidirMuKey(unittest.TestCase, TestDijkstraBase):
+    def setUp(self):
+        super().base_setUp()
+        self.dijkstra_func = partial(dijkstra_bidir_mu, balance='key')
+
+
+class TestDijkstraBidirMu(unittest.TestCase):
+    # The first node made permanent by both searches (1, at distance 3 from
+    # both ends) isn't on the optimal path, which is the direct arc (0, 2)
+    graph_meeting = """
+    {
+        "num_nodes": 3,
+        "arcs": [
+            [0, 1, 3],
+            [1, 2, 3],
+            [0, 2, 5]
+        ]
+    }
+    """
+
+    def setUp(self):
+        with StringIO(self.graph_meeting) as f:
+            self.graph = Graph(f)
+
+    def test_optimal_path(self):
+        for balance in ('alternate', 'size', 'key'):
+            path = dijkstra_bidir_mu(self.graph, 0, 2, balance)
+            self.assertEqual(path, deque([0, 2]))
+
+    def test_invalid_balance(self):
+        with self.assertRaises(ValueError):
+            dijkstra_bidir_mu(self.graph, 0, 2, 'random')
+
+
+class TestQueueSelection(unittest.TestCase):
+    graph_fractional = """
+    {
+        "num_nodes": 3,
+        "arcs": [
+            [0, 1, 0.5],
+            [1, 2, 1],
+            [0, 2, 2]
+        ]
+    }
+    """
+
+    def setUp(self):
+        with StringIO(graph_valid) as f:
+            self.graph = Graph(f)
+
+    def test_auto_queue(self):
+        self.assertEqual(self.graph.max_integer_cost(), 4)
+        self.assertEqual(self.graph.select_queue('auto'), 'dial')
+        self.assertEqual(self.graph.select_queue('set'), 'set')
+
+        self.graph.update_arc_cost(0, 2, 10**6)
+        self.assertEqual(self.graph.max_integer_cost(), 10**6)
+        self.assertEqual(self.graph.select_queue('auto'), 'heap')
+
+        self.graph.update_arc_cost(0, 2, 4.5)
+        self.assertIsNone(self.graph.max_integer_cost())
+        self.assertEqual(self.graph.select_queue('auto'), 'heap')
+
+    def test_fractional_costs(self):
+        with StringIO(self.graph_fractional) as f:
+            graph = CSRGraph(f)
+
+        self.assertEqual(dijkstra_fwd(graph, 0, 2, queue='auto'), deque([0, 1, 2]))
+
+        for queue in ('dial', 'radix'):
+            with self.assertRaises(ValueError):
+                dijkstra_fwd(graph, 0, 2, queue=queue)
+
+    def test_large_costs(self):
+        # Paths whose costs differ in the highest bits only
+        arcs = [(0, 1, 2**40), (1, 2, 2**40), (0, 2, 2**41 + 1), (2, 3, 1)]
+        graph = CSRGraph.from_arcs(4, *map(list, zip(*arcs)))
+
+        for queue in ('radix', 'auto'):
+            self.assertEqual(dijkstra_bidir(graph, 0, 3, queue=queue), deque([0, 1, 2, 3]))
+
+    def test_radix_min_key(self):
+        frontier = make_frontier('radix')
+        for node, key in ((0, 0), (1, 9), (2, 5), (3, 12), (4, 5)):
+            frontier.push(node, key)
+
+        self.assertEqual(frontier.pop_min(), 0)
+
+        # The bucket holding the minimum key is redistributed only once
+        for _ in range(2):
+            self.assertEqual(frontier.min_key(), 5)
+            self.assertEqual(sorted(frontier.buckets[0]), [2, 4])
+
+        frontier.push(1, 6)
+        self.assertEqual([frontier.pop_min() for _ in range(4)], [2, 4, 1, 3])
+        self.assertEqual(frontier.min_key(), float('+inf'))
+
+    def test_same_paths_as_heap(self):
+        # Costs in [0, 3] make many ties, which the integer queues must break
+        # in the same order as the binary heap
+        num_nodes, batches, _ = generate_graph('grid4', 15, 3, seed=0)
+        graph = CSRGraph.from_arcs(num_nodes, *arc_arrays(batches))
+
+        rng = random.Random(0)
+        for _ in range(30):
+            src, dest = rng.sample(range(num_nodes), 2)
+
+            for dijkstra_func in (dijkstra_fwd, dijkstra_rev, dijkstra_bidir, dijkstra_bidir_mu):
+                path = dijkstra_func(graph, src, dest)
+
+                for queue in ('dial', 'radix', 'auto'):
+                    self.assertEqual(dijkstra_func(graph, src, dest, queue=queue), path)
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
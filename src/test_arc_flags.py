@@ -0,0 +1,163 @@
+import unittest, os, random, tempfile
+from array import array
+from io import StringIO
+
+from graph import Graph
+from csr_graph import CSRGraph
+from algorithms import dijkstra_fwd
+from arc_flags import (
+    ArcFlags, dijkstra_arc_flags, grid_regions, bfs_regions, flags_typecode, HEADER_SIZE
+)
+from grid_graph_gen import generate_graph, arc_arrays
+from exceptions import NoDirectedPathError, InvalidSnapshotError
+from test_algorithms import graph_valid
+from test_heuristics import path_cost
+
+
+class TestArcFlags(unittest.TestCase):
+    # Nodes 0, 1, 2 in region 0; nodes 3, 4, 5 in region 1
+    regions_valid = array('q', [0, 0, 0, 1, 1, 1])
+
+    def setUp(self):
+        with StringIO(graph_valid) as f:
+            self.graph = Graph(f)
+
+        self.arc_flags = ArcFlags.build(self.graph, self.regions_valid)
+
+    def test_flags(self):
+        # The arcs leaving node 0, towards 1 and 2 respectively: the latter
+        # is inside region 0, but not on any shortest path to region 1
+        self.assertEqual(list(self.arc_flags.out_flags(0)), [0b11, 0b01])
+
+        # The arcs crossing into region 1, and the ones inside it
+        self.assertEqual(list(self.arc_flags.out_flags(2)), [0b10])
+        self.assertEqual(list(self.arc_flags.out_flags(4)), [0b10, 0b10])
+
+    def test_optimal_paths(self):
+        self.assertEqual(list(dijkstra_arc_flags(self.graph, 0, 5, self.arc_flags)), [0, 1, 4, 5])
+        self.assertEqual(list(dijkstra_arc_flags(self.graph, 0, 2, self.arc_flags)), [0, 1, 2])
+        self.assertEqual(list(dijkstra_arc_flags(self.graph, 2, 3, self.arc_flags)), [2, 4, 3])
+
+    def test_unreachable(self):
+        for src, dest in ( (5, 0), (3, 2), (4, 1) ):
+            with self.assertRaises(NoDirectedPathError):
+                dijkstra_arc_flags(self.graph, src, dest, self.arc_flags)
+
+    def test_graph_mismatch(self):
+        # Another graph, with the same number of nodes
+        graph = CSRGraph.from_arcs(6, array('q', [0, 1]), array('q', [1, 5]), array('d', [1, 1]))
+        with self.assertRaises(ValueError):
+            dijkstra_arc_flags(graph, 0, 5, self.arc_flags)
+
+        # Any change to the graph, even keeping the number of arcs
+        self.graph.update_arc_cost(1, 4, 10)
+        with self.assertRaises(ValueError):
+            dijkstra_arc_flags(self.graph, 0, 5, self.arc_flags)
+
+        self.graph.remove_arc(1, 4)
+        self.assertEqual(self.graph.num_arcs, 8)
+        with self.assertRaises(ValueError):
+            dijkstra_arc_flags(self.graph, 0, 5, self.arc_flags)
+
+        arc_flags = ArcFlags.build(self.graph, self.regions_valid)
+        self.assertEqual(list(dijkstra_arc_flags(self.graph, 0, 5, arc_flags)), [0, 1, 3, 5])
+
+    def test_invalid_regions(self):
+        with self.assertRaises(ValueError):
+            ArcFlags.build(self.graph, array('q', [0, 0, 0]))
+
+        with self.assertRaises(ValueError):
+            ArcFlags.build(self.graph, array('q', [0, 0, 0, 1, 1, 64]))
+
+    def test_grid(self):
+        num_nodes, batches, _ = generate_graph('grid4', 12, 20, seed=0)
+        graph = CSRGraph.from_arcs(num_nodes, *arc_arrays(batches))
+
+        arc_flags = ArcFlags.build(graph, grid_regions(12, 3))
+        self.assertEqual(arc_flags.num_regions, 9)
+        self.assertEqual(arc_flags.flags.typecode, 'H')
+
+        state = graph.new_state()
+        perm_nodes = 0
+        pruned_perm_nodes = 0
+
+        rng = random.Random(1)
+        for _ in range(50):
+            src, dest = rng.sample(range(graph.num_nodes), 2)
+
+            expected_cost = path_cost(graph, dijkstra_fwd(graph, src, dest, state=state))
+            perm_nodes += state.num_perm_nodes()
+
+            path = dijkstra_arc_flags(graph, src, dest, arc_flags, state=state)
+            pruned_perm_nodes += state.num_perm_nodes()
+
+            self.assertEqual( (path[0], path[-1]), (src, dest) )
+            self.assertEqual(path_cost(graph, path), expected_cost)
+
+        self.assertLess(pruned_perm_nodes, perm_nodes)
+
+    def test_general_partition(self):
+        for topology in ('geometric', 'scale-free'):
+            num_nodes, batches, _ = generate_graph(topology, 150, 20, seed=0)
+            graph = CSRGraph.from_arcs(num_nodes, *arc_arrays(batches))
+
+            region = bfs_regions(graph, 8, seed=0)
+            self.assertEqual(set(region), set(range(8)))
+
+            arc_flags = ArcFlags.build(graph, region)
+
+            rng = random.Random(1)
+            for _ in range(30):
+                src, dest = rng.sample(range(graph.num_nodes), 2)
+                try:
+                    expected_cost = path_cost(graph, dijkstra_fwd(graph, src, dest))
+                except NoDirectedPathError:
+                    with self.assertRaises(NoDirectedPathError):
+                        dijkstra_arc_flags(graph, src, dest, arc_flags)
+                    continue
+
+                path = dijkstra_arc_flags(graph, src, dest, arc_flags)
+                self.assertEqual(path_cost(graph, path), expected_cost)
+
+    def test_grid_regions(self):
+        self.assertEqual(list(grid_regions(4, 2)), [0, 0, 1, 1] * 2 + [2, 2, 3, 3] * 2)
+
+        with self.assertRaises(ValueError):
+            grid_regions(4, 5)
+
+    def test_flags_typecode(self):
+        self.assertEqual(flags_typecode(8), 'B')
+        self.assertEqual(flags_typecode(9), 'H')
+        self.assertEqual(array(flags_typecode(64)).itemsize, 8)
+
+        with self.assertRaises(ValueError):
+            flags_typecode(65)
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'graph.flags')
+            with open(filename, 'wb') as f:
+                self.arc_flags.save(f)
+
+            loaded_flags = ArcFlags.load(filename)
+            for name in ArcFlags.__slots__:
+                self.assertEqual(getattr(loaded_flags, name), getattr(self.arc_flags, name))
+
+            self.assertEqual(list(dijkstra_arc_flags(self.graph, 0, 5, loaded_flags)), [0, 1, 4, 5])
+
+            # Truncated file
+            with open(filename, 'r+b') as f:
+                f.truncate(HEADER_SIZE + 8)
+            with self.assertRaises(InvalidSnapshotError):
+                ArcFlags.load(filename)
+
+            # Not an arc flags file
+            with open(filename, 'wb') as f:
+                f.write(b'{"num_nodes": 3}'.ljust(HEADER_SIZE))
+            with self.assertRaises(InvalidSnapshotError) as context_manager:
+                ArcFlags.load(filename)
+            self.assertEqual(context_manager.exception.details, "Not an arc flags file")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest, contextlib, copy, io
+
+from benchmark import validate_args, benchmark, compare
+from queries import ALGORITHMS
+
+
+class TestBenchmark(unittest.TestCase):
+    def run_benchmark(self, *argv) -> dict:
+        args = validate_args(['benchmark.py', '--sizes', '5', '8', '--queries', '3',
+                              '--repetitions', '2', *argv])
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            return benchmark(args)
+
+    def test_results(self):
+        results = self.run_benchmark('--queue', 'heap', 'set')
+
+        self.assertEqual(len(results['results']), 2 * 2 * len(ALGORITHMS))
+        for result in results['results']:
+            self.assertGreater(result['time_mean'], 0)
+            self.assertGreater(result['settled_nodes'], 0)
+            self.assertGreater(result['relaxed_arcs'], 0)
+            self.assertGreater(result['peak_memory'], 0)
+
+    def test_reproducible(self):
+        def effort(results:dict) -> list:
+            return [
+                (result['settled_nodes'], result['relaxed_arcs'])
+                for result in results['results']
+            ]
+
+        self.assertEqual(effort(self.run_benchmark()), effort(self.run_benchmark()))
+
+    def test_compare(self):
+        results = self.run_benchmark()
+
+        comparisons = compare(results, results)
+        self.assertEqual(len(comparisons), len(results['results']))
+        self.assertTrue(all(ratio == 1 for _, _, ratio in comparisons))
+
+        # A baseline twice as slow, lacking the first result
+        baseline = copy.deepcopy(results)
+        del baseline['results'][0]
+        for result in baseline['results']:
+            result['time_mean'] *= 2
+
+        comparisons = compare(results, baseline)
+        self.assertEqual(len(comparisons), len(results['results']) - 1)
+        self.assertTrue(all(ratio == 0.5 for _, _, ratio in comparisons))
+
+
+if __name__ == '__main__':
+    unittest.main()
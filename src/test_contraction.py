@@ -0,0 +1,88 @@
+import unittest, os, random, tempfile
+from array import array
+from io import StringIO
+
+from csr_graph import CSRGraph
+from algorithms import dijkstra_fwd
+from contraction import ContractionHierarchy, dijkstra_ch, HEADER_SIZE
+from exceptions import NoDirectedPathError, InvalidSnapshotError
+from grid_graph_gen import grid_graph_gen
+from test_algorithms import graph_valid
+from test_heuristics import path_cost
+
+
+class TestContractionHierarchy(unittest.TestCase):
+    def setUp(self):
+        with StringIO(graph_valid) as f:
+            self.graph = CSRGraph(f)
+
+        self.ch = ContractionHierarchy.build(self.graph)
+
+    def test_ranks(self):
+        self.assertEqual(sorted(self.ch.rank), list(range(self.graph.num_nodes)))
+
+    def test_optimal_paths(self):
+        self.assertEqual(list(dijkstra_ch(self.graph, 0, 5, self.ch)), [0, 1, 4, 5])
+        self.assertEqual(list(dijkstra_ch(self.graph, 0, 2, self.ch)), [0, 1, 2])
+        self.assertEqual(list(dijkstra_ch(self.graph, 2, 3, self.ch)), [2, 4, 3])
+
+    def test_unreachable(self):
+        for src, dest in ( (5, 0), (3, 2), (4, 1) ):
+            with self.assertRaises(NoDirectedPathError):
+                dijkstra_ch(self.graph, src, dest, self.ch)
+
+    def test_grid(self):
+        random.seed(0)
+        graph_dict = grid_graph_gen(10, 20)
+        tails, heads, costs = zip(*graph_dict['arcs'])
+        graph = CSRGraph.from_arcs(
+            graph_dict['num_nodes'], array('q', tails), array('q', heads), array('d', costs)
+        )
+
+        # A low witness limit adds superfluous shortcuts, which must not
+        # affect the queries' results
+        for witness_limit in (500, 2):
+            ch = ContractionHierarchy.build(graph, witness_limit)
+
+            rng = random.Random(1)
+            for _ in range(50):
+                src, dest = rng.sample(range(graph.num_nodes), 2)
+                path = dijkstra_ch(graph, src, dest, ch)
+
+                self.assertEqual( (path[0], path[-1]), (src, dest) )
+                self.assertEqual(
+                    path_cost(graph, path),
+                    path_cost(graph, dijkstra_fwd(graph, src, dest))
+                )
+
+                # The shortcuts cost more than Dial's buckets can hold
+                self.assertEqual(dijkstra_ch(graph, src, dest, ch, queue='dial'), path)
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'graph.ch')
+            with open(filename, 'wb') as f:
+                self.ch.save(f)
+
+            loaded_ch = ContractionHierarchy.load(filename)
+            for name in ContractionHierarchy.__slots__:
+                self.assertEqual(getattr(loaded_ch, name), getattr(self.ch, name))
+
+            self.assertEqual(list(dijkstra_ch(self.graph, 0, 5, loaded_ch)), [0, 1, 4, 5])
+
+            # Truncated file
+            with open(filename, 'r+b') as f:
+                f.truncate(HEADER_SIZE + 8)
+            with self.assertRaises(InvalidSnapshotError):
+                ContractionHierarchy.load(filename)
+
+            # Not a contraction hierarchy
+            with open(filename, 'wb') as f:
+                f.write(b'{"num_nodes": 3}'.ljust(HEADER_SIZE))
+            with self.assertRaises(InvalidSnapshotError) as context_manager:
+                ContractionHierarchy.load(filename)
+            self.assertEqual(context_manager.exception.details, "Not a contraction hierarchy")
+
+
+if __name__ == '__main__':
+    unittest.main()
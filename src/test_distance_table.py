@@ -0,0 +1,84 @@
+import unittest, random
+from array import array
+from io import StringIO
+
+from graph import Graph
+from csr_graph import CSRGraph
+from contraction import ContractionHierarchy
+from distance_table import distance_table
+from heuristics import shortest_distances
+from grid_graph_gen import grid_graph_gen
+from test_algorithms import graph_valid
+
+inf = float('+inf')
+
+
+class TestDistanceTable(unittest.TestCase):
+    def setUp(self):
+        with StringIO(graph_valid) as f:
+            self.graph = Graph(f)
+
+    def test_distances(self):
+        table = distance_table(self.graph, [0, 2, 5], [5, 3, 0, 2])
+
+        self.assertEqual(table.shape, (3, 4))
+        self.assertEqual(table.tolist(), [
+            [6, 6, 0, 3],
+            [5, 6, inf, 0],
+            [0, inf, inf, inf],
+        ])
+        self.assertEqual(table[1, 0], 5)
+
+    def test_contraction_hierarchy(self):
+        ch = ContractionHierarchy.build(self.graph)
+        nodes = list(range(self.graph.num_nodes))
+
+        self.assertEqual(
+            distance_table(self.graph, nodes, nodes, ch).tolist(),
+            distance_table(self.graph, nodes, nodes).tolist()
+        )
+
+    def test_grid(self):
+        random.seed(0)
+        graph_dict = grid_graph_gen(8, 20)
+        tails, heads, costs = zip(*graph_dict['arcs'])
+        graph = CSRGraph.from_arcs(
+            graph_dict['num_nodes'], array('q', tails), array('q', heads), array('d', costs)
+        )
+        ch = ContractionHierarchy.build(graph)
+
+        rng = random.Random(1)
+        sources = rng.sample(range(graph.num_nodes), 5)
+        targets = rng.sample(range(graph.num_nodes), 7)
+
+        for table in (
+            distance_table(graph, sources, targets),
+            distance_table(graph, sources, targets, ch, queue='set')):
+
+            for row, src in enumerate(sources):
+                dist = shortest_distances(graph, src)
+                self.assertEqual(list(table.row(row)), [dist[dest] for dest in targets])
+
+    def test_integer_queues(self):
+        ch = ContractionHierarchy.build(self.graph)
+        nodes = list(range(self.graph.num_nodes))
+        expected = distance_table(self.graph, nodes, nodes).tolist()
+
+        for queue in ('dial', 'radix', 'auto'):
+            self.assertEqual(distance_table(self.graph, nodes, nodes, queue=queue).tolist(), expected)
+            self.assertEqual(distance_table(self.graph, nodes, nodes, ch, queue).tolist(), expected)
+
+    def test_invalid_nodes(self):
+        with self.assertRaises(KeyError):
+            distance_table(self.graph, [0, 6], [1])
+        with self.assertRaises(KeyError):
+            distance_table(self.graph, [0], [-1])
+
+    def test_empty(self):
+        table = distance_table(self.graph, [0, 1], [])
+        self.assertEqual(table.shape, (2, 0))
+        self.assertEqual(table.tolist(), [[], []])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from io import StringIO
+
+from graph import Graph
+from graph_deltas import read_deltas, apply_deltas
+from algorithms import dijkstra_fwd, dijkstra_rev, dijkstra_bidir
+from exceptions import InvalidArcError, DuplicateArcError
+from test_algorithms import graph_valid
+
+
+class TestGraphUpdates(unittest.TestCase):
+    def setUp(self):
+        with StringIO(graph_valid) as f:
+            self.graph = Graph(f)
+
+    def checkArcs(self, tail:int, head:int, cost):
+        """
+        Checks that the arc (tail, head) is in both adjacency lists with the
+        specified cost, or in neither of them if cost is None.
+        """
+        out_costs = [arc.cost for arc in self.graph.out_arcs(tail) if arc.head == head]
+        in_costs = [arc.cost for arc in self.graph.in_arcs(head) if arc.tail == tail]
+
+        expected = [] if cost is None else [cost]
+        self.assertEqual(out_costs, expected)
+        self.assertEqual(in_costs, expected)
+
+    def test_update_arc_cost(self):
+        self.graph.update_arc_cost(1, 4, 10)
+        self.checkArcs(1, 4, 10)
+
+        for dijkstra_func in (dijkstra_fwd, dijkstra_rev, dijkstra_bidir):
+            self.assertEqual(list(dijkstra_func(self.graph, 0, 5)), [0, 1, 3, 5])
+
+    def test_add_arc(self):
+        self.graph.add_arc(0, 5, 1)
+        self.checkArcs(0, 5, 1)
+        self.assertEqual(list(dijkstra_fwd(self.graph, 0, 5)), [0, 5])
+
+    def test_remove_arc(self):
+        self.assertEqual(self.graph.remove_arc(4, 5), 2)
+        self.checkArcs(4, 5, None)
+        self.assertEqual(list(dijkstra_fwd(self.graph, 0, 5)), [0, 1, 3, 5])
+
+        # The arc can be added back
+        self.graph.add_arc(4, 5, 2)
+        self.checkArcs(4, 5, 2)
+
+    def test_version(self):
+        version = self.graph.version
+
+        self.graph.update_arc_cost(1, 4, 10)
+        self.graph.add_arc(0, 5, 1)
+        self.graph.remove_arc(0, 5)
+
+        self.assertEqual(self.graph.version, version + 3)
+
+    def test_invalid_updates(self):
+        with self.assertRaises(DuplicateArcError):
+            self.graph.add_arc(0, 1, 5)
+        with self.assertRaises(InvalidArcError):
+            self.graph.add_arc(0, 6, 5)
+        with self.assertRaises(InvalidArcError):
+            self.graph.add_arc(0, 0, 5)
+        with self.assertRaises(InvalidArcError):
+            self.graph.update_arc_cost(0, 1, -1)
+        with self.assertRaises(KeyError):
+            self.graph.update_arc_cost(1, 0, 1)
+        with self.assertRaises(KeyError):
+            self.graph.remove_arc(0, 6)
+
+        # Nothing changed
+        self.assertEqual(self.graph.version, 0)
+        self.checkArcs(0, 1, 2)
+
+
+class TestDeltas(unittest.TestCase):
+    def setUp(self):
+        with StringIO(graph_valid) as f:
+            self.graph = Graph(f)
+
+    def test_apply_deltas(self):
+        deltas = (
+            "# Traffic update\n"
+            "set 1 4 10\n"
+            "\n"
+            "add 0,5,20.5\n"
+            "del 4 5\n"
+        )
+        with StringIO(deltas) as f:
+            self.assertEqual(apply_deltas(self.graph, read_deltas(f)), 3)
+
+        self.assertEqual(list(dijkstra_fwd(self.graph, 0, 5)), [0, 1, 3, 5])
+        self.assertEqual([arc.cost for arc in self.graph.out_arcs(0)], [2, 4, 20.5])
+
+    def test_invalid_lines(self):
+        for line in ("set 1 4", "del 1 4 5", "move 1 4 5", "add 1 x 5"):
+            with StringIO(f"set 0 1 3\n{line}\n") as f:
+                with self.assertRaises(ValueError) as context_manager:
+                    list(read_deltas(f))
+
+                self.assertTrue(str(context_manager.exception).startswith("Line 2:"))
+
+
+if __name__ == '__main__':
+    unittest.main()
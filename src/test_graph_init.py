@@ -2,6 +2,7 @@ import unittest
 from io import StringIO
 
 from graph import Graph
+from csr_graph import CSRGraph
 from arc_node import Arc
 from exceptions import InvalidArcError, DuplicateArcError
 
@@ -73,13 +74,29 @@ graph_loopbackArc = """
 }
 """
 
+# Several offending arcs: the first one (the loopback) must be reported
+graph_severalInvalidArcs = """
+{
+    "num_nodes": 3,
+    "arcs": [
+        [0, 1, 2],
+        [2, 2, 4],
+        [0, 1, 3],
+        [1, 5, 100],
+        [1, 2, -1]
+    ]
+}
+"""
+
 
 class TestDijkstraGraphValidation(unittest.TestCase):
+    graph_class = Graph
+
     def checkIfRaises(self, graph_json:str, exception):
         """Helper function for test methods, to reduce cluttering."""
         with StringIO(graph_json) as f:
             with self.assertRaises(exception) as context_manager:
-                graph = Graph(f)
+                graph = self.graph_class(f)
         
         return context_manager.exception
 
@@ -108,6 +125,53 @@ class TestDijkstraGraphValidation(unittest.TestCase):
         self.assertEqual(exc.arc, Arc(1, 1, 100))
         self.assertEqual(exc.details, "Loopback arc: tail is equal to head")
 
+    def test_first_offending_arc(self):
+        exc = self.checkIfRaises(graph_severalInvalidArcs, InvalidArcError)
+        self.assertEqual(exc.arc, Arc(2, 2, 4))
+
+    def test_trusted(self):
+        # No validation at all: the arcs are taken as they are
+        with StringIO(graph_duplicateArc) as f:
+            graph = self.graph_class(f, trusted=True)
+
+        self.assertEqual(len(list(graph.out_arcs(0))), 3)
+
+
+class TestDijkstraCSRGraphValidation(TestDijkstraGraphValidation):
+    graph_class = CSRGraph
+
+
+graph_valid = """
+{
+    "num_nodes": 4,
+    "arcs": [
+        [0, 1, 2],
+        [2, 1, 1.5],
+        [0, 2, 4],
+        [1, 3, 3],
+        [2, 3, 7]
+    ]
+}
+"""
+
+class TestCSRGraphAdjacency(unittest.TestCase):
+    def test_same_arcs_as_graph(self):
+        with StringIO(graph_valid) as f:
+            graph = Graph(f)
+        with StringIO(graph_valid) as f:
+            csr_graph = CSRGraph(f)
+
+        self.assertEqual(csr_graph.num_nodes, graph.num_nodes)
+        self.assertEqual(csr_graph.num_arcs, 5)
+
+        for node in range(graph.num_nodes):
+            self.assertEqual(
+                list(csr_graph.out_arcs(node)), list(graph.out_arcs(node))
+            )
+            self.assertEqual(
+                list(csr_graph.in_arcs(node)), list(graph.in_arcs(node))
+            )
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
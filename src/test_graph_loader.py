@@ -0,0 +1,94 @@
+import unittest, json, gzip, os, tempfile
+from io import StringIO
+
+from graph_loader import GraphJSONReader, open_graph_file
+from arc_node import Arc
+from grid_graph_gen import grid_graph_gen
+
+
+graph_reversedFields = """
+{
+    "arcs": [[0, 1, 2], [1, 2, 0.5], [2, 0, 1e2]],
+    "comment": {"nested": [1, 2, 3]},
+    "num_nodes": 3
+}
+"""
+
+graph_missingArcs = """
+{
+    "num_nodes": 3
+}
+"""
+
+graph_malformed = """
+{
+    "num_nodes": 3,
+    "arcs": [[0, 1, 2] [1, 2, 3]]
+}
+"""
+
+
+def read_graph(graph_json:str, chunk_size:int=1 << 20, progress=None) -> tuple:
+    """Helper function for test methods, to reduce cluttering."""
+    with StringIO(graph_json) as f:
+        reader = GraphJSONReader(f, progress, chunk_size)
+        num_nodes = reader.read_num_nodes()
+        arcs = list(reader.read_arcs())
+
+    return (num_nodes, arcs)
+
+
+class TestGraphJSONReader(unittest.TestCase):
+    def setUp(self):
+        self.graph_dict = grid_graph_gen(10, 20)
+        self.graph_json = json.dumps(self.graph_dict, indent=1)
+        self.expected_arcs = [Arc(*arc) for arc in self.graph_dict['arcs']]
+
+    def test_same_as_json_load(self):
+        num_nodes, arcs = read_graph(self.graph_json)
+        self.assertEqual(num_nodes, self.graph_dict['num_nodes'])
+        self.assertEqual(arcs, self.expected_arcs)
+
+    def test_small_chunks(self):
+        # Every token ends up split between two chunks
+        for chunk_size in (1, 2, 7):
+            num_nodes, arcs = read_graph(self.graph_json, chunk_size)
+            self.assertEqual(num_nodes, self.graph_dict['num_nodes'])
+            self.assertEqual(arcs, self.expected_arcs)
+
+    def test_reversed_fields(self):
+        num_nodes, arcs = read_graph(graph_reversedFields, 4)
+        self.assertEqual(num_nodes, 3)
+        self.assertEqual(arcs, [Arc(0, 1, 2), Arc(1, 2, 0.5), Arc(2, 0, 100.0)])
+        self.assertIsInstance(arcs[0].cost, int)
+
+    def test_progress(self):
+        progress_calls = list()
+        read_graph(self.graph_json, progress=progress_calls.append)
+        self.assertEqual(progress_calls[-1], len(self.expected_arcs))
+
+    def test_missing_arcs(self):
+        with self.assertRaises(KeyError):
+            read_graph(graph_missingArcs)
+
+    def test_malformed(self):
+        with self.assertRaises(json.JSONDecodeError):
+            read_graph(graph_malformed)
+
+    def test_gzip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'graph.json.gz')
+            with gzip.open(filename, 'wt') as f:
+                f.write(self.graph_json)
+
+            with open_graph_file(filename) as f:
+                reader = GraphJSONReader(f)
+                num_nodes = reader.read_num_nodes()
+                arcs = list(reader.read_arcs())
+
+        self.assertEqual(num_nodes, self.graph_dict['num_nodes'])
+        self.assertEqual(arcs, self.expected_arcs)
+
+
+if __name__ == '__main__':
+    unittest.main()
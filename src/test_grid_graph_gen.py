@@ -0,0 +1,81 @@
+import unittest, os, tempfile
+from io import StringIO
+
+from graph import Graph
+from snapshot import open_snapshot
+from grid_graph_gen import (
+    generate_graph, grid_graph_gen, write_json, write_binary, TOPOLOGIES
+)
+
+
+def generate_json(topology:str, size:int, max_cost:int, seed:int=0) -> str:
+    """Helper function for test methods, to reduce cluttering."""
+    num_nodes, batches, extra_fields = generate_graph(topology, size, max_cost, seed)
+
+    with StringIO() as f:
+        write_json(f, num_nodes, batches, extra_fields)
+        return f.getvalue()
+
+
+class TestGraphGenerators(unittest.TestCase):
+    def test_valid_graphs(self):
+        # Building the graphs validates their arcs as well
+        for topology in TOPOLOGIES:
+            with StringIO(generate_json(topology, 20, 50)) as f:
+                graph = Graph(f)
+
+            arcs = [arc for node in graph.nodes for arc in node.out_arcs]
+            self.assertTrue(arcs)
+            self.assertTrue(all(0 <= arc.cost <= 50 for arc in arcs))
+
+            # Every arc has its opposite one
+            arc_pairs = {(arc.tail, arc.head) for arc in arcs}
+            self.assertEqual(arc_pairs, {(head, tail) for tail, head in arc_pairs})
+
+    def test_num_arcs(self):
+        side = 7
+        for topology, num_arcs in (
+            ('grid4', 4 * side * (side - 1)),
+            ('grid8', 4 * side * (side - 1) + 4 * (side - 1) ** 2)):
+
+            num_nodes, batches, _ = generate_graph(topology, side, 10)
+            self.assertEqual(num_nodes, side * side)
+            self.assertEqual(sum(len(tails) for tails, _, _ in batches), num_arcs)
+
+    def test_seed(self):
+        for topology in TOPOLOGIES:
+            self.assertEqual(generate_json(topology, 15, 9, 1), generate_json(topology, 15, 9, 1))
+            self.assertNotEqual(generate_json(topology, 15, 9, 1), generate_json(topology, 15, 9, 2))
+
+    def test_grid_graph_gen(self):
+        graph_dict = grid_graph_gen(5, 20, seed=3)
+        self.assertEqual(graph_dict['num_nodes'], 25)
+        self.assertEqual(graph_dict, grid_graph_gen(5, 20, seed=3))
+
+        with StringIO(generate_json('grid4', 5, 20, 3)) as f:
+            graph = Graph(f)
+
+        self.assertEqual(
+            sorted(tuple(arc) for node in graph.nodes for arc in node.out_arcs),
+            sorted(graph_dict['arcs'])
+        )
+
+    def test_binary(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'grid.snap')
+
+            num_nodes, batches, _ = generate_graph('grid8', 6, 10, 0)
+            with open(filename, 'wb') as f:
+                write_binary(f, num_nodes, batches)
+
+            graph = open_snapshot(filename)
+            self.assertEqual(graph.num_nodes, 36)
+            self.assertEqual(graph.num_arcs, 4 * 6 * 5 + 4 * 5 * 5)
+
+    def test_unknown_topology(self):
+        with self.assertRaises(ValueError):
+            generate_graph('torus', 5, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
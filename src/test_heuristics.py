@@ -0,0 +1,111 @@
+import unittest, random
+from array import array
+
+from csr_graph import CSRGraph
+from algorithms import dijkstra_fwd, astar
+from heuristics import (
+    GridHeuristic, CoordinateHeuristic, LandmarkHeuristic, shortest_distances
+)
+from grid_graph_gen import grid_graph_gen
+
+
+def path_cost(graph:CSRGraph, path) -> float:
+    """Helper function for test methods, to reduce cluttering."""
+    path = list(path)
+    return sum(
+        next(cost for _, head, cost in graph.out_arcs(tail) if head == next_node)
+        for tail, next_node in zip(path, path[1:])
+    )
+
+
+class TestHeuristics(unittest.TestCase):
+    num_side_nodes = 12
+
+    def setUp(self):
+        random.seed(0)
+        graph_dict = grid_graph_gen(self.num_side_nodes, 20)
+
+        # Strictly positive costs, so that the grid heuristic isn't null
+        tails, heads, costs = zip(*graph_dict['arcs'])
+        self.graph = CSRGraph.from_arcs(
+            graph_dict['num_nodes'],
+            array('q', tails),
+            array('q', heads),
+            array('d', (cost + 1 for cost in costs))
+        )
+
+        rng = random.Random(1)
+        self.queries = [
+            tuple(rng.sample(range(self.graph.num_nodes), 2)) for _ in range(30)
+        ]
+
+    def checkHeuristic(self, heuristic):
+        """
+        Checks that the heuristic never overestimates a distance, and that
+        A* finds optimal paths with it.
+        """
+        for src, dest in self.queries:
+            dist = shortest_distances(self.graph, dest, reverse=True)
+            for node in range(self.graph.num_nodes):
+                self.assertLessEqual(heuristic(node, dest), dist[node])
+
+            self.assertEqual(
+                path_cost(self.graph, astar(self.graph, src, dest, heuristic)),
+                path_cost(self.graph, dijkstra_fwd(self.graph, src, dest))
+            )
+
+    def test_grid(self):
+        heuristic = GridHeuristic(self.graph, self.num_side_nodes)
+        self.assertEqual(heuristic.scale, 1)
+        self.checkHeuristic(heuristic)
+
+    def test_grid_wrong_side(self):
+        with self.assertRaises(ValueError):
+            GridHeuristic(self.graph, self.num_side_nodes + 1)
+
+    def test_coordinates(self):
+        x = array('d', (node % self.num_side_nodes for node in range(self.graph.num_nodes)))
+        y = array('d', (node // self.num_side_nodes for node in range(self.graph.num_nodes)))
+
+        for metric in CoordinateHeuristic.METRICS:
+            self.checkHeuristic(CoordinateHeuristic(x, y, 1, metric))
+
+    def test_landmarks(self):
+        heuristic = LandmarkHeuristic(self.graph, 4, seed=0)
+        self.assertEqual(len(set(heuristic.landmarks)), 4)
+        self.checkHeuristic(heuristic)
+
+    def test_integer_queues(self):
+        x = array('d', (node % self.num_side_nodes for node in range(self.graph.num_nodes)))
+        y = array('d', (node // self.num_side_nodes for node in range(self.graph.num_nodes)))
+
+        # The euclidean estimates aren't integers
+        heuristics = (
+            GridHeuristic(self.graph, self.num_side_nodes),
+            LandmarkHeuristic(self.graph, 4, seed=0),
+            CoordinateHeuristic(x, y, 1, 'euclidean'),
+        )
+
+        for heuristic in heuristics:
+            for src, dest in self.queries:
+                expected = path_cost(self.graph, dijkstra_fwd(self.graph, src, dest))
+
+                for queue in ('dial', 'radix', 'auto'):
+                    path = astar(self.graph, src, dest, heuristic, queue=queue)
+                    self.assertEqual( (path[0], path[-1]), (src, dest) )
+                    self.assertEqual(path_cost(self.graph, path), expected)
+
+    def test_fewer_settled_nodes(self):
+        heuristic = LandmarkHeuristic(self.graph, 4, seed=0)
+        src, dest = 0, self.graph.num_nodes - 1
+
+        state = self.graph.new_state()
+        dijkstra_fwd(self.graph, src, dest, state=state)
+        dijkstra_perm_nodes = len(state.perm_fwd)
+
+        astar(self.graph, src, dest, heuristic, state=state)
+        self.assertLess(len(state.perm_fwd), dijkstra_perm_nodes)
+
+
+if __name__ == '__main__':
+    unittest.main()
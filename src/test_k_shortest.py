@@ -0,0 +1,119 @@
+import unittest
+from io import StringIO
+from collections import deque
+
+from graph import Graph
+from csr_graph import CSRGraph
+from algorithms import dijkstra_fwd
+from k_shortest import k_shortest_paths
+from grid_graph_gen import generate_graph, arc_arrays
+from exceptions import NoDirectedPathError
+from test_algorithms import graph_valid
+from test_heuristics import path_cost
+
+
+def all_simple_paths(graph, src:int, dest:int) -> list:
+    """Helper function enumerating every loopless path from src to dest, by brute force."""
+    paths = list()
+    path = [src]
+
+    def visit(node:int):
+        for _, head, _ in graph.out_arcs(node):
+            if head == dest:
+                paths.append(path + [dest])
+            elif head not in path:
+                path.append(head)
+                visit(head)
+                path.pop()
+
+    visit(src)
+    return paths
+
+
+class TestKShortestPaths(unittest.TestCase):
+    graph_class = Graph
+
+    def setUp(self):
+        with StringIO(graph_valid) as f:
+            self.graph = self.graph_class(f)
+
+    def check_paths(self, graph, src:int, dest:int, k:int, **kwargs):
+        expected_costs = sorted(
+            path_cost(graph, path) for path in all_simple_paths(graph, src, dest)
+        )[:k]
+
+        results = k_shortest_paths(graph, src, dest, k, **kwargs)
+
+        self.assertEqual([cost for cost, _ in results], expected_costs)
+
+        for cost, path in results:
+            self.assertIsInstance(path, deque)
+            self.assertEqual( (path[0], path[-1]), (src, dest) )
+            self.assertEqual(len(set(path)), len(path))
+            self.assertEqual(cost, path_cost(graph, path))
+
+        self.assertEqual(len({tuple(path) for _, path in results}), len(results))
+
+        return results
+
+    def test_valid_graph(self):
+        results = self.check_paths(self.graph, 0, 5, 10)
+
+        # The graph has exactly 7 loopless paths from 0 to 5
+        self.assertEqual(len(results), 7)
+        self.assertEqual(results[0][1], dijkstra_fwd(self.graph, 0, 5))
+        self.assertEqual(results[0][0], 6)
+
+    def test_all_pairs(self):
+        for src in range(self.graph.num_nodes):
+            for dest in range(self.graph.num_nodes):
+                if src != dest and all_simple_paths(self.graph, src, dest):
+                    self.check_paths(self.graph, src, dest, 4)
+
+    def test_single_path(self):
+        self.assertEqual(k_shortest_paths(self.graph, 3, 5, 3), [(2, deque([3, 5]))])
+
+    def test_grid(self):
+        num_nodes, batches, _ = generate_graph('grid4', 4, 20, seed=0)
+        graph = CSRGraph.from_arcs(num_nodes, *arc_arrays(batches))
+
+        self.check_paths(graph, 0, 15, 25)
+        self.check_paths(graph, 5, 10, 25)
+
+    def test_queues(self):
+        num_nodes, batches, _ = generate_graph('grid4', 4, 20, seed=1)
+        graph = CSRGraph.from_arcs(num_nodes, *arc_arrays(batches))
+
+        for queue in ('set', 'dial', 'radix', 'auto'):
+            self.check_paths(graph, 0, 15, 10, queue=queue)
+
+    def test_reused_state(self):
+        state = self.graph.new_state()
+
+        self.assertEqual(
+            k_shortest_paths(self.graph, 0, 5, 3, state=state),
+            k_shortest_paths(self.graph, 0, 5, 3)
+        )
+        self.assertEqual(dijkstra_fwd(self.graph, 0, 4, state=state), deque([0, 1, 4]))
+
+    def test_no_path(self):
+        with self.assertRaises(NoDirectedPathError):
+            k_shortest_paths(self.graph, 5, 0, 3)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            k_shortest_paths(self.graph, 0, 5, 0)
+
+        with self.assertRaises(ValueError):
+            k_shortest_paths(self.graph, 0, 0, 3)
+
+        with self.assertRaises(KeyError):
+            k_shortest_paths(self.graph, 0, self.graph.num_nodes, 3)
+
+
+class TestKShortestPathsCSR(TestKShortestPaths):
+    graph_class = CSRGraph
+
+
+if __name__ == '__main__':
+    unittest.main()
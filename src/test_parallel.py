@@ -0,0 +1,57 @@
+import unittest, os, tempfile
+from io import StringIO
+
+from csr_graph import CSRGraph
+from snapshot import write_snapshot
+from parallel import ParallelQueryExecutor
+from queries import run_query
+from test_algorithms import graph_valid
+
+
+queries = [(0, 5), (0, 2), (2, 3), (5, 0), (0, 100), (1, 5), (4, 3)]
+
+
+class TestParallelQueryExecutor(unittest.TestCase):
+    def setUp(self):
+        with StringIO(graph_valid) as f:
+            self.graph = CSRGraph(f)
+
+        self.expected = [
+            run_query(self.graph, src, dest, ['heap']) for src, dest in queries
+        ]
+
+    def checkResults(self, results:list):
+        """Helper function for test methods, to reduce cluttering."""
+        self.assertEqual(len(results), len(self.expected))
+
+        for result, expected in zip(results, self.expected):
+            self.assertEqual(result.src, expected.src)
+            self.assertEqual(result.dest, expected.dest)
+            self.assertEqual(result.path, expected.path)
+            self.assertEqual(result.error, expected.error)
+            self.assertEqual(result.perm_nodes, expected.perm_nodes)
+
+    def test_shared_graph(self):
+        with ParallelQueryExecutor(self.graph, 2) as executor:
+            results = list(executor.map(iter(queries), ['heap'], chunksize=2))
+
+        self.checkResults(results)
+
+    def test_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'graph.snap')
+            with open(filename, 'wb') as f:
+                write_snapshot(self.graph, f)
+
+            with ParallelQueryExecutor(processes=2, snapshot_filename=filename) as executor:
+                results = list(executor.map(queries, ['heap']))
+
+        self.checkResults(results)
+
+    def test_missing_graph(self):
+        with self.assertRaises(ValueError):
+            ParallelQueryExecutor()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest, os, random, tempfile
+from io import StringIO
+from collections import deque
+
+from csr_graph import CSRGraph
+from snapshot import write_snapshot
+from algorithms import dijkstra_fwd
+from parallel_bidir import ParallelBidirSearch
+from grid_graph_gen import grid_arcs, arc_arrays
+from exceptions import NoDirectedPathError
+from test_algorithms import graph_valid
+from test_heuristics import path_cost
+
+
+class TestParallelBidirSearch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with StringIO(graph_valid) as f:
+            cls.graph = CSRGraph(f)
+
+        # The worker processes are shared by all the tests
+        cls.search = ParallelBidirSearch(cls.graph)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.search.close()
+
+    def test_optimal_paths(self):
+        for queue in ('heap', 'set', 'dial', 'radix'):
+            self.assertEqual(self.search.path(0, 5, queue), deque([0, 1, 4, 5]))
+            self.assertEqual(self.search.path(0, 2, queue), deque([0, 1, 2]))
+            self.assertEqual(self.search.path(2, 3, queue), deque([2, 4, 3]))
+
+    def test_unreachable_dest(self):
+        for src, dest in ( (5, 0), (3, 2), (4, 1) ):
+            with self.assertRaises(NoDirectedPathError) as context_manager:
+                self.search.path(src, dest)
+
+            self.assertEqual(context_manager.exception.src, src)
+            self.assertEqual(context_manager.exception.dest, dest)
+
+        # The workers are still usable after a failed query
+        self.assertEqual(self.search.path(0, 5), deque([0, 1, 4, 5]))
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(KeyError):
+            self.search.path(100, 1)
+
+        with self.assertRaises(ValueError):
+            self.search.path(1, 1)
+
+        with self.assertRaises(ValueError):
+            self.search.path(0, 5, queue='foo')
+
+        with self.assertRaises(ValueError):
+            ParallelBidirSearch()
+
+    def test_grid(self):
+        graph = CSRGraph.from_arcs(400, *arc_arrays(grid_arcs(20, 20, random.Random(0))))
+        rng = random.Random(1)
+
+        with ParallelBidirSearch(graph) as search:
+            for _ in range(30):
+                src, dest = rng.sample(range(graph.num_nodes), 2)
+                path = search.path(src, dest)
+
+                self.assertEqual( (path[0], path[-1]), (src, dest) )
+                self.assertEqual(
+                    path_cost(graph, path),
+                    path_cost(graph, dijkstra_fwd(graph, src, dest))
+                )
+                self.assertGreater(sum(search.num_settled), 0)
+
+    def test_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'graph.snap')
+            with open(filename, 'wb') as f:
+                write_snapshot(self.graph, f)
+
+            with ParallelBidirSearch(snapshot_filename=filename) as search:
+                self.assertEqual(search.path(0, 5), deque([0, 1, 4, 5]))
+
+
+if __name__ == '__main__':
+    unittest.main()
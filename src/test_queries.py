@@ -0,0 +1,95 @@
+import unittest, json
+from io import StringIO
+from array import array
+
+from graph import Graph
+from csr_graph import CSRGraph
+from queries import (
+    ALGORITHMS, run_query, read_queries, QueryResultWriter, QueryStats, percentile
+)
+from test_algorithms import graph_valid
+
+
+class TestQueries(unittest.TestCase):
+    def setUp(self):
+        with StringIO(graph_valid) as f:
+            self.graph = Graph(f)
+
+    def test_read_queries(self):
+        with StringIO("0 5\n\n# comment\n 2,3 \n") as f:
+            self.assertEqual(list(read_queries(f)), [(0, 5), (2, 3)])
+
+        with StringIO("0 5\n1 2 3\n") as f:
+            with self.assertRaises(ValueError):
+                list(read_queries(f))
+
+    def test_run_query(self):
+        result = run_query(self.graph, 0, 5, ['heap', 'set'])
+        self.assertEqual(result.path, [0, 1, 4, 5])
+        self.assertIsNone(result.error)
+        self.assertEqual(len(result.perf_times), 2 * len(ALGORITHMS))
+        self.assertEqual(result.perm_nodes['heap', 'Forward'], 6)
+
+    def test_run_query_errors(self):
+        result = run_query(self.graph, 5, 0, ['heap'])
+        self.assertIsNone(result.path)
+        self.assertEqual(result.error, "No directed path from 5 to 0")
+        self.assertEqual(len(result.perf_times), len(ALGORITHMS))
+
+        result = run_query(self.graph, 0, 100, ['heap'])
+        self.assertIsNone(result.path)
+        self.assertIsNotNone(result.error)
+        self.assertEqual(result.perf_times, dict())
+
+    def test_run_query_queue_errors(self):
+        result = run_query(self.graph, 0, 5, ['heap', 'dial', 'auto'])
+        self.assertEqual(result.path, [0, 1, 4, 5])
+        self.assertEqual(len(result.perf_times), 3 * len(ALGORITHMS))
+
+        # The invalid queue isn't mistaken for an invalid pair
+        graph = CSRGraph.from_arcs(3, array('q', [0, 1]), array('q', [1, 2]), array('d', [0.5, 1]))
+        with self.assertRaises(ValueError):
+            run_query(graph, 0, 2, ['heap', 'dial'])
+
+        result = run_query(graph, 0, 0, ['dial'])
+        self.assertIsNotNone(result.error)
+        self.assertEqual(result.perf_times, dict())
+
+    def test_writer_jsonl(self):
+        with StringIO() as f:
+            writer = QueryResultWriter(f, 'jsonl', ['heap'])
+            writer.write(run_query(self.graph, 0, 5, ['heap']))
+            record = json.loads(f.getvalue())
+
+        self.assertEqual(record['path'], [0, 1, 4, 5])
+        self.assertEqual(set(record['perm_nodes']), {
+            f'{alg_name}/heap' for alg_name in ALGORITHMS
+        })
+
+    def test_writer_csv(self):
+        with StringIO() as f:
+            writer = QueryResultWriter(f, 'csv', ['heap'])
+            writer.write(run_query(self.graph, 0, 5, ['heap']))
+            lines = f.getvalue().splitlines()
+
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith('0,5,0 1 4 5,,'))
+
+    def test_stats(self):
+        stats = QueryStats()
+        for src, dest in ((0, 5), (0, 2), (2, 3), (5, 0)):
+            stats.add(run_query(self.graph, src, dest, ['heap']))
+
+        self.assertEqual(stats.num_queries, 4)
+        self.assertEqual(len(stats.time_summary('heap', 'Forward')), 3)
+        self.assertIsNone(stats.time_summary('set', 'Forward'))
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.50), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([7], 0.99), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
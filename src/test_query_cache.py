@@ -0,0 +1,95 @@
+import unittest
+from io import StringIO
+from collections import deque
+
+from graph import Graph
+from query_cache import QueryCache
+from algorithms import dijkstra_fwd
+from exceptions import NoDirectedPathError
+from test_algorithms import graph_valid
+
+
+class TestQueryCache(unittest.TestCase):
+    def setUp(self):
+        with StringIO(graph_valid) as f:
+            self.graph = Graph(f)
+
+    def test_paths(self):
+        cache = QueryCache(self.graph)
+
+        for _ in range(2):
+            self.assertEqual(cache.path(0, 5), deque([0, 1, 4, 5]))
+            self.assertEqual(cache.path(2, 3), deque([2, 4, 3]))
+
+        self.assertEqual( (cache.misses, cache.path_hits, cache.tree_hits), (2, 2, 0) )
+        self.assertEqual(cache.hit_rate, 0.5)
+
+    def test_returned_path_is_a_copy(self):
+        cache = QueryCache(self.graph)
+        cache.path(0, 5).clear()
+        self.assertEqual(cache.path(0, 5), deque([0, 1, 4, 5]))
+
+    def test_lru_eviction(self):
+        cache = QueryCache(self.graph, max_paths=2)
+
+        cache.path(0, 5)
+        cache.path(0, 2)
+        cache.path(0, 5)
+        cache.path(2, 3)    # Evicts (0, 2), the least recently used
+
+        self.assertEqual(list(cache.paths), [(0, 5), (2, 3)])
+
+        cache.path(0, 2)
+        self.assertEqual(cache.misses, 4)
+
+    def test_trees(self):
+        cache = QueryCache(self.graph, max_paths=0, max_trees=1)
+
+        for dest in range(1, self.graph.num_nodes):
+            self.assertEqual(cache.path(0, dest), dijkstra_fwd(self.graph, 0, dest))
+
+        self.assertEqual( (cache.misses, cache.tree_hits), (1, 4) )
+
+        # Evicts the tree of node 0
+        cache.path(1, 5)
+        self.assertEqual(list(cache.trees), [1])
+
+    def test_integer_queues(self):
+        for queue in ('dial', 'radix', 'auto'):
+            for max_trees in (0, 1):
+                cache = QueryCache(self.graph, max_paths=0, max_trees=max_trees, queue=queue)
+
+                for dest in range(1, self.graph.num_nodes):
+                    self.assertEqual(cache.path(0, dest), dijkstra_fwd(self.graph, 0, dest))
+
+    def test_unreachable(self):
+        for max_trees in (0, 1):
+            cache = QueryCache(self.graph, max_trees=max_trees)
+
+            for _ in range(2):
+                with self.assertRaises(NoDirectedPathError):
+                    cache.path(5, 0)
+
+            self.assertEqual(cache.path_hits, 1)
+
+    def test_invalid_nodes(self):
+        cache = QueryCache(self.graph)
+        with self.assertRaises(KeyError):
+            cache.path(0, 6)
+        with self.assertRaises(ValueError):
+            cache.path(1, 1)
+
+    def test_invalidation(self):
+        cache = QueryCache(self.graph, max_trees=1)
+        cache.path(0, 5)
+
+        self.graph.mark_modified()
+        cache.path(0, 5)
+
+        self.assertEqual(cache.invalidations, 1)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(cache.stats()['num_paths'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+import unittest, asyncio, json, os, tempfile, threading, time
+from io import StringIO
+from array import array
+
+from csr_graph import CSRGraph
+from snapshot import write_snapshot
+from algorithms import dijkstra_fwd
+from query_server import QueryServer, QueryWorker, parse_request
+from test_algorithms import graph_valid
+
+
+class SlowAlgorithm:
+    """Counts its calls, and delays each one by the specified seconds."""
+    def __init__(self, delay:float):
+        self.delay = delay
+        self.num_calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, graph, src, dest, queue, state):
+        with self.lock:
+            self.num_calls += 1
+
+        time.sleep(self.delay)
+        return dijkstra_fwd(graph, src, dest, queue=queue, state=state)
+
+
+class TestQueryServer(unittest.IsolatedAsyncioTestCase):
+    processes = False
+
+    def setUp(self):
+        with StringIO(graph_valid) as f:
+            self.graph = CSRGraph(f)
+
+    async def start_server(self, **kwargs) -> QueryServer:
+        server = QueryServer(self.graph, processes=self.processes, **kwargs)
+        self.port = await server.start()
+        return server
+
+    async def request(self, *lines) -> list:
+        """Helper function for test methods: sends the lines on a new connection."""
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+
+        responses = list()
+        for line in lines:
+            writer.write(line.encode() + b'\n')
+            await writer.drain()
+            responses.append(json.loads(await reader.readline()))
+
+        writer.close()
+        await writer.wait_closed()
+
+        return responses
+
+    async def test_paths(self):
+        server = await self.start_server()
+        try:
+            responses = await self.request('0 5', '0,2', '2 3')
+        finally:
+            await server.close()
+
+        self.assertEqual(
+            [response['path'] for response in responses],
+            [list(dijkstra_fwd(self.graph, src, dest)) for src, dest in ( (0, 5), (0, 2), (2, 3) )]
+        )
+        self.assertEqual( (responses[0]['src'], responses[0]['dest']), (0, 5) )
+
+    async def test_errors(self):
+        server = await self.start_server()
+        try:
+            no_path, invalid_node, malformed = await self.request('5 0', '0 100', 'zero five')
+        finally:
+            await server.close()
+
+        self.assertEqual(no_path['error'], "No directed path from 5 to 0")
+        self.assertNotIn('path', invalid_node)
+        self.assertIn('100', invalid_node['error'])
+        self.assertIsNone(malformed['src'])
+        self.assertIn('zero five', malformed['error'])
+
+    async def test_concurrent_clients(self):
+        server = await self.start_server(workers=2)
+        try:
+            responses = await asyncio.gather(*(
+                self.request(f'0 {dest}') for dest in range(1, 6)
+            ))
+        finally:
+            await server.close()
+
+        for dest, (response,) in enumerate(responses, start=1):
+            self.assertEqual(response['path'], list(dijkstra_fwd(self.graph, 0, dest)))
+
+
+class TestQueryServerThreads(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        with StringIO(graph_valid) as f:
+            self.graph = CSRGraph(f)
+
+    async def test_coalescing(self):
+        algorithm = SlowAlgorithm(0.2)
+        server = QueryServer(self.graph, algorithm, workers=2)
+
+        try:
+            responses = await asyncio.gather(
+                server.query(0, 5), server.query(0, 5), server.query(0, 4)
+            )
+            # Once finished, the same query runs again
+            await server.query(0, 5)
+        finally:
+            await server.close()
+
+        self.assertEqual(responses[0], responses[1])
+        self.assertEqual(algorithm.num_calls, 3)
+        self.assertEqual(server.num_queries, 4)
+        self.assertEqual(server.num_coalesced, 1)
+        self.assertFalse(server.in_flight)
+
+    async def test_timeout(self):
+        server = QueryServer(self.graph, SlowAlgorithm(0.5), timeout=0.05)
+
+        try:
+            response = await server.query(0, 5)
+        finally:
+            await server.close()
+
+        self.assertNotIn('path', response)
+        self.assertIn('Timed out', response['error'])
+        self.assertEqual(server.num_timeouts, 1)
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            QueryServer()
+
+        with self.assertRaises(ValueError):
+            QueryServer(self.graph, queue='list')
+
+        with self.assertRaises(ValueError):
+            QueryServer(self.graph, timeout=0)
+
+        graph = CSRGraph.from_arcs(3, array('q', [0, 1]), array('q', [1, 2]), array('d', [0.5, 1]))
+        with self.assertRaises(ValueError):
+            QueryServer(graph, queue='radix')
+
+    def test_worker_errors(self):
+        worker = QueryWorker(self.graph, dijkstra_fwd, 'dial')
+        self.assertEqual(worker(0, 5)['path'], [0, 1, 4, 5])
+        self.assertIn('error', worker(0, 0))
+        self.assertIn('error', worker(0, 100))
+
+        # Only the request's errors are reported in the response
+        graph = CSRGraph.from_arcs(3, array('q', [0, 1]), array('q', [1, 2]), array('d', [0.5, 1]))
+        worker = QueryWorker(graph, dijkstra_fwd, 'dial')
+        with self.assertRaises(ValueError):
+            worker(0, 2)
+
+    def test_parse_request(self):
+        self.assertEqual(parse_request('3, 4\n'), (3, 4))
+
+        with self.assertRaises(ValueError):
+            parse_request('3 4 5')
+
+
+class TestQueryServerProcesses(TestQueryServer):
+    processes = True
+
+
+class TestQueryServerSnapshot(TestQueryServer):
+    processes = True
+
+    async def start_server(self, **kwargs) -> QueryServer:
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+
+        filename = os.path.join(tmp_dir.name, 'graph.snap')
+        with open(filename, 'wb') as f:
+            write_snapshot(self.graph, f)
+
+        server = QueryServer(processes=True, snapshot_filename=filename, **kwargs)
+        self.port = await server.start()
+        return server
+
+
+if __name__ == '__main__':
+    unittest.main()
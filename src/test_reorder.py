@@ -0,0 +1,193 @@
+import unittest, random
+from io import StringIO
+from array import array
+from collections import deque
+
+from graph import Graph
+from csr_graph import CSRGraph
+from algorithms import dijkstra_fwd, dijkstra_rev, dijkstra_bidir_mu
+from reorder import (
+    ORDERINGS, NodeMap, bfs_order, hilbert_index, hilbert_order, node_order,
+    reorder_graph, RenumberedAlgorithm
+)
+from grid_graph_gen import generate_graph, arc_arrays
+from exceptions import NoDirectedPathError
+from test_algorithms import graph_valid
+from test_heuristics import path_cost
+
+
+def id_gaps(graph) -> list:
+    """Helper function returning the differences between the IDs of each arc's ends."""
+    return [
+        abs(tail - head)
+        for node in range(graph.num_nodes) for tail, head, _ in graph.out_arcs(node)
+    ]
+
+
+class TestReorder(unittest.TestCase):
+    graph_class = Graph
+
+    def setUp(self):
+        with StringIO(graph_valid) as f:
+            self.graph = self.graph_class(f)
+
+    def test_node_map(self):
+        node_map = NodeMap(array('q', [2, 0, 1]))
+
+        self.assertEqual(list(node_map.old_to_new), [1, 2, 0])
+        self.assertEqual(node_map.path_to_old([0, 1, 2]), deque([2, 0, 1]))
+        self.assertEqual(list(node_map.permute(array('d', [10, 20, 30]))), [30, 10, 20])
+
+        for order in ([0, 0, 1], [0, 1, 3], [-1, 0, 1]):
+            with self.assertRaises(ValueError):
+                NodeMap(array('q', order))
+
+    def test_orders_are_permutations(self):
+        x = array('d', range(self.graph.num_nodes))
+        y = array('d', reversed(range(self.graph.num_nodes)))
+
+        for ordering in ORDERINGS:
+            order = node_order(self.graph, ordering, x, y)
+            self.assertEqual(sorted(order), list(range(self.graph.num_nodes)))
+
+    def test_bfs_order(self):
+        # Node 0 has the lowest degree, and its neighbors are 1 and 2
+        self.assertEqual(list(bfs_order(self.graph)), [0, 1, 2, 3, 4, 5])
+
+        # Node 2 (degree 3) is scanned before node 1 (degree 4), reaching node 4 first
+        self.assertEqual(list(bfs_order(self.graph, by_degree=True)), [0, 2, 1, 4, 3, 5])
+
+    def test_disconnected_components(self):
+        graph = CSRGraph.from_arcs(5, array('q', [3, 1]), array('q', [4, 0]), array('d', [1, 1]))
+        order = bfs_order(graph)
+
+        self.assertEqual(sorted(order), list(range(5)))
+
+        # The isolated node comes first, and each component is contiguous
+        self.assertEqual(order[0], 2)
+        self.assertEqual({order[1], order[2]}, {0, 1})
+        self.assertEqual({order[3], order[4]}, {3, 4})
+
+    def test_hilbert_index(self):
+        num_bits = 4
+        side = 1 << num_bits
+
+        points = {hilbert_index(x, y, num_bits): (x, y) for x in range(side) for y in range(side)}
+        self.assertEqual(sorted(points), list(range(side * side)))
+
+        # Consecutive positions along the curve are adjacent cells
+        for index in range(side * side - 1):
+            (x1, y1), (x2, y2) = points[index], points[index + 1]
+            self.assertEqual(abs(x1 - x2) + abs(y1 - y2), 1)
+
+    def test_hilbert_order(self):
+        x = array('d', [0.5, 0.0, 1.0, 0.0])
+        y = array('d', [0.0, 0.0, 0.0, 1.0])
+
+        # The curve starts from the origin and fills the bottom left quadrant
+        # first, then the top half, and ends in the bottom right quadrant
+        self.assertEqual(list(hilbert_order(x, y, num_bits=2)), [1, 0, 3, 2])
+
+        with self.assertRaises(ValueError):
+            hilbert_order(x, y[:2])
+
+    def test_invalid_orderings(self):
+        with self.assertRaises(ValueError):
+            node_order(self.graph, 'random')
+        with self.assertRaises(ValueError):
+            node_order(self.graph, 'hilbert')
+        with self.assertRaises(ValueError):
+            node_order(self.graph, 'hilbert', array('d', [0]), array('d', [0]))
+        with self.assertRaises(ValueError):
+            reorder_graph(self.graph, array('q', [0, 1]))
+
+    def test_original_ids(self):
+        reordered, node_map = reorder_graph(self.graph, array('q', [5, 3, 1, 0, 4, 2]))
+
+        self.assertIsInstance(reordered, CSRGraph)
+        self.assertEqual(reordered.num_arcs, 9)
+
+        for algorithm in (dijkstra_fwd, dijkstra_rev, dijkstra_bidir_mu):
+            renumbered = RenumberedAlgorithm(algorithm, node_map)
+
+            self.assertEqual(renumbered(reordered, 0, 5), deque([0, 1, 4, 5]))
+            self.assertEqual(renumbered(reordered, 0, 2, queue='set'), deque([0, 1, 2]))
+
+            with self.assertRaises(NoDirectedPathError) as context_manager:
+                renumbered(reordered, 5, 0)
+            self.assertEqual(
+                (context_manager.exception.src, context_manager.exception.dest), (5, 0)
+            )
+
+            with self.assertRaises(KeyError):
+                renumbered(reordered, 0, reordered.num_nodes)
+
+    def test_same_costs(self):
+        num_nodes, batches, extra_fields = generate_graph('geometric', 300, 20, seed=0)
+        graph = CSRGraph.from_arcs(num_nodes, *arc_arrays(batches))
+
+        rng = random.Random(0)
+        queries = [rng.sample(range(num_nodes), 2) for _ in range(20)]
+
+        for ordering in ORDERINGS:
+            order = node_order(graph, ordering, extra_fields['x'], extra_fields['y'])
+            reordered, node_map = reorder_graph(graph, order)
+            renumbered = RenumberedAlgorithm(dijkstra_fwd, node_map)
+
+            for src, dest in queries:
+                try:
+                    expected = path_cost(graph, dijkstra_fwd(graph, src, dest))
+                except NoDirectedPathError:
+                    expected = None
+
+                try:
+                    path = renumbered(reordered, src, dest)
+                except NoDirectedPathError:
+                    self.assertIsNone(expected)
+                else:
+                    self.assertEqual( (path[0], path[-1]), (src, dest) )
+                    self.assertEqual(path_cost(graph, path), expected)
+
+    def test_locality(self):
+        num_side_nodes = 20
+        num_nodes, batches, _ = generate_graph('grid4', num_side_nodes, 20, seed=0)
+        tails, heads, costs = arc_arrays(batches)
+
+        # Shuffled IDs, unrelated to the grid's layout
+        shuffled = list(range(num_nodes))
+        random.Random(0).shuffle(shuffled)
+        graph = CSRGraph.from_arcs(
+            num_nodes,
+            array('q', map(shuffled.__getitem__, tails)),
+            array('q', map(shuffled.__getitem__, heads)),
+            costs
+        )
+
+        x = array('d', [0]) * num_nodes
+        y = array('d', [0]) * num_nodes
+        for node, new_node in enumerate(shuffled):
+            x[new_node] = node % num_side_nodes
+            y[new_node] = node // num_side_nodes
+
+        gaps = id_gaps(graph)
+        self.assertGreater(sum(gaps) / len(gaps), num_nodes / 4)
+
+        # The breadth-first orders keep each arc within a few rows' IDs
+        for ordering in ('bfs', 'cuthill-mckee'):
+            reordered, _ = reorder_graph(graph, node_order(graph, ordering))
+            self.assertLessEqual(max(id_gaps(reordered)), 2 * num_side_nodes)
+
+        # The Hilbert curve jumps between quadrants, but mostly stays local
+        reordered, node_map = reorder_graph(graph, node_order(graph, 'hilbert', x, y))
+        gaps = id_gaps(reordered)
+        self.assertLess(sum(gaps) / len(gaps), num_side_nodes)
+
+        self.assertEqual( (node_map.permute(x)[0], node_map.permute(y)[0]), (0, 0) )
+
+
+class TestReorderCSR(TestReorder):
+    graph_class = CSRGraph
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,249 @@
+import unittest, random
+from io import StringIO
+from array import array
+from functools import partial
+from unittest import mock
+
+from graph import Graph
+from csr_graph import CSRGraph
+from algorithms import dijkstra_fwd, dijkstra_rev, dijkstra_bidir, dijkstra_bidir_mu, astar
+from search_filter import SearchFilter, SettledBudget, FilteredFrontier
+from search_stats import SearchStats
+from frontier import FRONTIERS, make_frontier
+from heuristics import GridHeuristic
+from grid_graph_gen import generate_graph, arc_arrays
+from exceptions import NoDirectedPathError, SearchBudgetError
+from test_algorithms import graph_valid
+from test_heuristics import path_cost
+
+ALGORITHMS = (
+    dijkstra_fwd, dijkstra_rev, dijkstra_bidir, dijkstra_bidir_mu,
+    partial(astar, heuristic=lambda node, dest: 0)
+)
+
+
+class TestSearchFilter(unittest.TestCase):
+    graph_class = Graph
+
+    def setUp(self):
+        with StringIO(graph_valid) as f:
+            self.graph = self.graph_class(f)
+
+    def test_blocked_node(self):
+        search_filter = SearchFilter(self.graph.num_nodes, blocked_nodes=[4])
+
+        for dijkstra_func in ALGORITHMS:
+            path = dijkstra_func(self.graph, 0, 5, search_filter=search_filter)
+            self.assertEqual(list(path), [0, 1, 3, 5])
+
+        # The filter doesn't outlive the query
+        self.assertEqual(list(dijkstra_fwd(self.graph, 0, 5)), [0, 1, 4, 5])
+
+    def test_blocked_arc(self):
+        search_filter = SearchFilter(self.graph.num_nodes, blocked_arcs=[(1, 4), (1, 3)])
+
+        for dijkstra_func in ALGORITHMS:
+            path = dijkstra_func(self.graph, 0, 5, search_filter=search_filter)
+            self.assertEqual(list(path), [0, 1, 2, 4, 5])
+
+    def test_blocked_endpoints(self):
+        for node in (0, 5):
+            search_filter = SearchFilter(self.graph.num_nodes, blocked_nodes=[node])
+
+            for dijkstra_func in ALGORITHMS:
+                with self.assertRaises(NoDirectedPathError):
+                    dijkstra_func(self.graph, 0, 5, search_filter=search_filter)
+
+    def test_block_unblock(self):
+        search_filter = SearchFilter(self.graph.num_nodes)
+        search_filter.block_node(4)
+        search_filter.block_arc(1, 3)
+
+        with self.assertRaises(NoDirectedPathError):
+            dijkstra_fwd(self.graph, 0, 5, search_filter=search_filter)
+
+        search_filter.unblock_arc(1, 3)
+        self.assertEqual(list(dijkstra_fwd(self.graph, 0, 5, search_filter=search_filter)), [0, 1, 3, 5])
+
+        search_filter.unblock_node(4)
+        self.assertEqual(list(dijkstra_fwd(self.graph, 0, 5, search_filter=search_filter)), [0, 1, 4, 5])
+
+    def test_num_blocked_nodes(self):
+        search_filter = SearchFilter(self.graph.num_nodes, blocked_nodes=[4, 1, 4])
+        self.assertEqual(search_filter.num_blocked_nodes, 2)
+
+        search_filter.block_node(1)
+        search_filter.unblock_node(3)
+        self.assertEqual(search_filter.num_blocked_nodes, 2)
+
+        search_filter.unblock_node(4)
+        search_filter.unblock_node(1)
+        self.assertEqual(search_filter.num_blocked_nodes, 0)
+
+        # The mask and the count only change through block_node()/unblock_node()
+        with self.assertRaises(TypeError):
+            search_filter.node_mask[4] = 1
+        with self.assertRaises(AttributeError):
+            search_filter.num_blocked_nodes = 1
+        self.assertEqual(list(search_filter.node_mask), [0] * self.graph.num_nodes)
+
+        # Without blocked nodes nor arcs, the graph isn't wrapped at all
+        state = self.graph.init_state(0, 5)
+        self.assertIs(search_filter.apply(self.graph, state, 0, 5), self.graph)
+
+        search_filter.block_node(4)
+        self.assertIsNot(search_filter.apply(self.graph, state, 0, 5), self.graph)
+
+    def test_max_dist(self):
+        for dijkstra_func in ALGORITHMS:
+            search_filter = SearchFilter(self.graph.num_nodes, max_dist=6)
+            self.assertEqual(
+                dijkstra_func(self.graph, 0, 5, search_filter=search_filter),
+                dijkstra_func(self.graph, 0, 5)
+            )
+
+            search_filter = SearchFilter(self.graph.num_nodes, max_dist=5.5)
+            with self.assertRaises(NoDirectedPathError):
+                dijkstra_func(self.graph, 0, 5, search_filter=search_filter)
+
+            # Combined with a blocked node, the path costs 8
+            search_filter = SearchFilter(self.graph.num_nodes, blocked_nodes=[4], max_dist=7)
+            with self.assertRaises(NoDirectedPathError):
+                dijkstra_func(self.graph, 0, 5, search_filter=search_filter)
+
+    def test_max_dist_stops_early(self):
+        stats = SearchStats()
+        search_filter = SearchFilter(self.graph.num_nodes, max_dist=3)
+
+        with self.assertRaises(NoDirectedPathError):
+            dijkstra_fwd(self.graph, 0, 5, search_filter=search_filter, stats=stats)
+
+        # Only 0, 1 and 2 are within distance 3 from node 0
+        self.assertEqual(stats.total('settled'), 3)
+
+    def test_filtered_frontier(self):
+        for queue in FRONTIERS:
+            frontier = make_frontier(queue, 10)
+            frontier.push(0, 0)
+
+            filtered = FilteredFrontier(frontier, 5, SettledBudget(None, 0, 5))
+            filtered.push(1, 7)
+
+            # The length never looks for the minimum key
+            with mock.patch.object(type(frontier), 'min_key') as min_key:
+                self.assertEqual(len(filtered), 2)
+
+                self.assertEqual(filtered.pop_min(), 0)
+                self.assertEqual(len(filtered), 0)
+
+                # Back within the maximum distance
+                filtered.push(1, 4)
+                self.assertEqual(len(filtered), 1)
+                self.assertEqual(filtered.pop_min(), 1)
+
+                filtered.push(2, 3)
+                filtered.clear()
+                self.assertEqual(len(filtered), 0)
+
+            min_key.assert_not_called()
+
+    def test_max_settled(self):
+        for dijkstra_func in ALGORITHMS:
+            search_filter = SearchFilter(self.graph.num_nodes, max_settled=2)
+            with self.assertRaises(SearchBudgetError) as context_manager:
+                dijkstra_func(self.graph, 0, 5, search_filter=search_filter)
+
+            exception = context_manager.exception
+            self.assertEqual( (exception.src, exception.dest, exception.max_settled), (0, 5, 2) )
+
+            search_filter = SearchFilter(self.graph.num_nodes, max_settled=2 * self.graph.num_nodes)
+            self.assertEqual(
+                dijkstra_func(self.graph, 0, 5, search_filter=search_filter),
+                dijkstra_func(self.graph, 0, 5)
+            )
+
+    def test_reused_state(self):
+        state = self.graph.new_state()
+        search_filter = SearchFilter(self.graph.num_nodes, blocked_nodes=[1], max_dist=4, max_settled=3)
+
+        for dijkstra_func in ALGORITHMS:
+            with self.assertRaises( (NoDirectedPathError, SearchBudgetError) ):
+                dijkstra_func(self.graph, 0, 5, state=state, search_filter=search_filter)
+
+            # The labels beyond the maximum distance must be reset as well
+            self.assertEqual(
+                dijkstra_func(self.graph, 0, 5, state=state),
+                dijkstra_func(self.graph, 0, 5)
+            )
+
+    def test_invalid_filters(self):
+        num_nodes = self.graph.num_nodes
+
+        with self.assertRaises(KeyError):
+            SearchFilter(num_nodes, blocked_nodes=[num_nodes])
+        with self.assertRaises(KeyError):
+            SearchFilter(num_nodes, blocked_arcs=[(0, -1)])
+        with self.assertRaises(ValueError):
+            SearchFilter(num_nodes, max_dist=-1)
+        with self.assertRaises(ValueError):
+            SearchFilter(num_nodes, max_settled=0)
+
+        with self.assertRaises(ValueError):
+            dijkstra_fwd(self.graph, 0, 5, search_filter=SearchFilter(num_nodes + 1))
+
+
+class TestSearchFilterCSR(TestSearchFilter):
+    graph_class = CSRGraph
+
+    def test_same_as_rebuilt_graph(self):
+        num_side_nodes = 12
+        num_nodes, batches, _ = generate_graph('grid4', num_side_nodes, 20, seed=0)
+        tails, heads, costs = arc_arrays(batches)
+        graph = CSRGraph.from_arcs(num_nodes, tails, heads, costs)
+
+        rng = random.Random(0)
+        blocked_nodes = set(rng.sample(range(num_nodes), 15))
+        blocked_arcs = set(rng.sample(list(zip(tails, heads)), 30))
+        search_filter = SearchFilter(num_nodes, blocked_nodes, blocked_arcs)
+
+        # The same graph, without the blocked nodes' arcs and the blocked arcs
+        kept = [
+            index for index, (tail, head) in enumerate(zip(tails, heads))
+            if tail not in blocked_nodes and head not in blocked_nodes
+            and (tail, head) not in blocked_arcs
+        ]
+        rebuilt = CSRGraph.from_arcs(
+            num_nodes,
+            array('q', (tails[index] for index in kept)),
+            array('q', (heads[index] for index in kept)),
+            array('d', (costs[index] for index in kept))
+        )
+
+        algorithms = (*ALGORITHMS, partial(astar, heuristic=GridHeuristic(graph, num_side_nodes)))
+        free_nodes = [node for node in range(num_nodes) if node not in blocked_nodes]
+
+        for _ in range(20):
+            src, dest = rng.sample(free_nodes, 2)
+
+            for dijkstra_func in algorithms:
+                try:
+                    expected = dijkstra_func(rebuilt, src, dest)
+                except NoDirectedPathError:
+                    expected = None
+
+                try:
+                    path = dijkstra_func(graph, src, dest, search_filter=search_filter)
+                except NoDirectedPathError:
+                    path = None
+
+                self.assertEqual(path, expected)
+
+                if path is not None:
+                    max_dist = path_cost(graph, path)
+                    search_filter.max_dist = max_dist
+                    self.assertEqual(dijkstra_func(graph, src, dest, search_filter=search_filter), path)
+                    search_filter.max_dist = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+from io import StringIO
+from functools import partial
+from array import array
+
+from graph import Graph
+from csr_graph import CSRGraph
+from algorithms import dijkstra_fwd, dijkstra_rev, dijkstra_bidir, dijkstra_bidir_mu, astar
+from search_stats import SearchStats, FORWARD, REVERSE
+from search_filter import SearchFilter
+from exceptions import NoDirectedPathError, SearchBudgetError
+from test_algorithms import graph_valid
+
+
+class TestSearchStats(unittest.TestCase):
+    graph_class = Graph
+
+    def setUp(self):
+        with StringIO(graph_valid) as f:
+            self.graph = self.graph_class(f)
+
+    def test_forward_counters(self):
+        stats = SearchStats()
+        dijkstra_fwd(self.graph, 0, 5, stats=stats)
+
+        # Settled in order: 0, 1, 2, 4, 3 (or 5, at the same distance)
+        self.assertEqual(stats.num_queries, 1)
+        self.assertEqual(stats.settled, {FORWARD: 6, REVERSE: 0})
+        self.assertEqual(stats.scanned_arcs[FORWARD], 9)
+        self.assertEqual(stats.relaxed[FORWARD], 6)
+        self.assertEqual(stats.decrease_keys[FORWARD], 1)
+        self.assertEqual(stats.max_queue_size[FORWARD], 3)
+        self.assertEqual(stats.total('scanned_arcs'), 9)
+
+    def test_same_paths(self):
+        for dijkstra_func in (
+            dijkstra_fwd, dijkstra_rev, dijkstra_bidir, dijkstra_bidir_mu,
+            partial(astar, heuristic=lambda node, dest: 0)):
+
+            for src, dest in ( (0, 5), (0, 2), (2, 3) ):
+                stats = SearchStats()
+                self.assertEqual(
+                    dijkstra_func(self.graph, src, dest, stats=stats),
+                    dijkstra_func(self.graph, src, dest)
+                )
+                self.assertGreater(stats.total('settled'), 0)
+
+    def test_settled_nodes_match_state(self):
+        state = self.graph.new_state()
+        stats = SearchStats()
+
+        dijkstra_bidir(self.graph, 0, 5, state=state, stats=stats)
+
+        self.assertEqual(stats.settled[FORWARD], len(state.perm_fwd))
+        self.assertEqual(stats.settled[REVERSE], len(state.perm_rev))
+
+    def test_callbacks(self):
+        settled = list()
+        relaxed = list()
+        stats = SearchStats(
+            on_settle = lambda direction, node, dist: settled.append( (direction, node, dist) ),
+            on_relax = lambda direction, node, dist: relaxed.append( (direction, node, dist) )
+        )
+
+        dijkstra_rev(self.graph, 0, 5, stats=stats)
+
+        self.assertEqual(settled[0], (REVERSE, 5, 0))
+        self.assertEqual(settled[-1], (REVERSE, 0, 6))
+        self.assertEqual(len(relaxed), stats.relaxed[REVERSE])
+
+    def test_trace(self):
+        stats = SearchStats(trace=True)
+
+        dijkstra_fwd(self.graph, 0, 2, stats=stats)
+        dijkstra_fwd(self.graph, 0, 4, stats=stats)
+
+        self.assertEqual(
+            stats.settle_trace,
+            [(1, FORWARD, 0, 0), (1, FORWARD, 1, 2), (1, FORWARD, 2, 3),
+             (2, FORWARD, 0, 0), (2, FORWARD, 1, 2), (2, FORWARD, 2, 3), (2, FORWARD, 4, 4)]
+        )
+
+        with StringIO() as f:
+            stats.dump_trace(f)
+            lines = f.getvalue().splitlines()
+
+        self.assertEqual(lines[0], 'order,query,direction,node,dist')
+        self.assertEqual(lines[1], '0,1,fwd,0,0.0')
+        self.assertEqual(len(lines), 8)
+
+    def test_phases_and_reset(self):
+        stats = SearchStats()
+
+        dijkstra_fwd(self.graph, 0, 5, stats=stats)
+        with self.assertRaises(NoDirectedPathError):
+            dijkstra_fwd(self.graph, 5, 0, stats=stats)
+
+        self.assertEqual(stats.num_queries, 2)
+        self.assertEqual(set(stats.phase_times), {'init', 'search'})
+        self.assertIsNone(stats.phase)
+
+        stats.reset()
+        self.assertEqual(stats.summary()['settled'], {FORWARD: 0, REVERSE: 0})
+
+
+    def test_phases_closed_on_errors(self):
+        fractional = CSRGraph.from_arcs(3, array('q', [0, 1]), array('q', [1, 2]), array('d', [0.5, 1]))
+        search_filter = SearchFilter(self.graph.num_nodes, max_settled=1)
+
+        algorithms = (
+            dijkstra_fwd, dijkstra_rev, dijkstra_bidir, dijkstra_bidir_mu,
+            partial(astar, heuristic=lambda node, dest: 0)
+        )
+        for dijkstra_func in algorithms:
+            stats = SearchStats()
+
+            # Raised while initializing the search, and while running it
+            with self.assertRaises(KeyError):
+                dijkstra_func(self.graph, 0, 100, stats=stats)
+            self.assertIsNone(stats.phase)
+
+            with self.assertRaises(ValueError):
+                dijkstra_func(fractional, 0, 2, queue='radix', stats=stats)
+            self.assertIsNone(stats.phase)
+
+            with self.assertRaises(SearchBudgetError):
+                dijkstra_func(self.graph, 0, 5, stats=stats, search_filter=search_filter)
+            self.assertIsNone(stats.phase)
+            self.assertEqual(set(stats.phase_times), {'init', 'search'})
+
+
+class TestSearchStatsCSR(TestSearchStats):
+    graph_class = CSRGraph
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest, os, tempfile
+from io import StringIO
+
+from csr_graph import CSRGraph
+from snapshot import write_snapshot, open_snapshot, HEADER_SIZE
+from algorithms import dijkstra_fwd, dijkstra_rev, dijkstra_bidir
+from exceptions import InvalidSnapshotError
+from test_algorithms import graph_valid
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp_dir.name, 'graph.snap')
+
+        with StringIO(graph_valid) as f:
+            self.graph = CSRGraph(f)
+
+        with open(self.filename, 'wb') as f:
+            write_snapshot(self.graph, f)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        snapshot_graph = open_snapshot(self.filename)
+
+        self.assertEqual(snapshot_graph.num_nodes, self.graph.num_nodes)
+        self.assertEqual(snapshot_graph.num_arcs, self.graph.num_arcs)
+
+        for node in range(self.graph.num_nodes):
+            self.assertEqual(
+                list(snapshot_graph.out_arcs(node)), list(self.graph.out_arcs(node))
+            )
+            self.assertEqual(
+                list(snapshot_graph.in_arcs(node)), list(self.graph.in_arcs(node))
+            )
+
+    def test_optimal_paths(self):
+        snapshot_graph = open_snapshot(self.filename)
+
+        for dijkstra_func in (dijkstra_fwd, dijkstra_rev, dijkstra_bidir):
+            self.assertEqual(
+                dijkstra_func(snapshot_graph, 0, 5),
+                dijkstra_func(self.graph, 0, 5)
+            )
+
+    def checkIfRaises(self, contents:bytes):
+        """Helper function for test methods, to reduce cluttering."""
+        with open(self.filename, 'wb') as f:
+            f.write(contents)
+
+        with self.assertRaises(InvalidSnapshotError) as context_manager:
+            open_snapshot(self.filename)
+
+        return context_manager.exception
+
+    def test_not_a_snapshot(self):
+        exc = self.checkIfRaises(b'{"num_nodes": 3}'.ljust(HEADER_SIZE))
+        self.assertEqual(exc.details, "Not a graph snapshot")
+
+    def test_truncated(self):
+        with open(self.filename, 'rb') as f:
+            contents = f.read()
+
+        exc = self.checkIfRaises(contents[:-8])
+        self.assertTrue(exc.details.startswith("Expected"))
+
+    def test_empty(self):
+        exc = self.checkIfRaises(b'')
+        self.assertEqual(exc.details, "Empty file")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from io import StringIO
+from collections import deque
+
+from graph import Graph
+from csr_graph import CSRGraph
+from sssp import shortest_path_tree
+from algorithms import dijkstra_fwd, dijkstra_rev
+from exceptions import NoDirectedPathError
+from arc_node import NO_NODE
+from test_algorithms import graph_valid
+
+inf = float('+inf')
+
+
+class TestShortestPathTree(unittest.TestCase):
+    graph_class = Graph
+
+    def setUp(self):
+        with StringIO(graph_valid) as f:
+            self.graph = self.graph_class(f)
+
+    def test_forward_tree(self):
+        tree = shortest_path_tree(self.graph, 0)
+
+        self.assertEqual(list(tree.dist), [0, 2, 3, 6, 4, 6])
+        self.assertEqual(list(tree.pred), [NO_NODE, 0, 1, 1, 1, 4])
+
+        for dest in range(1, self.graph.num_nodes):
+            self.assertEqual(tree.path(dest), dijkstra_fwd(self.graph, 0, dest))
+
+    def test_reverse_tree(self):
+        tree = shortest_path_tree(self.graph, 5, reverse=True)
+
+        self.assertEqual(list(tree.dist), [6, 4, 5, 2, 2, 0])
+
+        for src in range(self.graph.num_nodes - 1):
+            self.assertEqual(tree.path(src), dijkstra_rev(self.graph, src, 5))
+
+    def test_set_queue(self):
+        self.assertEqual(
+            list(shortest_path_tree(self.graph, 0, queue='set').dist),
+            list(shortest_path_tree(self.graph, 0).dist)
+        )
+
+    def test_integer_queues(self):
+        for queue in ('dial', 'radix', 'auto'):
+            for reverse in (False, True):
+                self.assertEqual(
+                    list(shortest_path_tree(self.graph, 0, reverse, queue).dist),
+                    list(shortest_path_tree(self.graph, 0, reverse).dist)
+                )
+
+    def test_iter_path(self):
+        tree = shortest_path_tree(self.graph, 0)
+        self.assertEqual(list(tree.iter_path(5)), [5, 4, 1, 0])
+        self.assertEqual(list(tree.iter_path(0)), [0])
+
+        tree = shortest_path_tree(self.graph, 2)
+        self.assertEqual(list(tree.iter_path(0)), [])
+
+    def test_unreachable(self):
+        tree = shortest_path_tree(self.graph, 5)
+        self.assertEqual(tree.dist[0], inf)
+
+        with self.assertRaises(NoDirectedPathError) as context_manager:
+            tree.path(0)
+        self.assertEqual( (context_manager.exception.src, context_manager.exception.dest), (5, 0) )
+
+        tree = shortest_path_tree(self.graph, 0, reverse=True)
+        with self.assertRaises(NoDirectedPathError) as context_manager:
+            tree.path(5)
+        self.assertEqual( (context_manager.exception.src, context_manager.exception.dest), (5, 0) )
+
+    def test_invalid_root(self):
+        with self.assertRaises(KeyError):
+            shortest_path_tree(self.graph, self.graph.num_nodes)
+
+
+class TestShortestPathTreeCSR(TestShortestPathTree):
+    graph_class = CSRGraph
+
+
+if __name__ == '__main__':
+    unittest.main()